@@ -0,0 +1,117 @@
+"""Benchmark do filtro de safeguard do chat (palavras-chave de crise e tópico sensível).
+
+Compara a checagem antiga — `text.lower()` e `any(keyword in ...)` sobre
+cada lista, uma vez para crise e outra para sensível — com o
+`FiltroSafeguard`, que normaliza o texto (sem acentos) e classifica as
+duas categorias com uma única regex compilada em forma de trie. Também confere que o filtro novo nunca
+deixa passar uma mensagem que a checagem antiga pegaria, e mede o
+safeguard de saída do streaming (texto inteiro a cada trecho vs. só o
+trecho novo).
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.bench_safeguard
+    python -m benchmarks.bench_safeguard --mensagens 20000 --tamanho 400
+"""
+import argparse
+import random
+import time
+
+from bot.commands.deepseekchat import CRISIS_KEYWORDS, SENSITIVE_KEYWORDS
+from bot.servicos.FiltroSafeguard import FiltroSafeguard
+
+PALAVRAS_COMUNS = (
+    "oi", "tudo", "bem", "hoje", "jogo", "amanhã", "você", "viu", "aquele", "anime",
+    "não", "sei", "acho", "que", "sim", "música", "escola", "trabalho", "café", "gato",
+    "cachorro", "dormir", "comer", "ansioso", "feliz", "legal", "mano", "kkkk", "então", "vida",
+)
+
+
+def checagem_antiga(texto: str) -> tuple[bool, bool]:
+    texto_lower = texto.lower()
+    crise = any(keyword in texto_lower for keyword in CRISIS_KEYWORDS)
+    sensivel = any(keyword in texto_lower for keyword in SENSITIVE_KEYWORDS)
+    return crise, sensivel
+
+
+def gerar_mensagens(total: int, tamanho: int, fracao_alertas: float) -> list[str]:
+    rng = random.Random(42)
+    chaves = SENSITIVE_KEYWORDS + CRISIS_KEYWORDS
+    mensagens = []
+    for _ in range(total):
+        palavras = []
+        while sum(len(p) + 1 for p in palavras) < tamanho:
+            palavras.append(rng.choice(PALAVRAS_COMUNS))
+        if rng.random() < fracao_alertas:
+            palavras.insert(rng.randrange(len(palavras) + 1), rng.choice(chaves))
+        mensagens.append(" ".join(palavras))
+    return mensagens
+
+
+def medir(nome: str, funcao, mensagens: list[str], repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for mensagem in mensagens:
+            funcao(mensagem)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    por_mensagem = melhor / len(mensagens) * 1e6
+    print(f"{nome:<28} {melhor * 1000:9.1f} ms  ({por_mensagem:6.2f} µs/execução)")
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mensagens", type=int, default=10_000)
+    parser.add_argument("--tamanho", type=int, default=120, help="caracteres por mensagem (aprox.)")
+    parser.add_argument("--alertas", type=float, default=0.05, help="fração das mensagens com palavra-chave")
+    parser.add_argument("--resposta", type=int, default=1500, help="caracteres da resposta em streaming")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    mensagens = gerar_mensagens(args.mensagens, args.tamanho, args.alertas)
+
+    inicio = time.perf_counter()
+    filtro = FiltroSafeguard(SENSITIVE_KEYWORDS, CRISIS_KEYWORDS)
+    print(f"Compilação do filtro: {(time.perf_counter() - inicio) * 1000:.2f} ms "
+          f"({len(set(SENSITIVE_KEYWORDS) | set(CRISIS_KEYWORDS))} palavras-chave)")
+    print(f"{len(mensagens)} mensagens de ~{args.tamanho} caracteres, {args.alertas:.0%} com palavra-chave\n")
+
+    antiga = medir("lower() + any() x2", checagem_antiga, mensagens, args.repeticoes)
+    nova = medir("FiltroSafeguard (1 regex)", filtro.classificar, mensagens, args.repeticoes)
+    print(f"\nRazão antiga/nova: {antiga / nova:.2f}x")
+
+    # Safeguard de saída: uma resposta longa chegando em trechos pequenos
+    resposta = gerar_mensagens(1, args.resposta, 0)[0]
+    trechos = [resposta[i:i + 20] for i in range(0, len(resposta), 20)]
+
+    def streaming_antigo(_):
+        texto = ""
+        for trecho in trechos:
+            texto += trecho
+            checagem_antiga(texto)
+
+    def streaming_novo(_):
+        texto, verificado = "", 0
+        for trecho in trechos:
+            texto += trecho
+            inicio = max(0, verificado - filtro.sobreposicao)
+            verificado = len(texto)
+            filtro.classificar(texto[inicio:])
+
+    print(f"\nStreaming: resposta de {len(resposta)} caracteres em {len(trechos)} trechos")
+    antiga = medir("texto inteiro a cada trecho", streaming_antigo, [None] * 20, args.repeticoes)
+    nova = medir("só o trecho novo", streaming_novo, [None] * 20, args.repeticoes)
+    print(f"\nRazão antiga/nova: {antiga / nova:.2f}x")
+
+    perdidas = 0
+    for mensagem in mensagens:
+        crise, sensivel = checagem_antiga(mensagem)
+        classificacao = filtro.classificar(mensagem)
+        if (crise and not classificacao.crise) or (sensivel and not classificacao.sensivel):
+            perdidas += 1
+    print(f"Mensagens pegas pela checagem antiga e perdidas pelo filtro: {perdidas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,11 @@ import discord
 from discord.ext import commands
 from sqlalchemy import select, func
 
-from bot.database import AsyncSessionLocal
-from bot.database.models import Apoiador, GuildConfig, PixConfig
+from bot.database import AsyncSessionLocal, consultas, registro
+from bot.database.models import Apoiador, GuildConfig
+from bot.servicos.CachePixConfig import cache_pix_config
+from bot.servicos.Metricas import metricas
+from bot.servicos.Rastreamento import rastreador
 from bot.servicos.SupporterRoleManager import SupporterRoleManager
 
 from .utils import check_is_owner, _build_role_config_embed
@@ -277,6 +280,83 @@ class AdminCommands(commands.Cog):
             await ctx.send(f"❌ Erro ao listar servidores: {str(e)}", ephemeral=True)
             logger.error(f"Erro na listagem de servidores: {e}")
 
+    @commands.hybrid_command(name="db_metrics", description="[ADMIN] Mostra latência das consultas e uso do pool do banco")
+    async def db_metrics(self, ctx: commands.Context):
+        if not check_is_owner(ctx.interaction if hasattr(ctx, 'interaction') else ctx):
+            ephemeral = bool(ctx.interaction)
+            await ctx.send("❌ Apenas admins podem usar esse comando!", ephemeral=ephemeral)
+            return
+        try:
+            embed = discord.Embed(
+                title="🗄️ Métricas do Banco de Dados",
+                color=discord.Color.blue(),
+                timestamp=datetime.now(timezone.utc)
+            )
+
+            for engine, info in registro.status().items():
+                if "checkedout" in info:
+                    limite = registro.pool_size + registro.max_overflow if engine == "async" else registro.sync_pool_size + registro.sync_max_overflow
+                    value = f"Em uso: **{info['checkedout']}**/{limite}\nOciosas: {info['checkedin']}"
+                else:
+                    value = info["pool"]
+                espera = metricas.histograma("db_pool_checkout_wait_seconds", engine=engine).resumo()
+                if espera["count"]:
+                    value += f"\nEspera p95: {espera['p95'] * 1000:.1f} ms (máx {espera['max'] * 1000:.1f} ms)"
+                embed.add_field(name=f"🔌 Pool {engine}", value=value, inline=True)
+
+            latencias = []
+            for (nome, labels), histograma in sorted(metricas.histogramas().items()):
+                if nome != "db_query_seconds":
+                    continue
+                resumo = histograma.resumo()
+                rotulo = "/".join(v for _, v in labels)
+                latencias.append(
+                    f"`{rotulo}` {resumo['count']}x · p50 {resumo['p50'] * 1000:.1f} ms · p95 {resumo['p95'] * 1000:.1f} ms · máx {resumo['max'] * 1000:.0f} ms"
+                )
+            embed.add_field(name="⏱️ Latência por operação", value="\n".join(latencias) or "Sem consultas ainda.", inline=False)
+
+            lentas = [
+                f"`{item['statement'][:80]}` — {item['count']}x, média {item['avg_ms']:.1f} ms, máx {item['max_ms']:.0f} ms"
+                for item in consultas.mais_lentas(5)
+            ]
+            embed.add_field(name="🐢 Instruções mais custosas", value="\n".join(lentas)[:1024] or "Sem consultas ainda.", inline=False)
+
+            await ctx.send(embed=embed, ephemeral=True)
+        except Exception as e:
+            await ctx.send(f"❌ Erro ao obter métricas: {str(e)}", ephemeral=True)
+            logger.error(f"Erro nas métricas do banco: {e}")
+
+    @commands.hybrid_command(name="perf", description="[ADMIN] Latência p50/p95/p99 por comando na janela recente")
+    async def perf(self, ctx: commands.Context, minutos: int = 0):
+        if not check_is_owner(ctx.interaction if hasattr(ctx, 'interaction') else ctx):
+            ephemeral = bool(ctx.interaction)
+            await ctx.send("❌ Apenas admins podem usar esse comando!", ephemeral=ephemeral)
+            return
+        janela = minutos * 60 if minutos > 0 else rastreador.janela.janela
+        estatisticas = rastreador.janela.estatisticas(janela)
+
+        embed = discord.Embed(
+            title="⏱️ Desempenho dos Comandos",
+            description=f"Últimos {janela / 60:.0f} minutos, do maior p95 para o menor.",
+            color=discord.Color.blue(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        for item in estatisticas[:20]:
+            spans = " · ".join(
+                f"{tipo} {media * 1000:.0f} ms" for tipo, media in sorted(item["spans_medios"].items())
+            )
+            value = (
+                f"{item['count']}x ({item['erros']} erros) · p50 {item['p50'] * 1000:.0f} ms · "
+                f"p95 {item['p95'] * 1000:.0f} ms · p99 {item['p99'] * 1000:.0f} ms"
+            )
+            if spans:
+                value += f"\nMédia por execução: {spans}"
+            embed.add_field(name=f"/{item['comando']}", value=value, inline=False)
+        if not estatisticas:
+            embed.add_field(name="Sem dados", value="Nenhum comando executado na janela.", inline=False)
+
+        await ctx.send(embed=embed, ephemeral=True)
+
     @commands.hybrid_command(name="configure_role", description="[ADMIN] Configura cargos de apoiador para um servidor")
     async def configure_role(self, ctx: commands.Context):
         if not check_is_owner(ctx.interaction if hasattr(ctx, 'interaction') else ctx):
@@ -351,9 +431,7 @@ class AdminCommands(commands.Cog):
             if ctx.interaction:
                 await ctx.interaction.response.defer(ephemeral=True)
 
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(select(PixConfig))
-                config = result.scalars().first()
+            config = await cache_pix_config.obter()
 
             if not config:
                 embed = discord.Embed(
@@ -5,6 +5,7 @@ from sqlalchemy import select
 
 from bot.database import AsyncSessionLocal
 from bot.database.models import PixConfig
+from bot.servicos.CachePixConfig import cache_pix_config
 from .views_base import ConfirmationView
 
 logger = logging.getLogger(__name__)
@@ -91,6 +92,7 @@ class SetQRCodeModal(ui.Modal, title="Configurar PIX QR Code"):
 
                 session.add(config)
                 await session.commit()
+            cache_pix_config.definir(config)
 
             embed = discord.Embed(
                 title="✅ PIX Configurado com Sucesso",
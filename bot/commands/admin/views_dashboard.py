@@ -6,7 +6,9 @@ from discord import ui
 from sqlalchemy import select
 
 from bot.database import AsyncSessionLocal
-from bot.database.models import Apoiador, GuildConfig, PixConfig
+from bot.database.models import Apoiador
+from bot.servicos.CacheGuildConfig import cache_guild_config
+from bot.servicos.CachePixConfig import cache_pix_config
 from .utils import check_is_owner, _build_role_config_embed
 from .views_base import ConfirmationView
 from .views_pix import PIXConfigView
@@ -239,9 +241,7 @@ class DashboardView(ui.View):
             if not await self.check_owner(interaction):
                 return
             try:
-                async with AsyncSessionLocal() as session:
-                    result = await session.execute(select(PixConfig))
-                    config = result.scalars().first()
+                config = await cache_pix_config.obter()
 
                 if not config:
                     embed = discord.Embed(
@@ -282,12 +282,7 @@ class DashboardView(ui.View):
                 await interaction.response.send_message("❌ Este comando só funciona em um servidor.", ephemeral=True)
                 return
             try:
-                guild_id = str(interaction.guild.id)
-                async with AsyncSessionLocal() as session:
-                    result = await session.execute(
-                        select(GuildConfig).where(GuildConfig.guild_id == guild_id)
-                    )
-                    config = result.scalars().first()
+                config = await cache_guild_config.obter(interaction.guild.id)
 
                 embed = _build_role_config_embed(interaction.guild, config)
                 view = RoleConfigView(self.bot, interaction.guild)
@@ -5,6 +5,7 @@ from sqlalchemy import select
 
 from bot.database import AsyncSessionLocal
 from bot.database.models import PixConfig
+from bot.servicos.CachePixConfig import cache_pix_config
 from .modals_pix import SetQRCodeModal
 from .views_base import ConfirmationView
 
@@ -22,9 +23,7 @@ class PIXConfigView(ui.View):
     @ui.button(label="❌ Limpar Config", style=discord.ButtonStyle.danger)
     async def clear_config(self, interaction: discord.Interaction, button: ui.Button):
         try:
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(select(PixConfig))
-                config = result.scalars().first()
+            config = await cache_pix_config.obter()
 
             if not config:
                 await interaction.response.send_message("⚠️ Nenhuma configuração para remover", ephemeral=True)
@@ -54,9 +53,11 @@ class PIXConfigView(ui.View):
                 if config:
                     await session.delete(config)
                     await session.commit()
-                    await interaction.followup.send("✅ Configuração PIX removida completamente", ephemeral=True)
-                else:
-                    await interaction.followup.send("⚠️ Configuração já foi removida", ephemeral=True)
+            cache_pix_config.definir(None)
+            if config:
+                await interaction.followup.send("✅ Configuração PIX removida completamente", ephemeral=True)
+            else:
+                await interaction.followup.send("⚠️ Configuração já foi removida", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Erro ao limpar configuração: {str(e)}", ephemeral=True)
             logger.error(f"Erro ao limpar PIX config: {e}")
@@ -6,6 +6,7 @@ from sqlalchemy import select
 
 from bot.database import AsyncSessionLocal
 from bot.database.models import GuildConfig
+from bot.servicos.CacheGuildConfig import cache_guild_config
 from .utils import check_is_owner, _build_role_config_embed
 from .views_base import ConfirmationView
 
@@ -154,6 +155,7 @@ class DefaultRoleSelectView(PaginatedRoleSelectView):
                     session.add(config)
                 config.cargo_apoiador_default = str(role.id)
                 await session.commit()
+            cache_guild_config.invalidar(guild_id)
 
             embed = discord.Embed(
                 title="✅ Cargo Padrão Configurado",
@@ -283,6 +285,7 @@ class TimeRoleSelectView(PaginatedRoleSelectView):
                         session.add(config)
                     config.cargos_tempo = time_roles
                     await session.commit()
+                cache_guild_config.invalidar(guild_id)
 
             unit_display = {"days": "dias", "months": "meses", "years": "anos"}.get(unit, unit)
             embed = discord.Embed(
@@ -305,12 +308,9 @@ class TimeRoleConfigView(ui.View):
     async def _load_time_roles(self):
         try:
             guild_id = str(self.guild.id)
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(
-                    select(GuildConfig).where(GuildConfig.guild_id == guild_id)
-                )
-                config = result.scalars().first()
-                self.time_roles = config.cargos_tempo if config and config.cargos_tempo else []
+            config = await cache_guild_config.obter(guild_id)
+            # Cópia: a lista é alterada ao adicionar cargos e o objeto em cache é compartilhado
+            self.time_roles = list(config.cargos_tempo) if config and config.cargos_tempo else []
         except Exception as e:
             logger.error(f"Erro ao carregar cargos de tempo existentes: {e}")
             self.time_roles = []
@@ -398,12 +398,7 @@ class RoleConfigView(ui.View):
             await interaction.response.send_message("❌ Apenas admins podem usar essa função!", ephemeral=True)
             return
         try:
-            guild_id = str(self.guild.id)
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(
-                    select(GuildConfig).where(GuildConfig.guild_id == guild_id)
-                )
-                config = result.scalars().first()
+            config = await cache_guild_config.obter(self.guild.id)
 
             embed = _build_role_config_embed(self.guild, config)
             view = RoleConfigView(self.bot, self.guild)
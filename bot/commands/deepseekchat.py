@@ -1,9 +1,14 @@
 import discord, os, logging
 from os import getenv
+from contextlib import aclosing
 from discord.ext import commands
-import requests
 from collections import deque
 import re
+from bot.config import Config as app_config
+from bot.servicos.CanalLogs import canal_logs
+from bot.servicos.FiltroSafeguard import Classificacao, FiltroSafeguard
+from bot.servicos.MensagemProgressiva import MensagemProgressiva
+from bot.servicos.ResolvedorDiscord import resolvedor_canais
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +33,8 @@ CRISIS_KEYWORDS = [
     "tortura", "torturar", "torturado", "torturada", "me torturar", "torturando"
 ]
 
+RESPOSTA_BLOQUEADA = "Opa, acho que estamos saindo da linha! 😅 Vamos mudar de assunto? Tem algo mais leve que eu possa ajudar?"
+
 SAFEGUARD_REMINDER_INTERVAL = 5  # A cada X mensagens, lembra que não é terapeuta
 CONTEXT_RESET_INTERVAL = 10  # A cada X mensagens, reseta o histórico para evitar degradação do prompt
 
@@ -46,10 +53,13 @@ class DeepseekCommands(commands.Cog):
         self.log_channel_id=int(getenv('DEEPSEEK_LOG_CHANNEL', 0))
         self.allowed_channel_id=int(getenv("QUARTO_DO_HUGME", 0))
         self.auto_response = True
+        self.streaming = app_config.LLM_STREAMING
         if not self.api_key:
             raise ValueError("DEEP_KEY must be set in environment variables")
         self.message_history = {}
         self.message_count = {}  # Contador por canal para o lembrete periódico
+        # Palavras-chave compiladas uma vez: entrada e saída usam a mesma regex
+        self.safeguard = FiltroSafeguard(SENSITIVE_KEYWORDS, CRISIS_KEYWORDS)
     
     @commands.Cog.listener()
     async def on_ready(self):
@@ -60,15 +70,17 @@ class DeepseekCommands(commands.Cog):
         else:
             logger.warning("DeepseekChat: QUARTO_DO_HUGME não configurado, bot não responderá em nenhum canal.")
         
+    def classify_message(self, text: str) -> Classificacao:
+        """Classifica a mensagem como crise e/ou tópico sensível numa única varredura"""
+        return self.safeguard.classificar(text)
+
     def is_sensitive_message(self, text: str) -> bool:
         """Verifica se a mensagem contém tópicos sensíveis"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in SENSITIVE_KEYWORDS)
+        return self.safeguard.classificar(text).sensivel
     
     def is_crisis_message(self, text: str) -> bool:
         """Verifica se a mensagem indica crise imediata"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in CRISIS_KEYWORDS)
+        return self.safeguard.classificar(text).crise
     
     def should_send_reminder(self, channel_id: int) -> bool:
         """Verifica se está na hora de mandar o lembrete periódico"""
@@ -142,20 +154,24 @@ class DeepseekCommands(commands.Cog):
             self.message_count[channel_id] = self.message_count.get(channel_id, 0) + 1
 
             # Checagem de crise imediata — prioridade máxima
-            if self.is_crisis_message(message.content):
+            classificacao = self.classify_message(message.content)
+            if classificacao.crise:
                 await self.send_safeguard_message(message.channel, message.author.mention, is_crisis=True)
                 await self.log_interaction(message.author, message.content, "[SAFEGUARD - CRISE DETECTADA]")
                 return  # Não responde normalmente em caso de crise
 
             # Checagem de tópico sensível
-            if self.is_sensitive_message(message.content):
+            if classificacao.sensivel:
                 await self.send_safeguard_message(message.channel, message.author.mention, is_crisis=False)
                 await self.log_interaction(message.author, message.content, "[SAFEGUARD - TÓPICO SENSÍVEL]")
                 return
 
             history = list(self.message_history[channel_id])
-            response = await self.call_deepseek_api(message.content, history, message.author)
-            await message.channel.send(f"{message.author.mention} {response}")
+            if self.streaming:
+                response = await self.stream_deepseek_reply(message.channel, message.content, history, message.author)
+            else:
+                response = await self.call_deepseek_api(message.content, history, message.author)
+                await message.channel.send(f"{message.author.mention} {response}")
             
             self.message_history[channel_id].append({"role": "user", "content": message.content})
             self.message_history[channel_id].append({"role": "assistant", "content": response})
@@ -193,20 +209,24 @@ class DeepseekCommands(commands.Cog):
             self.message_count[channel_id] = self.message_count.get(channel_id, 0) + 1
 
             # Checagem de crise imediata
-            if self.is_crisis_message(mensagem):
+            classificacao = self.classify_message(mensagem)
+            if classificacao.crise:
                 await self.send_safeguard_message(ctx.channel, ctx.author.mention, is_crisis=True)
                 await self.log_interaction(ctx.author, mensagem, "[SAFEGUARD - CRISE DETECTADA]")
                 return
 
             # Checagem de tópico sensível
-            if self.is_sensitive_message(mensagem):
+            if classificacao.sensivel:
                 await self.send_safeguard_message(ctx.channel, ctx.author.mention, is_crisis=False)
                 await self.log_interaction(ctx.author, mensagem, "[SAFEGUARD - TÓPICO SENSÍVEL]")
                 return
 
             history = list(self.message_history[channel_id])
-            response = await self.call_deepseek_api(mensagem, history, ctx.author)
-            await ctx.channel.send(f"{ctx.author.mention} {response}")
+            if self.streaming:
+                response = await self.stream_deepseek_reply(ctx.channel, mensagem, history, ctx.author)
+            else:
+                response = await self.call_deepseek_api(mensagem, history, ctx.author)
+                await ctx.channel.send(f"{ctx.author.mention} {response}")
             
             self.message_history[channel_id].append({"role": "user", "content": mensagem})
             self.message_history[channel_id].append({"role": "assistant", "content": response})
@@ -247,7 +267,7 @@ class DeepseekCommands(commands.Cog):
         mention_str = " ".join(mentions) if mentions else "Admins"
         
         try:
-            log_channel = self.bot.get_channel(self.log_channel_id)
+            log_channel = await resolvedor_canais.resolver(self.bot, self.log_channel_id)
             if not log_channel:
                 logger.warning(f"Canal de logs ({self.log_channel_id}) não encontrado")
                 return
@@ -271,14 +291,10 @@ class DeepseekCommands(commands.Cog):
             logger.error(f"Erro ao enviar alerta de safeguard: {str(e)}")
     
     async def log_interaction(self, user: discord.User, question: str, response: str | None):
+        """Coloca o log da interação na fila do canal de logs (enviado em lote)"""
         if not self.log_channel_id:
             return
         try:
-            log_channel = self.bot.get_channel(self.log_channel_id)
-            if not log_channel:
-                logger.warning(f"Canal de logs ({self.log_channel_id}) não encontrado")
-                return
-            
             is_safeguard = response and response.startswith("[SAFEGUARD")
             
             embed = discord.Embed(
@@ -293,17 +309,14 @@ class DeepseekCommands(commands.Cog):
                 field_name = "🛡️ Safeguard Ativado" if is_safeguard else ("💥 Erro" if response.startswith("ERRO:") else "💬 Resposta")
                 embed.add_field(name=field_name, value=response[:1024], inline=False)
             
-            await log_channel.send(embed=embed)
+            # Com a fila cheia o log é descartado (contado em log_sink_dropped_total)
+            canal_logs.enfileirar(self.bot, self.log_channel_id, embed)
             
         except Exception as e:
             logger.error(f"Erro ao enviar log: {str(e)}")
     
-    async def call_deepseek_api(self, prompt: str, history: list, user: discord.User) -> str:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
+    def build_messages(self, prompt: str, history: list) -> list:
+        """Monta a lista de mensagens (system prompt + histórico + pergunta)"""
         descricao_hugme = """
 Você é o HugMe, um bot amigável e descontraído criado para um servidor de pessoas neurodivergentes (autismo, TDAH e afins). Seu objetivo é agir como um usuário normal do Discord, participando de conversas de forma natural, leve e respeitosa, sem parecer formal demais ou excessivamente automático.
 
@@ -338,25 +351,52 @@ HugMe: "puts, sinto muito ouvir isso :c esse tipo de sentimento é pesado. não
         for message in history:
             messages.append(message)
         messages.append({"role": "user", "content": prompt})
+        return messages
 
-        data = {"model": "deepseek-chat", "messages": messages}
+    @staticmethod
+    def filter_mentions(text: str) -> str:
+        return text.replace("@everyone", "everyone").replace("@here", "here")
 
-        response = requests.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            json=data,
-            headers=headers
-        )
-        response.raise_for_status()
-        
-        raw_response = response.json()["choices"][0]["message"]["content"]
-        filtered_response = raw_response.replace("@everyone", "everyone").replace("@here", "here")
+    async def call_deepseek_api(self, prompt: str, history: list, user: discord.User) -> str:
+        messages = self.build_messages(prompt, history)
+
+        raw_response = await self.bot.llm.chat(messages, model="deepseek-chat", user_id=user.id)
+        filtered_response = self.filter_mentions(raw_response)
         
         # Filtragem de resposta: detecta se o bot respondeu com tópicos sensíveis (safeguard na saída)
         if self.is_sensitive_message(filtered_response):
             await self.log_safeguard_alert(user, prompt, filtered_response)
-            return "Opa, acho que estamos saindo da linha! 😅 Vamos mudar de assunto? Tem algo mais leve que eu possa ajudar?"
+            return RESPOSTA_BLOQUEADA
         
         return filtered_response
 
+    async def stream_deepseek_reply(self, channel, prompt: str, history: list, user: discord.User) -> str:
+        """Responde em streaming, editando a mensagem no canal conforme o texto chega.
+
+        O safeguard de saída roda antes de cada atualização, então nada
+        sensível chega a ser exibido. Como o começo do texto já foi
+        verificado, só o trecho novo (com uma sobreposição) é relido.
+        """
+        messages = self.build_messages(prompt, history)
+        resposta = MensagemProgressiva(channel.send, prefix=f"{user.mention} ")
+        texto = ""
+        verificado = 0
+
+        async with aclosing(self.bot.llm.stream_chat(messages, model="deepseek-chat", user_id=user.id)) as stream:
+            async for trecho in stream:
+                texto = self.filter_mentions(texto + trecho)
+                inicio = max(0, verificado - self.safeguard.sobreposicao)
+                verificado = len(texto)
+                if self.is_sensitive_message(texto[inicio:]):
+                    await self.log_safeguard_alert(user, prompt, texto)
+                    await resposta.finish(RESPOSTA_BLOQUEADA)
+                    return RESPOSTA_BLOQUEADA
+                await resposta.update(texto)
+
+        if not texto:
+            raise ValueError("A API não retornou conteúdo")
+        await resposta.finish(texto)
+        return texto
+
 async def setup(bot):
     await bot.add_cog(DeepseekCommands(bot))
\ No newline at end of file
@@ -1,11 +1,16 @@
-import asyncio
 import json
 import re, discord, logging, os, httpx
 from bot.servicos.SupporterRoleManager import SupporterRoleManager
 from bot.servicos.VerificacaoMembro import VerificacaoMembro
+from bot.servicos.AgendadorPrazos import agendador_prazos
+from bot.servicos.CachePixConfig import cache_pix_config
+from bot.servicos.DoacoesPendentes import como_utc, doacoes_pendentes
+from bot.servicos.ResolvedorDiscord import resolvedor_canais, resolvedor_membros
+from bot.servicos.Rastreamento import rastreador
 from bot.config import Config as app_config
-from bot.database import SessionLocal
-from bot.database.models import Apoiador, PixConfig
+from bot.database import AsyncSessionLocal
+from bot.database.models import Apoiador, DoacaoPendente
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
 from discord.ext import commands
@@ -14,6 +19,20 @@ from discord.utils import sleep_until
 
 logger = logging.getLogger(__name__)
 
+# Prazo para o admin confirmar o Pix e tempo até as mensagens da doação sumirem
+PRAZO_CONFIRMACAO_MINUTOS = 5
+AUTODELETE_MINUTOS = 10
+
+
+def chave_expiracao(reference_id: str) -> str:
+    """Chave do prazo de expiração de uma doação no agendador"""
+    return f"expirar_pix_{reference_id}"
+
+
+def chave_autodelete(reference_id: str) -> str:
+    """Chave do prazo de auto-delete das mensagens de uma doação no agendador"""
+    return f"apagar_pix_{reference_id}"
+
 # --- Função utilitária para pegar hora de Brasília ---
 def get_brasilia_time():
     brasilia_offset = timedelta(hours=-3)
@@ -53,6 +72,10 @@ class DonationModal(Modal, title="Fazer Doação via Pix"):
     )
 
     async def on_submit(self, interaction: discord.Interaction):
+        async with rastreador.rastrear("doar_pix_modal", "DoarCommands", "modal"):
+            await self._processar_doacao(interaction)
+
+    async def _processar_doacao(self, interaction: discord.Interaction):
         try:
             # --- Validação do valor ---
             try:
@@ -68,55 +91,34 @@ class DonationModal(Modal, title="Fazer Doação via Pix"):
             amount_cents = int(amount * 100)
             guild_id = str(interaction.guild.id) if interaction.guild else "0"
 
-            # --- Salva ou atualiza no banco ---
-            with SessionLocal() as session:
-                try:
-                    apoiador = session.query(Apoiador).filter_by(
-                        discord_id=str(interaction.user.id),
-                        guild_id=guild_id
-                    ).first()
-                    
-                    if apoiador:
-                        # Atualiza apenas o id_pagamento e dados
-                        apoiador.id_pagamento = reference_id
-                        apoiador.tipo_apoio = "pix"
-                        apoiador.valor_doacao = amount_cents
-                        apoiador.data_inicio = datetime.now(timezone.utc)
-                        apoiador.ja_pago = False
-                    else:
-                        # Cria novo registro
-                        apoiador = Apoiador(
-                            discord_id=str(interaction.user.id),
-                            guild_id=guild_id,
-                            id_pagamento=reference_id,
-                            tipo_apoio="pix",
-                            valor_doacao=amount_cents,
-                            data_inicio=datetime.now(timezone.utc),
-                            ja_pago=False
-                        )
-                        session.add(apoiador)
-
-                    session.commit()
-                except Exception as e:
-                    session.rollback()
-                    logger.error(f"Erro ao salvar doação no banco: {e}")
-                    await interaction.response.send_message(
-                        "❌ Erro ao registrar a doação. Tente novamente mais tarde.",
-                        ephemeral=True
-                    )
-                    return
+            # Configuração PIX vem do cache em memória: sem ida ao banco para responder
+            config = await cache_pix_config.obter()
+            if config is None:
+                await interaction.response.send_message(
+                    "❌ Configuração PIX não encontrada.",
+                    ephemeral=True
+                )
+                return
 
-            # --- Busca configuração PIX ---
-            with SessionLocal() as session:
-                config = session.query(PixConfig).first()
-                if not config:
-                    await interaction.response.send_message(
-                        "❌ Configuração PIX não encontrada.",
-                        ephemeral=True
-                    )
-                    return
-                chave = config.chave
-                image_url = config.static_qr_url
+            # ACK imediato: banco e API do Discord ficam fora do prazo de 3s da interação
+            await interaction.response.defer(ephemeral=True, thinking=True)
+
+            # --- Salva a doação pendente no apoiador ---
+            try:
+                await self._salvar_doacao(interaction.user.id, guild_id, reference_id, amount_cents)
+            except Exception as e:
+                logger.error(f"Erro ao salvar doação no banco: {e}")
+                await interaction.followup.send(
+                    "❌ Erro ao registrar a doação. Tente novamente mais tarde.",
+                    ephemeral=True
+                )
+                return
+            chave, image_url = config.chave, config.static_qr_url
+
+            # Mesmo reference_id de uma doação ainda aberta: encerra a anterior antes de reagendar
+            doar_cog = self.bot.get_cog("DoarCommands")
+            if doar_cog:
+                await doar_cog.encerrar_anterior(reference_id)
 
             # --- Envia embed pro usuário ---
             embed = discord.Embed(
@@ -128,11 +130,10 @@ class DonationModal(Modal, title="Fazer Doação via Pix"):
             embed.add_field(name="Copia e Cola", value=f"`{chave}`", inline=False)
             embed.set_image(url=image_url)
 
-            # Footer pro usuário e timer de auto rejeição
-            timeout = get_brasilia_time() + timedelta(minutes=5)
-            restante = timeout - get_brasilia_time()
-            mins, segs = divmod(int(restante.total_seconds()), 60)
-            embed.set_footer(text=f"⏳ Confirmação Manual pendente | Tempo restante: {mins}m {segs}s")
+            # Prazo de confirmação: o Discord renderiza a contagem regressiva sozinho
+            timeout = get_brasilia_time() + timedelta(minutes=PRAZO_CONFIRMACAO_MINUTOS)
+            embed.add_field(name="⏳ Expira", value=discord.utils.format_dt(timeout, "R"), inline=False)
+            embed.set_footer(text="⏳ Confirmação Manual pendente")
 
             user_view = View(timeout=None)
             user_view.add_item(Button(
@@ -148,43 +149,22 @@ class DonationModal(Modal, title="Fazer Doação via Pix"):
                 dm_channel = await interaction.user.create_dm()
                 bot_message = await dm_channel.send(embed=embed, view=user_view)
                 user_message = None
-                await interaction.response.send_message(
+                await interaction.followup.send(
                     "✅ Verifique sua DM para completar a doação.", ephemeral=True
                 )
             except discord.Forbidden:
-                await interaction.response.send_message(embed=embed, view=user_view, ephemeral=True)
+                user_message = await interaction.followup.send(embed=embed, view=user_view, ephemeral=True, wait=True)
                 bot_message = None
-                user_message = await interaction.original_response()
-
-            # --- Auto-delete das mensagens após X minutos ---
-            async def autodelete(bot_msg: discord.Message, user_msg: discord.Message, delay_minutos: int = 10):
-                delete_time = get_brasilia_time() + timedelta(minutes=delay_minutos)
-                while True:
-                    if get_brasilia_time() >= delete_time:
-                        for msg in (bot_msg, user_msg):
-                            if msg is None:
-                                continue
-                            try:
-                                await msg.delete()
-                            except (discord.NotFound, discord.Forbidden):
-                                pass
-                        break
-                    await asyncio.sleep(5)
-            asyncio.create_task(autodelete(user_message, bot_message))
-
-            # --- Inicia timer de rejeição automática ---
-            doar_cog = self.bot.get_cog("DoarCommands")
-            msg_para_timer = bot_message or user_message
+
+            # --- Agenda expiração (rejeição automática) e auto-delete ---
+            apagar_em = get_brasilia_time() + timedelta(minutes=AUTODELETE_MINUTOS)
             if doar_cog:
-                asyncio.create_task(doar_cog.update_timer_embed(
-                    message=msg_para_timer,
-                    reference_id=reference_id,
-                    timeout=timeout
-                ))
+                doar_cog.agendar_expiracao(reference_id, timeout, message=bot_message or user_message)
+                doar_cog.agendar_autodelete(reference_id, apagar_em, mensagens=[bot_message, user_message])
 
             # --- Notifica admins ---
-            channel_id = app_config.DONO_LOG_CHANNEL
-            donolog = await self.bot.fetch_channel(channel_id)
+            admin_msg = None
+            donolog = await resolvedor_canais.resolver(self.bot, app_config.DONO_LOG_CHANNEL)
             if donolog:
                 view = View(timeout=None)
                 view.add_item(Button(
@@ -212,12 +192,59 @@ class DonationModal(Modal, title="Fazer Doação via Pix"):
                     # Salva a mensagem do admin para manipulação futura
                     doar_cog.admin_messages[reference_id] = admin_msg
 
+            # --- Persiste a doação pendente para sobreviver a reinícios ---
+            if doar_cog:
+                await doar_cog.persistir_pendente(DoacaoPendente(
+                    reference_id=reference_id,
+                    discord_id=str(interaction.user.id),
+                    guild_id=guild_id,
+                    valor_doacao=amount_cents,
+                    # Respostas efêmeras não podem ser buscadas depois; só a DM é persistida
+                    canal_usuario_id=str(bot_message.channel.id) if bot_message else None,
+                    mensagem_usuario_id=str(bot_message.id) if bot_message else None,
+                    canal_admin_id=str(admin_msg.channel.id) if admin_msg else None,
+                    mensagem_admin_id=str(admin_msg.id) if admin_msg else None,
+                    expira_em=timeout.astimezone(timezone.utc),
+                    apagar_em=apagar_em.astimezone(timezone.utc),
+                ))
+
         except Exception as e:
             logger.error(f"Erro ao processar doação: {e}")
-            await interaction.response.send_message(
-                "❌ Ocorreu um erro ao processar sua doação. Tente novamente mais tarde.",
-                ephemeral=True
-            )
+            mensagem = "❌ Ocorreu um erro ao processar sua doação. Tente novamente mais tarde."
+            if interaction.response.is_done():
+                await interaction.followup.send(mensagem, ephemeral=True)
+            else:
+                await interaction.response.send_message(mensagem, ephemeral=True)
+
+    async def _salvar_doacao(self, user_id: int, guild_id: str, reference_id: str, amount_cents: int):
+        """Registra a doação pendente no apoiador (cria o registro se não existir)"""
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(Apoiador).where(
+                        Apoiador.discord_id == str(user_id),
+                        Apoiador.guild_id == guild_id
+                    )
+                )
+                apoiador = result.scalars().first()
+                if apoiador:
+                    # Atualiza apenas o id_pagamento e dados
+                    apoiador.id_pagamento = reference_id
+                    apoiador.tipo_apoio = "pix"
+                    apoiador.valor_doacao = amount_cents
+                    apoiador.data_inicio = datetime.now(timezone.utc)
+                    apoiador.ja_pago = False
+                else:
+                    # Cria novo registro
+                    session.add(Apoiador(
+                        discord_id=str(user_id),
+                        guild_id=guild_id,
+                        id_pagamento=reference_id,
+                        tipo_apoio="pix",
+                        valor_doacao=amount_cents,
+                        data_inicio=datetime.now(timezone.utc),
+                        ja_pago=False
+                    ))
 
 
 # --- Views para DM ---
@@ -280,51 +307,123 @@ class DoarView(View):
 
 
 # --- Comando /doar ---
+# Botões tratados pelo listener on_interaction (prefixos dos custom_id)
+ACOES_INTERACAO = ("user_paid_", "user_cancel_", "confirm_payment_", "reject_payment_")
+
+
 class DoarCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.timer_tasks = {}
         self.admin_messages = {}
         self.verificador = VerificacaoMembro(bot)
         self.role_manager = SupporterRoleManager(bot)
 
-    async def update_timer_embed(self, message: discord.Message, reference_id: str, timeout: datetime):
+    async def cog_load(self):
         try:
-            if not message.embeds:
-                return
+            await self.reidratar_pendentes()
+        except Exception as e:
+            logger.error(f"Erro ao recarregar doações pendentes: {e}")
+
+    async def reidratar_pendentes(self) -> int:
+        """Reagenda expiração e auto-delete das doações persistidas (após um reinício).
+
+        As mensagens não são buscadas aqui: cada prazo busca a sua só quando vence.
+        """
+        pendentes = await doacoes_pendentes.listar()
+        for pendente in pendentes:
+            if not pendente.resolvida:
+                self.agendar_expiracao(pendente.reference_id, como_utc(pendente.expira_em))
+            self.agendar_autodelete(pendente.reference_id, como_utc(pendente.apagar_em))
+        if pendentes:
+            logger.info(f"{len(pendentes)} doações pendentes reagendadas")
+        return len(pendentes)
+
+    async def persistir_pendente(self, pendente: DoacaoPendente):
+        try:
+            await doacoes_pendentes.salvar(pendente)
+        except Exception as e:
+            # A doação segue funcionando em memória; só não sobrevive a um reinício
+            logger.error(f"Erro ao persistir doação pendente {pendente.reference_id}: {e}")
 
-            embed = message.embeds[0]
-            
-            async def timer_task():
+    async def _buscar_mensagem(self, canal_id: str | None, mensagem_id: str | None) -> discord.Message | None:
+        if not canal_id or not mensagem_id:
+            return None
+        try:
+            return await self.bot.get_partial_messageable(int(canal_id)).fetch_message(int(mensagem_id))
+        except (discord.NotFound, discord.Forbidden):
+            return None
+
+    async def mensagem_admin(self, reference_id: str) -> discord.Message | None:
+        """Mensagem dos admins da doação: da memória ou, após um reinício, buscada sob demanda"""
+        admin_msg = self.admin_messages.get(reference_id)
+        if admin_msg is None:
+            pendente = await doacoes_pendentes.obter(reference_id)
+            if pendente:
+                admin_msg = await self._buscar_mensagem(pendente.canal_admin_id, pendente.mensagem_admin_id)
+            if admin_msg:
+                self.admin_messages[reference_id] = admin_msg
+        return admin_msg
+
+    def agendar_expiracao(self, reference_id: str, timeout: datetime, message: discord.Message | None = None):
+        """Marca a doação como expirada exatamente no prazo, sem edições intermediárias.
+
+        Sem `message` (doação recarregada do banco), a mensagem é buscada no vencimento.
+        """
+        async def expirar():
+            msg = message
+            if msg is None:
+                pendente = await doacoes_pendentes.obter(reference_id)
+                if pendente is None or pendente.resolvida:
+                    return
+                msg = await self._buscar_mensagem(pendente.canal_usuario_id, pendente.mensagem_usuario_id)
+            if msg is not None and msg.embeds:
+                embed = msg.embeds[0]
+                embed.set_footer(text="⌛ Pagamento não confirmado (expirado)")
                 try:
-                    while True:
-                        remaining = timeout - get_brasilia_time()
-                        total_secs = int(remaining.total_seconds())
-                
-                        if total_secs <= 0:
-                            embed.set_footer(text="⌛ Pagamento não confirmado (expirado)")
-                            await message.edit(embeds=[embed], view=None)
-                            break
-                
-                        mins, secs = divmod(total_secs, 60)
-                        embed.set_footer(text=f"⏳ Confirmação pendente | Tempo restante: {mins}m {secs}s")
-                        await message.edit(embeds=[embed])
-                        await asyncio.sleep(5)
-                except asyncio.CancelledError:
+                    await msg.edit(embeds=[embed], view=None)
+                except discord.NotFound:
+                    pass  # mensagem já apagada pelo usuário
+            await doacoes_pendentes.marcar_resolvida(reference_id)
+
+        agendador_prazos.agendar(chave_expiracao(reference_id), timeout, expirar)
+
+    def agendar_autodelete(self, reference_id: str, quando: datetime, mensagens: list | None = None):
+        """Apaga as mensagens da doação no prazo e esquece a doação"""
+        async def apagar():
+            msgs = mensagens
+            if msgs is None:
+                pendente = await doacoes_pendentes.obter(reference_id)
+                msgs = [await self._buscar_mensagem(pendente.canal_usuario_id, pendente.mensagem_usuario_id)] if pendente else []
+            for msg in msgs:
+                if msg is None:
+                    continue
+                try:
+                    await msg.delete()
+                except (discord.NotFound, discord.Forbidden):
                     pass
-                except Exception as e:
-                    logger.info(f"erro no timer task: {e}")
-                finally:
-                    if reference_id in self.timer_tasks:
-                        del self.timer_tasks[reference_id]
-                        
-            task = asyncio.create_task(timer_task())
-            self.timer_tasks[reference_id] = task
-                
-        except Exception as e:
-            logger.error(f"Erro no timer embed: {e}")
-            if reference_id in self.timer_tasks:
-                del self.timer_tasks[reference_id]
+            self.admin_messages.pop(reference_id, None)
+            await doacoes_pendentes.remover(reference_id)
+
+        agendador_prazos.agendar(chave_autodelete(reference_id), quando, apagar)
+
+    async def encerrar_anterior(self, reference_id: str):
+        """Encerra a doação anterior com o mesmo reference_id (um por usuário).
+
+        Reagendar substituiria os prazos dela em silêncio, deixando a DM
+        "pendente" e os botões ativos para sempre: aqui os botões dos admins
+        são desativados e as mensagens dela são apagadas na hora.
+        """
+        if not agendador_prazos.pendente(chave_autodelete(reference_id)):
+            return
+        logger.info(f"Nova doação com a referência {reference_id}: encerrando a anterior")
+        agendador_prazos.cancelar(chave_expiracao(reference_id))
+        admin_msg = await self.mensagem_admin(reference_id)
+        if admin_msg:
+            try:
+                await disable_admin_buttons(admin_msg)
+            except discord.HTTPException as e:
+                logger.error(f"Erro ao desativar botões da doação anterior {reference_id}: {e}")
+        await agendador_prazos.antecipar(chave_autodelete(reference_id))
 
     @commands.Cog.listener()
     async def on_interaction(self, interaction: discord.Interaction):
@@ -332,7 +431,14 @@ class DoarCommands(commands.Cog):
             return
 
         custom_id = interaction.data["custom_id"]
+        acao = next((prefixo for prefixo in ACOES_INTERACAO if custom_id.startswith(prefixo)), None)
+        if acao is None:
+            return
 
+        async with rastreador.rastrear(acao.rstrip("_"), self.qualified_name):
+            await self._tratar_interacao(interaction, custom_id)
+
+    async def _tratar_interacao(self, interaction: discord.Interaction, custom_id: str):
         # --- Usuário já pagou ---
         if custom_id.startswith("user_paid_"):
             reference_id = custom_id.replace("user_paid_", "")
@@ -344,78 +450,94 @@ class DoarCommands(commands.Cog):
         # --- Usuário cancelou ---
         elif custom_id.startswith("user_cancel_"):
             reference_id = custom_id.replace("user_cancel_", "")
-            if reference_id in self.timer_tasks:
-                self.timer_tasks[reference_id].cancel()
-            
+            agendador_prazos.cancelar(chave_expiracao(reference_id))
+
             await interaction.response.edit_message(
                 content="❌ Doação cancelada pelo usuário.",
                 view=None,
                 embed=None
             )
-            admin_msg = self.admin_messages.get(reference_id)
+            admin_msg = await self.mensagem_admin(reference_id)
             if admin_msg:
                 await disable_admin_buttons(admin_msg)
+            await doacoes_pendentes.marcar_resolvida(reference_id)
 
         # --- Admin confirma pagamento ---
         if custom_id.startswith("confirm_payment_"):
             reference_id = custom_id.replace("confirm_payment_", "")
-            message = interaction.message
-            if reference_id in self.timer_tasks:
-                self.timer_tasks[reference_id].cancel()
-            
-            embed = message.embeds[0]
+            agendador_prazos.cancelar(chave_expiracao(reference_id))
+
+            # A própria edição da mensagem dos admins é o ACK da interação
+            embed = interaction.message.embeds[0]
             embed.set_footer(text="✅ Pagamento confirmado")
-            await message.edit(embeds=[embed], view=None)
+            await interaction.response.edit_message(embeds=[embed], view=None)
 
-            with SessionLocal() as session:
-                apoiador = session.query(Apoiador).filter_by(id_pagamento=reference_id).first()
-                if apoiador:
-                    apoiador.ja_pago = True
-                    apoiador.ultimo_pagamento = get_brasilia_time()
-                    session.commit()
-
-                    # Atribui cargo padrão de apoiador
-                    logger.info(f"Atribuindo cargo padrão para {apoiador.discord_id} no servidor {apoiador.guild_id}")
-                    guild = self.bot.get_guild(int(apoiador.guild_id))
-                    if guild:
-                        member = guild.get_member(int(apoiador.discord_id))
-                        if member:
-                            # Atribui cargo padrão
-                            default_assigned = await self.role_manager.assign_default_supporter_role(member)
-                            # Atualiza cargos baseados no tempo
-                            time_updated = await self.role_manager.update_member_time_based_roles(member)
-
-                            if default_assigned or time_updated:
-                                logger.info(f"Cargos atribuídos/atualizados para {apoiador.discord_id}")
-                            else:
-                                logger.info(f"Nenhum cargo novo necessário para {apoiador.discord_id}")
+            # Apoiador pago e doação pendente resolvida na mesma transação
+            async with AsyncSessionLocal() as session:
+                async with session.begin():
+                    result = await session.execute(
+                        select(Apoiador).where(Apoiador.id_pagamento == reference_id)
+                    )
+                    apoiador = result.scalars().first()
+                    if apoiador:
+                        apoiador.ja_pago = True
+                        apoiador.ultimo_pagamento = get_brasilia_time()
+                        discord_id, guild_id = apoiador.discord_id, apoiador.guild_id
+                    await doacoes_pendentes.marcar_resolvida(reference_id, session=session)
+
+            cargos_aplicados = True
+            if apoiador:
+                # Atribui cargo padrão de apoiador
+                logger.info(f"Atribuindo cargo padrão para {discord_id} no servidor {guild_id}")
+                guild = self.bot.get_guild(int(guild_id))
+                if guild:
+                    try:
+                        member = await resolvedor_membros.resolver(guild, int(discord_id))
+                    except discord.HTTPException as e:
+                        # Pagamento já gravado: segue sem cargos e avisa o admin
+                        logger.error(f"Erro ao buscar membro: {e}")
+                        member = None
+                        cargos_aplicados = False
+                    if member:
+                        # Atribui cargo padrão
+                        default_assigned = await self.role_manager.assign_default_supporter_role(member)
+                        # Atualiza cargos baseados no tempo
+                        time_updated = await self.role_manager.update_member_time_based_roles(member)
+
+                        if default_assigned or time_updated:
+                            logger.info(f"Cargos atribuídos/atualizados para {discord_id}")
                         else:
-                            logger.error(f"Membro {apoiador.discord_id} não encontrado no servidor {apoiador.guild_id}")
-                    else:
-                        logger.error(f"Servidor {apoiador.guild_id} não encontrado")
-            admin_msg = self.admin_messages.get(reference_id)
-            if admin_msg:
+                            logger.info(f"Nenhum cargo novo necessário para {discord_id}")
+                    elif cargos_aplicados:
+                        logger.error(f"Membro {discord_id} não encontrado no servidor {guild_id}")
+                else:
+                    logger.error(f"Servidor {guild_id} não encontrado")
+
+            admin_msg = await self.mensagem_admin(reference_id)
+            if admin_msg and admin_msg.id != interaction.message.id:
                 await disable_admin_buttons(admin_msg)
 
-            await interaction.response.send_message(
-                f"✅ Pagamento confirmado para referência {reference_id}",
-                ephemeral=True
-            )
+            mensagem = f"✅ Pagamento confirmado para referência {reference_id}"
+            if not cargos_aplicados:
+                mensagem += "\n⚠️ Não foi possível buscar o membro no Discord: os cargos não foram aplicados."
+            await interaction.followup.send(mensagem, ephemeral=True)
 
         # --- Admin rejeita pagamento ---
         elif custom_id.startswith("reject_payment_"):
             reference_id = custom_id.replace("reject_payment_", "")
+            agendador_prazos.cancelar(chave_expiracao(reference_id))
+
+            # A própria edição da mensagem dos admins é o ACK da interação
             embed = interaction.message.embeds[0]
             embed.set_footer(text="❌ Pagamento rejeitado")
-            if reference_id in self.timer_tasks:
-                self.timer_tasks[reference_id].cancel()
-            await interaction.message.edit(embeds=[embed], view=None)
+            await interaction.response.edit_message(embeds=[embed], view=None)
 
-            admin_msg = self.admin_messages.get(reference_id)
-            if admin_msg:
+            admin_msg = await self.mensagem_admin(reference_id)
+            if admin_msg and admin_msg.id != interaction.message.id:
                 await disable_admin_buttons(admin_msg)
+            await doacoes_pendentes.marcar_resolvida(reference_id)
 
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"❌ Pagamento rejeitado para referência {reference_id}",
                 ephemeral=True
             )
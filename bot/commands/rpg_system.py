@@ -1,11 +1,13 @@
 from datetime import datetime
-import discord,logging,aiohttp
+from contextlib import aclosing
+import discord,logging
 from discord.ext import commands
 from typing import Dict
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy import select
+from bot.database import AsyncSessionLocal
 from bot.database.models import RPGSession, RPGCharacter, Base
 from bot.config import Config as app_config
+from bot.servicos.MensagemProgressiva import MensagemProgressiva
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +17,10 @@ class SistemaRPG(commands.Cog):
         self.api_key = app_config.DEEP_KEY
         self.log_channel_id = int(app_config.DONO_LOG_CHANNEL) if app_config.DONO_LOG_CHANNEL else None
         self.allowed_channel_id = int(app_config.QUARTO_DO_HUGME) if app_config.QUARTO_DO_HUGME else None
+        self.streaming = app_config.LLM_STREAMING
         
-        # Configuração do banco de dados
-        self.engine = create_async_engine(app_config.DATABASE_URL)
-        self.async_session = async_sessionmaker(
-            self.engine, expire_on_commit=False, class_=AsyncSession
-        )
+        # Banco de dados: usa o pool compartilhado do bot
+        self.async_session = AsyncSessionLocal
         #controle de limites
         self.summary_threshold = 15
         self.max_characters = 3
@@ -487,14 +487,19 @@ No final, apresente 2 a 3 opções de ação concretas para o jogador escolher,
 A resposta deve ter no máximo 3 parágrafos e ser coerente com a personalidade e habilidades do personagem.
 """
 
-        resposta = await self.chamar_api_rpg(prompt_inicial, sessao["history"])
+        cabecalho = f"🎮 **Aventura iniciada com {char['name']}!**\n\n"
+        if self.streaming:
+            resposta = await self.transmitir_api_rpg(ctx, cabecalho, prompt_inicial, sessao["history"])
+        else:
+            resposta = await self.chamar_api_rpg(prompt_inicial, sessao["history"], user_id=ctx.author.id)
         sessao["history"].extend([
             {"role": "system", "content": prompt_inicial},
             {"role": "assistant", "content": resposta}
         ])
 
         await self.atualizar_sessao_usuario(ctx.author.id, sessao)
-        await ctx.send(f"🎮 **Aventura iniciada com {char['name']}!**\n\n{resposta}")
+        if not self.streaming:
+            await ctx.send(f"{cabecalho}{resposta}")
 
     async def continuar_historia(self, ctx: commands.Context, sessao: Dict, acao_jogador: str):
         if not sessao["history"]:
@@ -503,15 +508,21 @@ A resposta deve ter no máximo 3 parágrafos e ser coerente com a personalidade
 
         sessao["history"].append({"role": "user", "content": acao_jogador})
         if self.precisa_criar_resumo(sessao):
-            await self.criar_resumo_automatico(sessao)
+            await self.criar_resumo_automatico(sessao, user_id=ctx.author.id)
         
         contexto = self.preparar_contexto(sessao)
 
-        resposta = await self.chamar_api_rpg("Continue a história com base na ação do jogador:", contexto)
+        cabecalho = "🎭 **Continuação da aventura**\n\n"
+        prompt = "Continue a história com base na ação do jogador:"
+        if self.streaming:
+            resposta = await self.transmitir_api_rpg(ctx, cabecalho, prompt, contexto)
+        else:
+            resposta = await self.chamar_api_rpg(prompt, contexto, user_id=ctx.author.id)
         sessao["history"].append({"role": "assistant", "content": resposta})
 
         await self.atualizar_sessao_usuario(ctx.author.id, sessao)
-        await ctx.send(f"🎭 **Continuação da aventura**\n\n{resposta}")
+        if not self.streaming:
+            await ctx.send(f"{cabecalho}{resposta}")
         
     # ---------------- SISTEMAS DE RESUMO ----------------
     def precisa_criar_resumo(self, sessao: Dict) -> bool:
@@ -526,7 +537,7 @@ A resposta deve ter no máximo 3 parágrafos e ser coerente com a personalidade
         contexto.extend(historico_recente)
         return contexto
 
-    async def criar_resumo_automatico(self, sessao: Dict):
+    async def criar_resumo_automatico(self, sessao: Dict, user_id: int | None = None):
         try:
             prompt_resumo = f"""
 RESUMIR HISTÓRIA DE RPG - IMPORTANTE: Você é um assistente que resume histórias de RPG.
@@ -542,7 +553,7 @@ Mantenha a essência emocional e os detalhes importantes. Use terceira pessoa.
 Histórico para resumir:
 {self.formatar_historico_para_resumo(sessao['history'])}
 """
-            resumo = await self.chamar_api_resumo(prompt_resumo)
+            resumo = await self.chamar_api_resumo(prompt_resumo, user_id=user_id)
             
             if resumo and not resumo.startswith("⚠️"):
                 historico_recente = sessao["history"][-4:]
@@ -564,60 +575,64 @@ Histórico para resumir:
                 formatted.append(f"{role}: {msg['content'][:200]}{'...' if len(msg['content']) > 200 else ''}")
         return "\n".join(formatted[-20:])
     
-    async def chamar_api_resumo(self, prompt: str) -> str:
-        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
-        data = {
-            "model": "deepseek-reasoner",
-            "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 200,
-            "temperature": 0.3  # Temperatura mais baixa para resumos mais consistentes
-        }
+    async def chamar_api_resumo(self, prompt: str, user_id: int | None = None) -> str:
+        mensagens = [{"role": "user", "content": prompt}]
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("https://api.deepseek.com/v1/chat/completions",
-                                        json=data, headers=headers,
-                                        timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                    resp.raise_for_status()
-                    resultado = await resp.json()
-                    if ("choices" in resultado and len(resultado["choices"]) > 0 and
-                        "message" in resultado["choices"][0] and "content" in resultado["choices"][0]["message"]):
-                        return resultado["choices"][0]["message"]["content"]
-                    else:
-                        logger.warning(f"Resposta inesperada da API de resumo: {resultado}")
-                        return "⚠️ Erro ao criar resumo"
+            # Temperatura mais baixa para resumos mais consistentes
+            return await self.bot.llm.chat(
+                mensagens, model="deepseek-reasoner", user_id=user_id,
+                timeout=30, max_tokens=200, temperature=0.3
+            )
+        except ValueError as e:
+            logger.warning(f"Resposta inesperada da API de resumo: {e}")
+            return "⚠️ Erro ao criar resumo"
         except Exception as e:
             logger.error(f"Erro na API de resumo: {str(e)}")
             return "⚠️ Erro ao criar resumo"
 
     # ---------------- API ----------------
-    async def chamar_api_rpg(self, prompt: str, history: list) -> str:
-        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+    async def chamar_api_rpg(self, prompt: str, history: list, user_id: int | None = None) -> str:
         system_prompt = "Você é um mestre de RPG de texto. Crie aventuras coerentes e ofereça opções. Máximo 3 parágrafos."
         mensagens = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": prompt}]
-        data = {"model": "deepseek-chat", "messages": mensagens, "max_tokens": 500, "temperature": 0.7}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post("https://api.deepseek.com/v1/chat/completions",
-                                        json=data, headers=headers,
-                                        timeout=aiohttp.ClientTimeout(total=30)) as resp:
-                    resp.raise_for_status()
-                    resultado = await resp.json()
-                    if ("choices" in resultado and len(resultado["choices"]) > 0 and
-                        "message" in resultado["choices"][0] and "content" in resultado["choices"][0]["message"]):
-                        return resultado["choices"][0]["message"]["content"]
-                    else:
-                        logger.warning(f"Resposta inesperada da API: {resultado}")
-                        return "⚠️ O mestre ficou em silêncio. Tente novamente!"
+            return await self.bot.llm.chat(
+                mensagens, model="deepseek-chat", user_id=user_id,
+                timeout=30, max_tokens=500, temperature=0.7
+            )
+        except ValueError as e:
+            logger.warning(f"Resposta inesperada da API: {e}")
+            return "⚠️ O mestre ficou em silêncio. Tente novamente!"
         except Exception as e:
             logger.error(f"Erro na API: {str(e)}")
             return "⚠️ O mestre não está respondendo. Tente novamente mais tarde."
 
-    # ---------------- COG CLEANUP ----------------
-    async def cog_unload(self):
-        """Fecha a conexão com o banco de dados quando o cog é descarregado"""
-        await self.engine.dispose()
+    async def transmitir_api_rpg(self, ctx: commands.Context, cabecalho: str, prompt: str, history: list) -> str:
+        """Versão em streaming de `chamar_api_rpg`: envia a resposta editando a mensagem aos poucos"""
+        system_prompt = "Você é um mestre de RPG de texto. Crie aventuras coerentes e ofereça opções. Máximo 3 parágrafos."
+        mensagens = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": prompt}]
+        mensagem = MensagemProgressiva(ctx.send, prefix=cabecalho)
+        texto = ""
+
+        try:
+            stream = self.bot.llm.stream_chat(
+                mensagens, model="deepseek-chat", user_id=ctx.author.id,
+                timeout=60, max_tokens=500, temperature=0.7
+            )
+            async with aclosing(stream):
+                async for trecho in stream:
+                    texto += trecho
+                    await mensagem.update(texto)
+        except Exception as e:
+            logger.error(f"Erro na API (streaming): {str(e)}")
+            if not texto:
+                texto = "⚠️ O mestre não está respondendo. Tente novamente mais tarde."
+
+        if not texto:
+            texto = "⚠️ O mestre ficou em silêncio. Tente novamente!"
+        await mensagem.finish(texto)
+        return texto
 
 # ---------------- SETUP ----------------
 async def setup(bot: commands.Bot):
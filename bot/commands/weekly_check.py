@@ -1,8 +1,11 @@
 import discord
 import logging
 import asyncio
+import time as time_module
 from discord.ext import commands, tasks
 from datetime import datetime, time, timezone, timedelta
+from bot.config import Config as app_config
+from bot.servicos.AgendadorServidores import AgendadorServidores
 from bot.servicos.SupporterRoleManager import SupporterRoleManager
 
 logger = logging.getLogger(__name__)
@@ -13,37 +16,41 @@ class WeeklyRoleCheck(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.role_manager = SupporterRoleManager(bot)
+        self.agendador = AgendadorServidores(
+            max_workers=app_config.WEEKLY_SYNC_WORKERS,
+            taxa=app_config.ROLE_EDIT_RATE,
+            capacidade=app_config.ROLE_EDIT_BURST,
+        )
+        self._lock = asyncio.Lock()
         self.weekly_check.start()
 
     def cog_unload(self):
         self.weekly_check.cancel()
 
+    async def _sync_guild(self, guild, balde):
+        return await self.role_manager.update_all_supporters_roles(guild, limiter=balde)
+
+    async def run_sync(self, progresso=None) -> list:
+        """Sincroniza todos os servidores em paralelo (uma execução por vez)"""
+        async with self._lock:
+            return await self.agendador.executar(self.bot.guilds, self._sync_guild, progresso=progresso)
+
     @tasks.loop(time=time(hour=9, minute=0, tzinfo=timezone.utc))  # Executa toda segunda-feira às 9:00 UTC
     async def weekly_check(self):
         """Executa checagem semanal de cargos de apoiadores"""
         logger.info("🔄 Iniciando checagem semanal de cargos de apoiadores...")
 
-        total_guilds = 0
-        total_processed = 0
-        total_updated = 0
-
-        for guild in self.bot.guilds:
-            try:
-                total_guilds += 1
-                result = await self.role_manager.update_all_supporters_roles(guild)
-
-                if "error" not in result:
-                    total_processed += result.get("total_processed", 0)
-                    total_updated += result.get("updated", 0)
-                    logger.info(f"✅ {guild.name}: {result.get('updated', 0)}/{result.get('total_processed', 0)} atualizados")
-                else:
-                    logger.error(f"❌ Erro em {guild.name}: {result['error']}")
+        def log_progress(guild, result, done, total):
+            if "error" not in result:
+                logger.info(f"✅ [{done}/{total}] {guild.name}: {result.get('updated', 0)}/{result.get('total_processed', 0)} atualizados")
+            else:
+                logger.error(f"❌ [{done}/{total}] Erro em {guild.name}: {result['error']}")
 
-            except Exception as e:
-                logger.error(f"Erro ao processar servidor {guild.name}: {e}")
-                continue
+        results = await self.run_sync(progresso=log_progress)
 
-        logger.info(f"🎯 Checagem semanal concluída: {total_updated}/{total_processed} membros atualizados em {total_guilds} servidores")
+        total_processed = sum(r.get("total_processed", 0) for _, r in results if "error" not in r)
+        total_updated = sum(r.get("updated", 0) for _, r in results if "error" not in r)
+        logger.info(f"🎯 Checagem semanal concluída: {total_updated}/{total_processed} membros atualizados em {len(results)} servidores")
 
     @commands.hybrid_command(name="weekly_check_now", description="[ADMIN] Executa checagem semanal de cargos manualmente")
     @commands.has_permissions(administrator=True)
@@ -51,6 +58,10 @@ class WeeklyRoleCheck(commands.Cog):
         """Executa checagem semanal manualmente (apenas admin)"""
         await ctx.defer(ephemeral=True)
 
+        if self._lock.locked():
+            await ctx.send("⏳ Já existe uma checagem em andamento. Tente novamente quando ela terminar.", ephemeral=True)
+            return
+
         try:
             embed = discord.Embed(
                 title="🔄 Executando Checagem Semanal",
@@ -60,34 +71,35 @@ class WeeklyRoleCheck(commands.Cog):
             )
             msg = await ctx.send(embed=embed, ephemeral=True)
 
-            total_guilds = 0
             total_processed = 0
             total_updated = 0
             results = []
+            last_edit = time_module.monotonic()
 
-            for guild in self.bot.guilds:
-                try:
-                    total_guilds += 1
-                    result = await self.role_manager.update_all_supporters_roles(guild)
+            async def report(guild, result, done, total):
+                nonlocal total_processed, total_updated, last_edit
+                if "error" not in result:
+                    processed = result.get("total_processed", 0)
+                    updated = result.get("updated", 0)
+                    total_processed += processed
+                    total_updated += updated
+                    results.append(f"✅ **{guild.name}**: {updated}/{processed} atualizados")
+                else:
+                    results.append(f"❌ **{guild.name}**: Erro - {result['error']}")
 
-                    if "error" not in result:
-                        processed = result.get("total_processed", 0)
-                        updated = result.get("updated", 0)
-                        total_processed += processed
-                        total_updated += updated
-                        results.append(f"✅ **{guild.name}**: {updated}/{processed} atualizados")
-                    else:
-                        results.append(f"❌ **{guild.name}**: Erro - {result['error']}")
+                # Atualiza o progresso no máximo a cada 2 segundos
+                if done < total and time_module.monotonic() - last_edit >= 2:
+                    last_edit = time_module.monotonic()
+                    embed.description = f"Atualizando cargos de apoiadores... **{done}/{total}** servidores"
+                    await msg.edit(embed=embed)
 
-                except Exception as e:
-                    results.append(f"❌ **{guild.name}**: Erro - {str(e)}")
-                    continue
+            await self.run_sync(progresso=report)
 
             embed.title = "✅ Checagem Semanal Concluída"
             embed.description = f"**Resultados:**\n" + "\n".join(results[:10])  # Limita a 10 resultados
             embed.add_field(
                 name="📊 Totais",
-                value=f"Servidores: {total_guilds}\nMembros processados: {total_processed}\nCargos atualizados: {total_updated}",
+                value=f"Servidores: {len(results)}\nMembros processados: {total_processed}\nCargos atualizados: {total_updated}",
                 inline=False
             )
 
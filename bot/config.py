@@ -7,6 +7,12 @@ class Config:
     # Configurações principais obrigatórias
     DISCORD_TOKEN = getenv('DISCORD_BOT_TOKEN')
     DATABASE_URL = getenv('DATABASE_URL')
+    DB_POOL_SIZE = int(getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_TIMEOUT = float(getenv('DB_POOL_TIMEOUT', 30))
+    DB_SYNC_POOL_SIZE = int(getenv('DB_SYNC_POOL_SIZE', 2))
+    DB_SLOW_QUERY_MS = float(getenv('DB_SLOW_QUERY_MS', 500))
     APPLICATION_ID = getenv('APPLICATION_ID')
     KOFI_TOKEN = getenv('KOFI_TOKEN')
     KOFI_ENDPOINT = getenv('KOFI_ENDPOINT')
@@ -14,6 +20,33 @@ class Config:
     DONO_LOG_CHANNEL = getenv('KOFI_LOG_CHANNEL_ID')
     DEEP_API = getenv('DEEP_API')
     DEEP_KEY = getenv('DEEP_KEY')
+
+    # Monitor do event loop
+    LOOP_LAG_INTERVAL = float(getenv('LOOP_LAG_INTERVAL', 0.5))
+    LOOP_BLOCK_THRESHOLD_MS = float(getenv('LOOP_BLOCK_THRESHOLD_MS', 250))
+    LOOP_BLOCK_DEBUG = getenv('LOOP_BLOCK_DEBUG', 'false').lower() == 'true'
+    LOOP_MONITOR_CHANNEL_ID = int(getenv('LOOP_MONITOR_CHANNEL_ID', 0))
+
+    # Envio em lote aos canais de log
+    LOG_FLUSH_INTERVAL = float(getenv('LOG_FLUSH_INTERVAL', 2))
+    LOG_QUEUE_MAX = int(getenv('LOG_QUEUE_MAX', 500))
+
+    # Janela deslizante do /perf, em segundos
+    PERF_WINDOW_SECONDS = float(getenv('PERF_WINDOW_SECONDS', 3600))
+
+    # Cache
+    GUILD_CONFIG_CACHE_TTL = float(getenv('GUILD_CONFIG_CACHE_TTL', 300))
+
+    # Checagem semanal de cargos
+    WEEKLY_SYNC_WORKERS = int(getenv('WEEKLY_SYNC_WORKERS', 4))
+    ROLE_EDIT_RATE = float(getenv('ROLE_EDIT_RATE', 5))
+    ROLE_EDIT_BURST = int(getenv('ROLE_EDIT_BURST', 10))
+
+    # LLM (Deepseek)
+    LLM_MAX_CONCURRENCY = int(getenv('LLM_MAX_CONCURRENCY', 4))
+    LLM_TIMEOUT = float(getenv('LLM_TIMEOUT', 60))
+    LLM_PER_USER_CONCURRENCY = int(getenv('LLM_PER_USER_CONCURRENCY', 1))
+    LLM_STREAMING = getenv('LLM_STREAMING', 'true').lower() == 'true'
     
     # Discord
     QUARTO_DO_HUGME = getenv('QUARTO_DO_HUGME')
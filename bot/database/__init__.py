@@ -1,15 +1,261 @@
-from sqlalchemy import create_engine
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from bot.config import config
+from bot.servicos.Metricas import metricas
+from bot.servicos.Rastreamento import rastreador
 
-# Configuração do banco de dados assíncrono
-async_engine = create_async_engine(
+logger = logging.getLogger(__name__)
+
+# Drivers equivalentes para quando a mesma URL é usada pelos dois engines
+DRIVERS_ASYNC = {
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+DRIVERS_SYNC = {
+    "mysql": "pymysql",
+    "mariadb": "pymysql",
+    "postgresql": "psycopg2",
+    "sqlite": "pysqlite",
+}
+
+
+def _url_com_driver(url: str, drivers: dict, manter: set):
+    """Troca o driver da URL pelo equivalente (async <-> sync), se necessário"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend in drivers and url.get_driver_name() not in manter:
+        url = url.set(drivername=f"{backend}+{drivers[backend]}")
+    return url
+
+
+# ---------------- INSTRUMENTAÇÃO ----------------
+
+class _PoolMedido:
+    """Mixin de pool que mede quanto tempo cada checkout esperou por uma conexão"""
+    nome_engine = ""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            metricas.incrementar("db_pool_checkout_timeouts_total", engine=self.nome_engine)
+            raise
+        finally:
+            metricas.observar("db_pool_checkout_wait_seconds", time.perf_counter() - inicio, engine=self.nome_engine)
+
+
+class PoolAssincronoMedido(_PoolMedido, AsyncAdaptedQueuePool):
+    nome_engine = "async"
+
+
+class PoolSincronoMedido(_PoolMedido, QueuePool):
+    nome_engine = "sync"
+
+
+class EstatisticasConsultas:
+    """Agrega latência por instrução SQL (texto normalizado) para achar as lentas.
+
+    Guarda no máximo `limite` instruções distintas; como o SQL é
+    parametrizado, o texto não inclui valores.
+    """
+
+    def __init__(self, limite: int = 500, lenta_ms: float = 500):
+        self.limite = limite
+        self.lenta_ms = lenta_ms
+        self._stats: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalizar(statement: str) -> str:
+        return re.sub(r"\s+", " ", statement).strip()[:300]
+
+    def registrar(self, engine: str, statement: str, duracao: float):
+        rastreador.registrar_span("db", duracao)
+        operacao = statement.lstrip().split(" ", 1)[0].upper() or "OUTRO"
+        if operacao not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+            operacao = "OUTRO"
+        metricas.observar("db_query_seconds", duracao, engine=engine, operacao=operacao)
+
+        texto = self.normalizar(statement)
+        with self._lock:
+            stats = self._stats.get(texto)
+            if stats is None and len(self._stats) < self.limite:
+                stats = self._stats[texto] = [0, 0.0, 0.0]
+            if stats is not None:
+                stats[0] += 1
+                stats[1] += duracao
+                stats[2] = max(stats[2], duracao)
+
+        if duracao * 1000 >= self.lenta_ms:
+            logger.warning(f"Consulta lenta ({duracao * 1000:.0f} ms): {texto}")
+
+    def mais_lentas(self, n: int = 10) -> list[dict]:
+        """Instruções com maior tempo total acumulado"""
+        with self._lock:
+            itens = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [
+            {"statement": texto, "count": count, "total_s": round(total, 4),
+             "avg_ms": round(total / count * 1000, 2), "max_ms": round(maximo * 1000, 2)}
+            for texto, (count, total, maximo) in itens
+        ]
+
+
+consultas = EstatisticasConsultas(lenta_ms=config.DB_SLOW_QUERY_MS)
+
+metricas.descrever("db_query_seconds", "Latência das instruções SQL por engine e operação")
+metricas.descrever("db_query_errors_total", "Instruções SQL que falharam")
+metricas.descrever("db_pool_checkout_wait_seconds", "Espera por uma conexão livre do pool")
+metricas.descrever("db_pool_checkout_timeouts_total", "Checkouts que estouraram o pool_timeout")
+
+
+def instrumentar_engine(engine, nome: str):
+    """Liga os eventos do SQLAlchemy que medem a latência de cada instrução"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_inicio_consultas", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        pilha = conn.info.get("_inicio_consultas")
+        if pilha:
+            consultas.registrar(nome, statement, time.perf_counter() - pilha.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _erro(contexto):
+        if contexto.connection is not None:
+            pilha = contexto.connection.info.get("_inicio_consultas")
+            if pilha:
+                pilha.pop()
+        metricas.incrementar("db_query_errors_total", engine=nome)
+
+
+class RegistroEngines:
+    """Registro único dos engines do banco, compartilhado por cogs e web app.
+
+    - Um único engine assíncrono (e um pool) para o bot inteiro.
+    - Um engine síncrono pequeno, criado só quando alguém realmente o usa.
+    - Tamanho, overflow e reciclagem dos pools vêm da configuração, para que
+      a soma dos pools caiba no `max_connections` do servidor.
+    """
+
+    def __init__(self, url: str, pool_size: int = 5, max_overflow: int = 10,
+                 pool_recycle: int = 1800, pool_timeout: float = 30,
+                 sync_pool_size: int = 2, sync_max_overflow: int = 2):
+        self.url = url
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.pool_timeout = pool_timeout
+        self.sync_pool_size = sync_pool_size
+        self.sync_max_overflow = sync_max_overflow
+        self._sync_engine = None
+
+        url_async = _url_com_driver(url, DRIVERS_ASYNC, set(DRIVERS_ASYNC.values()))
+        self.async_engine = create_async_engine(
+            url_async,
+            echo=False,  # Set to True for SQL query logging
+            pool_pre_ping=True,
+            **self._pool_kwargs(url_async, PoolAssincronoMedido, pool_size, max_overflow),
+        )
+        instrumentar_engine(self.async_engine.sync_engine, "async")
+        metricas.gauge("db_pool_connections", self._gauge_pool,
+                       "Conexões do pool por estado (checked_in, checked_out, overflow, size)")
+        metricas.gauge("db_pool_saturation", self._gauge_saturacao,
+                       "Fração das conexões possíveis (pool + overflow) em uso")
+
+    def _pool_kwargs(self, url, poolclass, pool_size: int, max_overflow: int) -> dict:
+        # SQLite usa pools próprios que não aceitam esses parâmetros
+        if url.get_backend_name() == "sqlite":
+            return {}
+        return {
+            "poolclass": poolclass,
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_recycle": self.pool_recycle,
+            "pool_timeout": self.pool_timeout,
+        }
+
+    @property
+    def sync_engine(self):
+        """Engine síncrono (legado), criado sob demanda"""
+        if self._sync_engine is None:
+            url_sync = _url_com_driver(self.url, DRIVERS_SYNC, set(DRIVERS_SYNC.values()))
+            self._sync_engine = create_engine(
+                url_sync,
+                echo=False,
+                pool_pre_ping=True,
+                **self._pool_kwargs(url_sync, PoolSincronoMedido, self.sync_pool_size, self.sync_max_overflow),
+            )
+            instrumentar_engine(self._sync_engine, "sync")
+        return self._sync_engine
+
+    def status(self) -> dict:
+        """Uso atual dos pools de conexões"""
+        pools = {"async": self.async_engine.pool}
+        if self._sync_engine is not None:
+            pools["sync"] = self._sync_engine.pool
+
+        status = {}
+        for nome, pool in pools.items():
+            info = {"pool": type(pool).__name__}
+            for metrica in ("size", "checkedin", "checkedout", "overflow"):
+                metodo = getattr(pool, metrica, None)
+                if callable(metodo):
+                    info[metrica] = metodo()
+            status[nome] = info
+        return status
+
+    def _gauge_pool(self) -> dict:
+        serie = {}
+        for engine, info in self.status().items():
+            for chave, estado in (("checkedin", "checked_in"), ("checkedout", "checked_out"),
+                                  ("overflow", "overflow"), ("size", "size")):
+                if chave in info:
+                    # O SQLAlchemy reporta overflow negativo enquanto o pool não enche
+                    valor = max(0, info[chave]) if chave == "overflow" else info[chave]
+                    serie[(("engine", engine), ("estado", estado))] = valor
+        return serie
+
+    def _gauge_saturacao(self) -> dict:
+        limites = {"async": self.pool_size + self.max_overflow,
+                   "sync": self.sync_pool_size + self.sync_max_overflow}
+        serie = {}
+        for engine, info in self.status().items():
+            if "checkedout" in info and limites[engine] > 0:
+                serie[(("engine", engine),)] = round(info["checkedout"] / limites[engine], 4)
+        return serie
+
+    async def dispose(self):
+        """Fecha todas as conexões dos pools"""
+        await self.async_engine.dispose()
+        if self._sync_engine is not None:
+            self._sync_engine.dispose()
+
+
+registro = RegistroEngines(
     config.DATABASE_URL,
-    echo=False,  # Set to True for SQL query logging
-    pool_pre_ping=True,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    sync_pool_size=config.DB_SYNC_POOL_SIZE,
 )
 
+# Configuração do banco de dados assíncrono
+async_engine = registro.async_engine
+
 # Factory para criar sessões assíncronas
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine,
@@ -17,20 +263,29 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
-# Configuração do banco de dados síncrono (para FastAPI)
-engine = create_engine(
-    config.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
-)
+
+class _SessionmakerSincrono(sessionmaker):
+    """sessionmaker que só cria o engine síncrono na primeira sessão"""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=registro.sync_engine)
+        return super().__call__(**local_kw)
+
 
 # Factory para criar sessões síncronas
-SessionLocal = sessionmaker(
-    bind=engine,
+SessionLocal = _SessionmakerSincrono(
     autocommit=False,
     autoflush=False,
 )
 
+
+def __getattr__(name):
+    # `engine` continua disponível para código legado, sem criar o pool síncrono no import
+    if name == "engine":
+        return registro.sync_engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Base declarativa para modelos
 class Base(DeclarativeBase):
     pass
@@ -41,4 +296,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
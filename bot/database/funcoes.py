@@ -0,0 +1,39 @@
+from sqlalchemy import Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class dias_entre(FunctionElement):
+    """Dias inteiros entre duas colunas de data/hora (`fim - inicio`), calculados no banco.
+
+    Compilado conforme o dialeto: `TIMESTAMPDIFF` no MySQL/MariaDB,
+    época em segundos no PostgreSQL e `julianday` no SQLite. Os valores são
+    comparados como estão gravados (mesma referência de fuso), então datas
+    sem timezone não precisam de ajuste.
+    """
+    type = Integer()
+    inherit_cache = True
+    name = "dias_entre"
+
+
+@compiles(dias_entre)
+def _dias_entre_padrao(element, compiler, **kw):
+    inicio, fim = list(element.clauses)
+    return "CAST(julianday(%s) - julianday(%s) AS INTEGER)" % (
+        compiler.process(fim, **kw), compiler.process(inicio, **kw)
+    )
+
+
+@compiles(dias_entre, "mysql")
+@compiles(dias_entre, "mariadb")
+def _dias_entre_mysql(element, compiler, **kw):
+    inicio, fim = list(element.clauses)
+    return "TIMESTAMPDIFF(DAY, %s, %s)" % (compiler.process(inicio, **kw), compiler.process(fim, **kw))
+
+
+@compiles(dias_entre, "postgresql")
+def _dias_entre_postgresql(element, compiler, **kw):
+    inicio, fim = list(element.clauses)
+    return "CAST(FLOOR(EXTRACT(EPOCH FROM (%s - %s)) / 86400) AS INTEGER)" % (
+        compiler.process(fim, **kw), compiler.process(inicio, **kw)
+    )
@@ -0,0 +1,131 @@
+"""Migrações versionadas do schema.
+
+Cada migração tem um número de versão crescente e uma função síncrona que
+recebe a conexão (executada via `run_sync`). As versões aplicadas ficam na
+tabela `schema_version`; `aplicar_migracoes` roda, em ordem, só as que
+ainda não foram registradas.
+
+As migrações devem ser idempotentes (`checkfirst`, inspeção do schema),
+porque um banco novo já nasce com o schema atual pelo `create_all`.
+
+Na inicialização (`inicializar_schema`) o `create_all` só roda quando o
+banco ainda não tem `schema_version` (instalação nova ou anterior às
+migrações). Em bancos já versionados, mudanças de schema — inclusive
+tabelas novas — precisam vir numa migração.
+"""
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.exc import DBAPIError
+
+from bot.database import Base
+from bot.database.models import Apoiador, DoacaoPendente
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("nome", String(100), nullable=False),
+    Column("aplicada_em", DateTime(timezone=True), nullable=False),
+)
+
+
+def _criar_indices(tabela, nomes):
+    """Cria os índices declarados no modelo que ainda não existem no banco"""
+    def migracao(conn):
+        existentes = {ix["name"] for ix in inspect(conn).get_indexes(tabela.name)}
+        for index in tabela.indexes:
+            if index.name in nomes and index.name not in existentes:
+                logger.info(f"Criando índice {index.name}")
+                index.create(conn)
+    return migracao
+
+
+def _criar_tabela(tabela):
+    """Cria uma tabela nova do modelo (no-op se ela já existe)"""
+    def migracao(conn):
+        tabela.create(conn, checkfirst=True)
+    return migracao
+
+
+# (versão, nome, função) — nunca altere uma migração já publicada, crie outra
+MIGRACOES = [
+    (1, "indices_apoiadores", _criar_indices(Apoiador.__table__, {
+        "ix_apoiadores_guild_ativo",
+        "ix_apoiadores_ativo_ultimo_pagamento",
+    })),
+    (2, "doacoes_pendentes", _criar_tabela(DoacaoPendente.__table__)),
+]
+
+VERSAO_ATUAL = max(versao for versao, _, _ in MIGRACOES)
+
+
+def versoes_aplicadas(conn) -> set[int]:
+    """Versões registradas em `schema_version` (conexão síncrona)"""
+    if not inspect(conn).has_table(schema_version.name):
+        return set()
+    return set(conn.execute(select(schema_version.c.version)).scalars())
+
+
+def _aplicar(conn) -> list[int]:
+    schema_version.create(conn, checkfirst=True)
+    aplicadas = versoes_aplicadas(conn)
+    novas = []
+    for versao, nome, migracao in sorted(MIGRACOES, key=lambda m: m[0]):
+        if versao in aplicadas:
+            continue
+        logger.info(f"Aplicando migração {versao}: {nome}")
+        migracao(conn)
+        conn.execute(schema_version.insert().values(
+            version=versao, nome=nome, aplicada_em=datetime.now(timezone.utc)
+        ))
+        novas.append(versao)
+    return novas
+
+
+async def aplicar_migracoes(engine) -> list[int]:
+    """Aplica as migrações pendentes numa única transação e retorna as versões novas"""
+    async with engine.begin() as conn:
+        novas = await conn.run_sync(_aplicar)
+    if novas:
+        logger.info(f"Migrações aplicadas: {novas} (schema na versão {VERSAO_ATUAL})")
+    return novas
+
+
+async def versao_do_banco(engine) -> int | None:
+    """Versão atual do schema, ou None se o banco ainda não é versionado.
+
+    Uma única consulta, sem inspecionar o schema.
+    """
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(func.max(schema_version.c.version)))
+            return result.scalar() or 0
+    except DBAPIError:
+        # Tabela schema_version inexistente (o erro exato varia por dialeto)
+        return None
+
+
+async def inicializar_schema(engine) -> list[int]:
+    """Deixa o banco no schema atual, fazendo o mínimo de trabalho possível.
+
+    - Banco já na versão atual: só a consulta de versão, nada de introspecção.
+    - Banco versionado mas atrasado: aplica as migrações pendentes.
+    - Banco sem `schema_version`: `create_all` e depois todas as migrações.
+    """
+    versao = await versao_do_banco(engine)
+    if versao is not None and versao >= VERSAO_ATUAL:
+        logger.info(f"Schema do banco na versão {versao}, nada a fazer")
+        return []
+
+    if versao is None:
+        logger.info("Banco sem schema_version: criando tabelas")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    return await aplicar_migracoes(engine)
@@ -1,6 +1,6 @@
 from bot.database import Base
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, DateTime, Boolean, JSON, Text
+from sqlalchemy import String, Integer, DateTime, Boolean, JSON, Text, Index
 from datetime import datetime, timezone
 
 class PixConfig(Base):
@@ -40,9 +40,43 @@ class Apoiador(Base):
     email_doador: Mapped[str | None] = mapped_column(String(100))
 
 
+    # Índices das consultas frequentes (criados em bancos existentes pela migração 1)
+    __table_args__ = (
+        # Sincronização semanal / estatísticas: WHERE guild_id = ? AND ativo GROUP BY discord_id
+        Index('ix_apoiadores_guild_ativo', 'guild_id', 'ativo', 'discord_id'),
+        # Dashboard: WHERE ativo AND ultimo_pagamento >= ?
+        Index('ix_apoiadores_ativo_ultimo_pagamento', 'ativo', 'ultimo_pagamento'),
+    )
+
     def __repr__(self) -> str:
         return f"<Apoiador(discord_id={self.discord_id}, nivel={self.nivel})>"
     
+class DoacaoPendente(Base):
+    """Doação Pix aguardando confirmação dos admins (sobrevive a reinícios do bot)"""
+    __tablename__ = 'doacoes_pendentes'
+
+    reference_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    discord_id: Mapped[str] = mapped_column(String(20), nullable=False)
+    guild_id: Mapped[str] = mapped_column(String(20), nullable=False)
+    valor_doacao: Mapped[int | None] = mapped_column(Integer)  # Em centavos
+    # Mensagem do usuário (DM); vazia quando a resposta foi efêmera
+    canal_usuario_id: Mapped[str | None] = mapped_column(String(20))
+    mensagem_usuario_id: Mapped[str | None] = mapped_column(String(20))
+    # Mensagem com os botões de confirmar/rejeitar no canal de logs
+    canal_admin_id: Mapped[str | None] = mapped_column(String(20))
+    mensagem_admin_id: Mapped[str | None] = mapped_column(String(20))
+    expira_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    apagar_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Confirmada, rejeitada, cancelada ou expirada; a linha some no auto-delete
+    resolvida: Mapped[bool] = mapped_column(Boolean, default=False)
+    criado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:
+        return f"<DoacaoPendente(reference_id={self.reference_id}, resolvida={self.resolvida})>"
+
+
 class RPGCharacter(Base):
     __tablename__ = 'rpg_characters'
     
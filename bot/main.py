@@ -1,12 +1,25 @@
+import asyncio
+import contextlib
 import discord
+import math
 import os
 import logging
-import threading
 import uvicorn
 from bot.config import Config as app_config
+from discord import app_commands
 from discord.ext import commands
-from bot.database import Base, AsyncSessionLocal, async_engine
+from bot.database import AsyncSessionLocal, async_engine, registro
 from bot.database.models import Apoiador
+from bot.database.migrations import inicializar_schema
+from bot.servicos.AgendadorPrazos import agendador_prazos
+from bot.servicos.CachePixConfig import cache_pix_config
+from bot.servicos.CanalLogs import canal_logs
+from bot.servicos.LLMGateway import LLMGateway
+from bot.servicos.IndiceCargos import indice_cargos
+from bot.servicos.Metricas import metricas
+from bot.servicos.MonitorLoop import monitor_loop
+from bot.servicos.Rastreamento import cog_do_comando, rastreador
+from bot.servicos.ResolvedorDiscord import resolvedor_canais, resolvedor_membros
 from bot.shared import set_bot_instance
 from sqlalchemy import select
 
@@ -39,11 +52,41 @@ class DatabaseManager:
 
 # Função async para criar as tabelas
 async def init_db():
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await inicializar_schema(async_engine)
     logger.info("Tabelas do banco inicializadas")
 
 
+class ServidorWeb(uvicorn.Server):
+    """Servidor uvicorn que roda como task no loop do bot.
+
+    Não instala handlers de sinal: o discord.py continua dono do Ctrl+C e
+    encerra o servidor pelo `HugMeBot.close`.
+    """
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        yield
+
+    def install_signal_handlers(self):
+        pass
+
+
+class ArvoreComandos(app_commands.CommandTree):
+    """CommandTree que abre o rastro de todo comando slash (inclusive os híbridos)"""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        command = interaction.command
+        if command is not None:
+            interaction.extras["rastro"] = rastreador.iniciar(
+                command.qualified_name, cog_do_comando(command), "slash"
+            )
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        rastreador.finalizar(interaction.extras.get("rastro"), "erro")
+        await super().on_error(interaction, error)
+
+
 class HugMeBot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.all()
@@ -53,26 +96,94 @@ class HugMeBot(commands.Bot):
             application_id=os.getenv('APPLICATION_ID'),
             help_command=None,
             activity=discord.Game(name="Ajudando a comunidade"),
-            allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True)
+            allowed_mentions=discord.AllowedMentions(everyone=False, roles=False, users=True),
+            tree_cls=ArvoreComandos,
+            http_trace=rastreador.trace_config(),
         )
         self.db = DatabaseManager()
-        self.web_thread = None
+        self.llm = LLMGateway(
+            app_config.DEEP_KEY,
+            max_concurrency=app_config.LLM_MAX_CONCURRENCY,
+            timeout=app_config.LLM_TIMEOUT,
+            per_user_limit=app_config.LLM_PER_USER_CONCURRENCY,
+        )
+        self.web_server = None
+        self.web_task = None
+        self.monitor_loop = monitor_loop
+        self.monitor_loop.notificar = self._avisar_bloqueio_loop
+        self.before_invoke(self._iniciar_rastro)
+        self.after_invoke(self._finalizar_rastro)
+
+        metricas.gauge("discord_gateway_latency_seconds", self._latencia_gateway,
+                       "Latência do heartbeat do gateway do Discord")
+        metricas.gauge("discord_guilds", lambda: len(self.guilds), "Servidores em que o bot está")
+
+    def _latencia_gateway(self):
+        # `latency` é inf/nan enquanto não houve heartbeat
+        return self.latency if math.isfinite(self.latency) else None
+
+    async def _avisar_bloqueio_loop(self, relatorio: dict):
+        """Envia ao canal de monitoramento o relatório de um bloqueio do event loop"""
+        channel_id = app_config.LOOP_MONITOR_CHANNEL_ID
+        if not channel_id:
+            return
+        channel = await resolvedor_canais.resolver(self, channel_id)
+        if channel is None:
+            return
+        embed = discord.Embed(
+            title="🐢 Event loop bloqueado",
+            description=f"O loop ficou parado por **{relatorio['duracao_s'] * 1000:.0f} ms**.",
+            color=discord.Color.orange(),
+        )
+        if relatorio["pilha"]:
+            embed.add_field(name="Pilha no momento do bloqueio",
+                            value=f"```py\n{relatorio['pilha'][-1000:]}\n```", inline=False)
+        else:
+            embed.set_footer(text="Ative LOOP_BLOCK_DEBUG para capturar a pilha")
+        await channel.send(embed=embed)
+
+    async def _iniciar_rastro(self, ctx: commands.Context):
+        # Nos híbridos via slash o rastro já foi aberto pelo interaction_check
+        ctx.rastro = rastreador.atual() if ctx.interaction else None
+        if ctx.rastro is None or ctx.rastro.finalizado:
+            ctx.rastro = rastreador.iniciar(ctx.command.qualified_name, cog_do_comando(ctx.command), "prefix")
+
+    async def _finalizar_rastro(self, ctx: commands.Context):
+        rastreador.finalizar(getattr(ctx, "rastro", None), "erro" if ctx.command_failed else "ok")
 
     def start_web_server(self):
-        """Inicia o servidor web em uma thread separada"""
-        def run_web():
-            uvicorn.run("bot.web.main:app", host="0.0.0.0", port=26173, reload=False)
+        """Inicia o servidor web como uma task no próprio event loop do bot.
 
-        self.web_thread = threading.Thread(target=run_web, daemon=True)
-        self.web_thread.start()
+        Assim os handlers do FastAPI chamam objetos do discord.py no loop
+        correto e compartilham o mesmo pool do `async_engine`.
+        """
+        config = uvicorn.Config("bot.web.main:app", host="0.0.0.0", port=26173, reload=False)
+        self.web_server = ServidorWeb(config)
+        self.web_task = asyncio.create_task(self._serve_web())
         logger.info("Servidor web iniciado na porta 26173")
 
+    async def _serve_web(self):
+        try:
+            await self.web_server.serve()
+        except (Exception, SystemExit) as e:
+            # uvicorn chama sys.exit se não conseguir abrir a porta; não derruba o bot
+            logger.error(f"Servidor web encerrado com erro: {e!r}")
+            logger.error("O bot continuará funcionando sem o servidor web")
+
     async def setup_hook(self):
         """Configurações iniciais quando o bot está inicializando"""
         try:
+            self.monitor_loop.iniciar()
+
             # Inicializa o banco de dados async
             await init_db()
 
+            # Configuração PIX em memória; os painéis de admin atualizam o cache ao gravar
+            try:
+                await cache_pix_config.carregar()
+            except Exception as e:
+                logger.error(f"Erro ao carregar configuração PIX: {e}")
+
             # Carrega todos os cogs e pacotes de comandos
             for entry in os.listdir('./bot/commands'):
                 if entry.startswith('_'):
@@ -114,15 +225,64 @@ class HugMeBot(commands.Bot):
         except Exception as e:
             logger.error(f"Erro ao carregar extensões/setup_hook: {e}")
 
+    async def close(self):
+        """Encerra o servidor web e o pool HTTP do LLM antes de desconectar"""
+        if self.web_server and self.web_task and not self.web_task.done():
+            self.web_server.should_exit = True
+            try:
+                await asyncio.wait_for(self.web_task, timeout=10)
+            except asyncio.TimeoutError:
+                self.web_task.cancel()
+        await self.llm.close()
+        await self.monitor_loop.parar()
+        await agendador_prazos.parar()
+        await canal_logs.parar()
+        await super().close()
+        await registro.dispose()
+
     async def on_ready(self):
+        # Novo READY substitui o cache do gateway; eventos perdidos no intervalo deixariam o índice errado
+        indice_cargos.descartar()
         logger.info(f'Bot conectado como {self.user}')
         logger.info(f'Comandos disponíveis: {[cmd.name for cmd in self.commands]}')
 
     async def on_member_join(self, member):
         logger.info(f"Novo membro: {member.display_name}")
+        resolvedor_membros.invalidar(member.guild.id, member.id)
+        indice_cargos.membro_entrou(member)
+
+    async def on_member_remove(self, member):
+        indice_cargos.membro_saiu(member)
+
+    async def on_member_update(self, before, after):
+        indice_cargos.membro_atualizado(before, after)
+
+    async def on_guild_role_delete(self, role):
+        indice_cargos.cargo_removido(role)
+
+    async def on_guild_available(self, guild):
+        indice_cargos.descartar(guild.id)
+
+    async def on_guild_remove(self, guild):
+        indice_cargos.descartar(guild.id)
+        for channel in guild.channels:
+            resolvedor_canais.invalidar(channel.id)
+
+    async def on_guild_channel_delete(self, channel):
+        resolvedor_canais.invalidar(channel.id)
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        rastreador.finalizar(interaction.extras.get("rastro"), "ok")
 
     async def on_command_error(self, ctx: commands.Context, error):
         logger.error(f"Erro no comando {ctx.command}: {error}")
+        rastro = getattr(ctx, "rastro", None) or (ctx.interaction.extras.get("rastro") if ctx.interaction else None)
+        if rastro is not None:
+            rastreador.finalizar(rastro, "erro")
+        elif ctx.command is not None:
+            # Falhou antes do before_invoke (checagens, conversão de argumentos)
+            rastreador.contar_falha(ctx.command.qualified_name, cog_do_comando(ctx.command),
+                                    "slash" if ctx.interaction else "prefix")
 
         try:
             # Interação slash: verifica se ainda pode responder
@@ -0,0 +1,139 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class _Prazo:
+    __slots__ = ("quando", "seq", "chave", "callback", "cancelado")
+
+    def __init__(self, quando: float, seq: int, chave: str, callback):
+        self.quando = quando
+        self.seq = seq
+        self.chave = chave
+        self.callback = callback
+        self.cancelado = False
+
+    def __lt__(self, outro: "_Prazo") -> bool:
+        return (self.quando, self.seq) < (outro.quando, outro.seq)
+
+
+class AgendadorPrazos:
+    """Agendador central de prazos: uma única task dorme até o próximo vencimento.
+
+    Os prazos ficam num heap ordenado pelo horário (epoch, para sobreviver a
+    reinícios quando persistidos); agendar ou cancelar custa O(log n) e não
+    existe polling — a task só acorda no vencimento ou quando chega um
+    prazo mais cedo que o atual. Cada chave tem no máximo um prazo:
+    reagendar substitui o anterior. Cancelamentos são preguiçosos (a
+    entrada é marcada e descartada quando chega ao topo do heap).
+
+    Os callbacks (corrotinas sem argumentos) rodam em tasks próprias, para
+    que um callback lento não atrase os demais vencimentos.
+    """
+
+    def __init__(self):
+        self._heap: list[_Prazo] = []
+        self._prazos: dict[str, _Prazo] = {}
+        self._seq = itertools.count()
+        self._acordar: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._callbacks: set[asyncio.Task] = set()
+
+    def agendar(self, chave: str, quando: datetime | float, callback):
+        """Agenda `callback()` para `quando` (datetime com fuso ou timestamp epoch)"""
+        if isinstance(quando, datetime):
+            quando = quando.timestamp()
+        self.cancelar(chave)
+        prazo = _Prazo(quando, next(self._seq), chave, callback)
+        self._prazos[chave] = prazo
+        heapq.heappush(self._heap, prazo)
+
+        self._iniciar()
+        if self._heap[0] is prazo:
+            self._acordar.set()
+
+    def cancelar(self, chave: str) -> bool:
+        """Cancela o prazo da chave; retorna False se não havia prazo pendente"""
+        prazo = self._prazos.pop(chave, None)
+        if prazo is None:
+            return False
+        prazo.cancelado = True
+        return True
+
+    async def antecipar(self, chave: str) -> bool:
+        """Roda agora o callback do prazo da chave (e o tira da fila).
+
+        Retorna False se não havia prazo pendente. Erros do callback são
+        registrados no log, como num vencimento normal.
+        """
+        prazo = self._prazos.pop(chave, None)
+        if prazo is None:
+            return False
+        prazo.cancelado = True
+        await self._rodar(prazo)
+        return True
+
+    def pendente(self, chave: str) -> bool:
+        return chave in self._prazos
+
+    def vencimento(self, chave: str) -> float | None:
+        prazo = self._prazos.get(chave)
+        return prazo.quando if prazo else None
+
+    def __len__(self) -> int:
+        return len(self._prazos)
+
+    def _iniciar(self):
+        # Também recria a task se o loop mudou (ex.: testes, reinício do cliente)
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._acordar = asyncio.Event()
+            self._task = asyncio.create_task(self._executar())
+
+    async def _executar(self):
+        while True:
+            while self._heap and self._heap[0].cancelado:
+                heapq.heappop(self._heap)
+
+            espera = None
+            if self._heap:
+                espera = self._heap[0].quando - time.time()
+                if espera <= 0:
+                    self._disparar(heapq.heappop(self._heap))
+                    continue
+
+            self._acordar.clear()
+            try:
+                await asyncio.wait_for(self._acordar.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    def _disparar(self, prazo: _Prazo):
+        self._prazos.pop(prazo.chave, None)
+        task = asyncio.create_task(self._rodar(prazo))
+        self._callbacks.add(task)
+        task.add_done_callback(self._callbacks.discard)
+
+    async def _rodar(self, prazo: _Prazo):
+        try:
+            await prazo.callback()
+        except Exception as e:
+            logger.error(f"Erro no prazo {prazo.chave}: {e}")
+
+    async def parar(self):
+        """Para a task do agendador (os prazos pendentes não disparam mais)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instância compartilhada por todo o bot
+agendador_prazos = AgendadorPrazos()
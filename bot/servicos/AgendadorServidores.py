@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BaldeTokens:
+    """Token bucket assíncrono: até `capacidade` operações de uma vez,
+    reabastecendo `taxa` tokens por segundo.
+
+    Quem espera é atendido em ordem de chegada; a chamada à API em si
+    acontece fora do lock, então a latência de várias chamadas se sobrepõe.
+    """
+
+    def __init__(self, taxa: float, capacidade: int):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._tokens = float(capacidade)
+        self._atualizado = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    async def consumir(self, quantidade: int = 1):
+        quantidade = min(quantidade, self.capacidade)
+        async with self._lock:
+            while True:
+                self._reabastecer()
+                if self._tokens >= quantidade:
+                    self._tokens -= quantidade
+                    return
+                await asyncio.sleep((quantidade - self._tokens) / self.taxa)
+
+
+class AgendadorServidores:
+    """Processa vários servidores em paralelo com um pool limitado de workers.
+
+    Cada servidor tem seu próprio `BaldeTokens` (os limites de edição de
+    cargos do Discord são por servidor), repassado para a tarefa, e cada
+    resultado é entregue ao callback `progresso` assim que fica pronto.
+    """
+
+    def __init__(self, max_workers: int = 4, taxa: float = 5.0, capacidade: int = 10):
+        self.max_workers = max_workers
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._baldes: dict[int, BaldeTokens] = {}
+
+    def balde(self, guild_id: int) -> BaldeTokens:
+        """Balde do servidor (mantido entre execuções para respeitar o limite)"""
+        balde = self._baldes.get(guild_id)
+        if balde is None:
+            balde = self._baldes[guild_id] = BaldeTokens(self.taxa, self.capacidade)
+        return balde
+
+    async def executar(self, guilds, tarefa, progresso=None) -> list:
+        """Executa `tarefa(guild, balde)` para cada servidor.
+
+        Retorna pares (guild, resultado) na ordem de conclusão; exceções viram
+        `{"error": ...}`. `progresso(guild, resultado, concluidos, total)` pode
+        ser síncrono ou corrotina.
+        """
+        guilds = list(guilds)
+        fila: asyncio.Queue = asyncio.Queue()
+        for guild in guilds:
+            fila.put_nowait(guild)
+
+        resultados = []
+
+        async def worker():
+            while True:
+                try:
+                    guild = fila.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    resultado = await tarefa(guild, self.balde(guild.id))
+                except Exception as e:
+                    logger.error(f"Erro ao processar servidor {guild.name}: {e}")
+                    resultado = {"error": str(e)}
+
+                resultados.append((guild, resultado))
+                if progresso:
+                    try:
+                        retorno = progresso(guild, resultado, len(resultados), len(guilds))
+                        if asyncio.iscoroutine(retorno):
+                            await retorno
+                    except Exception as e:
+                        logger.warning(f"Erro ao reportar progresso: {e}")
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_workers, len(guilds)))))
+        return resultados
@@ -0,0 +1,124 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from bot.config import Config as app_config
+from bot.database import AsyncSessionLocal
+from bot.database.models import GuildConfig
+
+logger = logging.getLogger(__name__)
+
+UNIDADES_EM_DIAS = {
+    'days': 1, 'd': 1,
+    'weeks': 7, 'w': 7,
+    'months': 30, 'm': 30,  # Aproximação
+    'years': 365, 'y': 365,  # Aproximação
+}
+
+
+def converter_para_dias(threshold: int, unit: str) -> int:
+    """Converte um threshold para dias baseado na unidade"""
+    fator = UNIDADES_EM_DIAS.get(unit)
+    if fator is None:
+        logger.warning(f"Unidade de tempo desconhecida: {unit}, assumindo dias")
+        return threshold
+    return threshold * fator
+
+
+@dataclass(frozen=True)
+class FaixaTempo:
+    """Uma entrada de `GuildConfig.cargos_tempo` já convertida"""
+    threshold: int
+    unit: str
+    role_id: int
+    dias: int
+
+
+def analisar_cargos_tempo(cargos_tempo) -> tuple[FaixaTempo, ...]:
+    """Converte `cargos_tempo` em faixas ordenadas da maior para a menor.
+
+    A ordenação é estável, então em caso de empate vale a ordem configurada.
+    Entradas com role_id inválido são ignoradas.
+    """
+    if not isinstance(cargos_tempo, list):
+        return ()
+
+    faixas = []
+    for item in cargos_tempo:
+        try:
+            role_id = int(item.get('role_id'))
+        except (AttributeError, TypeError, ValueError):
+            logger.warning(f"Cargo por tempo inválido ignorado: {item}")
+            continue
+        threshold = item.get('threshold', 0)
+        unit = item.get('unit', 'days')
+        faixas.append(FaixaTempo(threshold, unit, role_id, converter_para_dias(threshold, unit)))
+
+    return tuple(sorted(faixas, key=lambda f: f.dias, reverse=True))
+
+
+def faixas_tempo(config) -> tuple[FaixaTempo, ...]:
+    """Faixas de uma configuração; usa as pré-calculadas pelo cache quando existirem"""
+    if config is None:
+        return ()
+    faixas = getattr(config, '__dict__', {}).get('_faixas_tempo')
+    if faixas is None:
+        faixas = analisar_cargos_tempo(config.cargos_tempo)
+    return faixas
+
+
+class CacheGuildConfig:
+    """Cache em memória das configurações de servidor (`guild_configs`).
+
+    As configurações mudam raramente (só pelos painéis de admin), mas são
+    lidas várias vezes por membro em cada atualização de cargos. Cada entrada
+    vale por `ttl` segundos e é invalidada explicitamente quando um painel
+    grava; servidores sem configuração também ficam em cache.
+
+    Os objetos devolvidos são compartilhados: trate-os como somente leitura
+    e copie listas/dicionários antes de alterá-los.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entradas: dict[str, tuple[float, GuildConfig | None]] = {}
+        self._geracoes: dict[str, int] = {}
+
+    async def obter(self, guild_id, session_factory=AsyncSessionLocal) -> GuildConfig | None:
+        """Retorna a configuração do servidor, indo ao banco só se a entrada expirou"""
+        guild_id = str(guild_id)
+        entrada = self._entradas.get(guild_id)
+        if entrada and entrada[0] > time.monotonic():
+            return entrada[1]
+
+        geracao = self._geracoes.get(guild_id, 0)
+        async with session_factory() as session:
+            result = await session.execute(
+                select(GuildConfig).where(GuildConfig.guild_id == guild_id)
+            )
+            config = result.scalars().first()
+
+        if config is not None:
+            config._faixas_tempo = analisar_cargos_tempo(config.cargos_tempo)
+
+        # Se houve gravação durante a consulta, o resultado pode estar velho: não guarda
+        if self._geracoes.get(guild_id, 0) == geracao:
+            self._entradas[guild_id] = (time.monotonic() + self.ttl, config)
+        return config
+
+    def invalidar(self, guild_id=None):
+        """Descarta a entrada de um servidor (ou todas, sem argumento)"""
+        if guild_id is None:
+            for chave in list(self._geracoes) + list(self._entradas):
+                self._geracoes[chave] = self._geracoes.get(chave, 0) + 1
+            self._entradas.clear()
+            return
+        guild_id = str(guild_id)
+        self._geracoes[guild_id] = self._geracoes.get(guild_id, 0) + 1
+        self._entradas.pop(guild_id, None)
+
+
+# Instância compartilhada por todo o bot
+cache_guild_config = CacheGuildConfig(ttl=app_config.GUILD_CONFIG_CACHE_TTL)
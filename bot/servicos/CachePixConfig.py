@@ -0,0 +1,89 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+
+from bot.database import AsyncSessionLocal
+from bot.database.models import PixConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PixConfigSnapshot:
+    """Cópia imutável da linha de `pix_config`"""
+    chave: str
+    static_qr_url: str | None
+    nome_titular: str
+    cidade: str
+    atualizado_em: datetime | None
+    atualizado_por: str | None
+
+    @classmethod
+    def de_modelo(cls, config: PixConfig) -> "PixConfigSnapshot":
+        return cls(
+            chave=config.chave,
+            static_qr_url=config.static_qr_url,
+            nome_titular=config.nome_titular,
+            cidade=config.cidade,
+            atualizado_em=config.atualizado_em,
+            atualizado_por=config.atualizado_por,
+        )
+
+
+class CachePixConfig:
+    """Cache da configuração PIX (tabela de uma linha só).
+
+    Carregado na inicialização do bot e atualizado apenas pelos painéis de
+    admin que gravam a configuração (`definir`), então as leituras — modal de
+    doação, /pix_config, dashboard — não vão ao banco. A ausência de
+    configuração também fica em cache.
+    """
+
+    def __init__(self):
+        self._snapshot: PixConfigSnapshot | None = None
+        self._carregado = False
+        self._geracao = 0
+
+    @property
+    def carregado(self) -> bool:
+        return self._carregado
+
+    async def carregar(self, session_factory=AsyncSessionLocal) -> PixConfigSnapshot | None:
+        """Lê a configuração do banco e substitui o snapshot"""
+        geracao = self._geracao
+        async with session_factory() as session:
+            result = await session.execute(select(PixConfig).limit(1))
+            config = result.scalars().first()
+
+        snapshot = PixConfigSnapshot.de_modelo(config) if config is not None else None
+        # Se um painel gravou durante a consulta, o valor dele é mais novo: não sobrescreve
+        if self._geracao == geracao:
+            self._snapshot = snapshot
+            self._carregado = True
+        return self._snapshot if self._carregado else snapshot
+
+    async def obter(self, session_factory=AsyncSessionLocal) -> PixConfigSnapshot | None:
+        """Snapshot atual; só consulta o banco se o cache ainda não foi carregado"""
+        if self._carregado:
+            return self._snapshot
+        return await self.carregar(session_factory)
+
+    def definir(self, config: PixConfig | None):
+        """Atualiza o cache depois de uma gravação já commitada (None = removida)"""
+        self._geracao += 1
+        self._snapshot = PixConfigSnapshot.de_modelo(config) if config is not None else None
+        self._carregado = True
+        logger.info("Cache da configuração PIX atualizado" if config is not None
+                    else "Cache da configuração PIX limpo")
+
+    def invalidar(self):
+        """Descarta o snapshot; a próxima leitura volta ao banco"""
+        self._geracao += 1
+        self._snapshot = None
+        self._carregado = False
+
+
+# Instância compartilhada por todo o bot
+cache_pix_config = CachePixConfig()
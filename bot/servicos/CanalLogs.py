@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import deque
+
+import discord
+
+from bot.config import Config as app_config
+from bot.servicos.Metricas import metricas
+from bot.servicos.ResolvedorDiscord import resolvedor_canais
+
+logger = logging.getLogger(__name__)
+
+# Limites do Discord por mensagem
+MAX_EMBEDS_MENSAGEM = 10
+MAX_CARACTERES_EMBEDS = 6000
+
+metricas.descrever("log_sink_embeds_total", "Embeds de log enviados aos canais de log")
+metricas.descrever("log_sink_messages_total", "Mensagens enviadas pelo sink de logs (cada uma com até 10 embeds)")
+metricas.descrever("log_sink_dropped_total", "Embeds de log descartados, por motivo")
+
+
+class CanalLogs:
+    """Envio em lote de embeds para canais de log.
+
+    `enfileirar` só coloca o embed numa fila em memória e retorna na hora;
+    uma task em segundo plano agrupa os embeds de cada canal em mensagens de
+    até 10 embeds (e 6000 caracteres, o limite do Discord). A fila é
+    esvaziada `intervalo` segundos depois do primeiro embed pendente, ou
+    antes disso quando algum canal já tem uma mensagem cheia.
+
+    Com a fila lotada (`max_fila` embeds) os novos embeds são descartados,
+    e falhas de envio descartam o lote: logs nunca seguram quem os gerou.
+    Os descartes ficam em `descartados` e no contador `log_sink_dropped_total`.
+    """
+
+    def __init__(self, intervalo: float = 2.0, max_fila: int = 500):
+        self.intervalo = intervalo
+        self.max_fila = max_fila
+        self.descartados: dict[str, int] = {}
+        self._filas: dict[int, deque[discord.Embed]] = {}
+        self._total = 0
+        self._bot = None
+        self._pendente: asyncio.Event | None = None
+        self._cheio: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._parando = False
+
+    def enfileirar(self, bot, channel_id, embed: discord.Embed) -> bool:
+        """Agenda o envio do embed; retorna False se ele foi descartado"""
+        if not channel_id:
+            return False
+        if self._total >= self.max_fila:
+            self._descartar("fila_cheia")
+            return False
+
+        self._bot = bot
+        fila = self._filas.setdefault(int(channel_id), deque())
+        fila.append(embed)
+        self._total += 1
+
+        self._iniciar()
+        self._pendente.set()
+        if len(fila) >= MAX_EMBEDS_MENSAGEM:
+            self._cheio.set()
+        return True
+
+    def __len__(self) -> int:
+        return self._total
+
+    def _descartar(self, motivo: str, quantidade: int = 1):
+        self.descartados[motivo] = self.descartados.get(motivo, 0) + quantidade
+        metricas.incrementar("log_sink_dropped_total", quantidade, motivo=motivo)
+
+    def _iniciar(self):
+        # Também recria a task se o loop mudou (ex.: testes, reinício do cliente)
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._pendente = asyncio.Event()
+            self._cheio = asyncio.Event()
+            self._task = asyncio.create_task(self._executar())
+
+    async def _executar(self):
+        while not self._parando:
+            await self._pendente.wait()
+            try:
+                await asyncio.wait_for(self._cheio.wait(), timeout=self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self._pendente.clear()
+            self._cheio.clear()
+            await self.esvaziar()
+
+    @staticmethod
+    def _proximo_lote(fila: deque) -> list[discord.Embed]:
+        lote, caracteres = [], 0
+        while fila and len(lote) < MAX_EMBEDS_MENSAGEM:
+            tamanho = len(fila[0])
+            if lote and caracteres + tamanho > MAX_CARACTERES_EMBEDS:
+                break
+            lote.append(fila.popleft())
+            caracteres += tamanho
+        return lote
+
+    async def esvaziar(self):
+        """Envia agora tudo o que está na fila"""
+        for channel_id in list(self._filas):
+            fila = self._filas[channel_id]
+            while fila:
+                lote = self._proximo_lote(fila)
+                self._total -= len(lote)
+                await self._enviar(channel_id, lote)
+            if not fila:
+                self._filas.pop(channel_id, None)
+
+    async def _enviar(self, channel_id: int, lote: list[discord.Embed]):
+        try:
+            channel = await resolvedor_canais.resolver(self._bot, channel_id)
+            if channel is None:
+                self._descartar("canal_inexistente", len(lote))
+                return
+            await channel.send(embeds=lote)
+        except Exception as e:
+            logger.error(f"Erro ao enviar {len(lote)} logs ao canal {channel_id}: {e}")
+            self._descartar("erro_envio", len(lote))
+            return
+        metricas.incrementar("log_sink_messages_total")
+        metricas.incrementar("log_sink_embeds_total", len(lote))
+
+    async def parar(self):
+        """Envia o que restou na fila e para a task de envio"""
+        task = self._task
+        if task is not None and not task.done():
+            if task.get_loop() is asyncio.get_running_loop():
+                # Acorda a task em vez de cancelá-la: um lote já tirado da fila termina de ser enviado
+                self._parando = True
+                self._pendente.set()
+                self._cheio.set()
+                try:
+                    await task
+                finally:
+                    self._parando = False
+            else:
+                task.cancel()
+        self._task = None
+        if self._total:
+            await self.esvaziar()
+
+
+# Instância compartilhada por todo o bot
+canal_logs = CanalLogs(intervalo=app_config.LOG_FLUSH_INTERVAL, max_fila=app_config.LOG_QUEUE_MAX)
+metricas.gauge("log_sink_queued", lambda: len(canal_logs), "Embeds de log aguardando envio")
@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select, update
+
+from bot.database import AsyncSessionLocal
+from bot.database.models import DoacaoPendente
+
+logger = logging.getLogger(__name__)
+
+
+def como_utc(momento: datetime) -> datetime:
+    """O MySQL devolve DATETIME sem fuso; os horários são gravados em UTC"""
+    if momento.tzinfo is None:
+        return momento.replace(tzinfo=timezone.utc)
+    return momento
+
+
+class DoacoesPendentes:
+    """Persistência das doações Pix aguardando confirmação.
+
+    Guarda os IDs das mensagens (do usuário e dos admins) e os prazos de
+    expiração e auto-delete, para que o bot reagende tudo depois de um
+    reinício e busque as mensagens só quando precisar delas.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def salvar(self, pendente: DoacaoPendente):
+        """Grava (ou substitui, para o mesmo reference_id) uma doação pendente"""
+        async with self.session_factory() as session:
+            await session.merge(pendente)
+            await session.commit()
+
+    async def obter(self, reference_id: str) -> DoacaoPendente | None:
+        async with self.session_factory() as session:
+            return await session.get(DoacaoPendente, reference_id)
+
+    async def listar(self) -> list[DoacaoPendente]:
+        """Todas as doações ainda registradas (resolvidas ou não)"""
+        async with self.session_factory() as session:
+            result = await session.execute(select(DoacaoPendente))
+            return list(result.scalars().all())
+
+    async def marcar_resolvida(self, reference_id: str, session=None):
+        """Marca a doação como resolvida; com `session`, entra na transação de quem chamou"""
+        stmt = (
+            update(DoacaoPendente)
+            .where(DoacaoPendente.reference_id == reference_id)
+            .values(resolvida=True)
+        )
+        if session is not None:
+            await session.execute(stmt)
+            return
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def remover(self, reference_id: str):
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(DoacaoPendente).where(DoacaoPendente.reference_id == reference_id)
+            )
+            await session.commit()
+
+
+# Instância compartilhada por todo o bot
+doacoes_pendentes = DoacoesPendentes()
@@ -0,0 +1,98 @@
+import re
+import unicodedata
+from typing import NamedTuple
+
+_ESPACOS = re.compile(rb"\s+")
+
+
+def normalizar(texto: str) -> bytes:
+    """Texto em ASCII minúsculo e sem acentos, para comparar com as palavras-chave.
+
+    A decomposição NFKD separa os acentos das letras ("ã" -> "a" + "~") e o
+    encode descarta tudo que não é ASCII: os acentos e também emojis ou
+    outros alfabetos, que não aparecem nas palavras-chave.
+    """
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").lower()
+
+
+def _regex_trie(palavras) -> bytes:
+    """Alternação em forma de trie: prefixos comuns são testados uma vez só.
+
+    Numa palavra que é prefixo de outra, a continuação é opcional e gulosa,
+    então em cada posição a regex casa com a palavra mais longa possível.
+    """
+    trie: dict = {}
+    for palavra in palavras:
+        no = trie
+        for letra in palavra.decode("ascii"):
+            no = no.setdefault(letra, {})
+        no[""] = {}
+
+    def montar(no) -> str:
+        ramos = [
+            (r"\s+" if letra == " " else re.escape(letra)) + montar(filho)
+            for letra, filho in sorted(no.items()) if letra
+        ]
+        if not ramos:
+            return ""
+        padrao = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        return f"(?:{padrao})?" if "" in no else padrao
+
+    return montar(trie).encode("ascii")
+
+
+class Classificacao(NamedTuple):
+    crise: bool
+    sensivel: bool
+
+
+class FiltroSafeguard:
+    """Classifica um texto como crise e/ou tópico sensível numa única varredura.
+
+    As palavras-chave das duas listas viram uma única regex (uma trie de
+    alternações, compilada uma vez) aplicada ao texto normalizado: sem
+    acentos, sem diferença de caixa e com qualquer sequência de espaços
+    entre as palavras ("nao quero" também pega "NÃO  quero"). A busca
+    continua sendo por substring, como o `keyword in texto` de antes.
+
+    Cada posição do texto reporta só a palavra mais longa que começa nela,
+    por isso cada palavra herda as categorias das palavras contidas nela:
+    se "me torturar" casa, "tortura" também casaria.
+    """
+
+    def __init__(self, sensiveis, crise):
+        categorias: dict[bytes, set[str]] = {}
+        for palavras, categoria in ((sensiveis, "sensivel"), (crise, "crise")):
+            for palavra in palavras:
+                chave = _ESPACOS.sub(b" ", normalizar(palavra)).strip()
+                if chave:
+                    categorias.setdefault(chave, set()).add(categoria)
+
+        self._categorias = {
+            palavra: Classificacao(
+                crise=any("crise" in cats for outra, cats in categorias.items() if outra in palavra),
+                sensivel=any("sensivel" in cats for outra, cats in categorias.items() if outra in palavra),
+            )
+            for palavra in categorias
+        }
+        self._regex = re.compile(_regex_trie(self._categorias)) if self._categorias else None
+        # Quantos caracteres do texto já verificado reler ao checar só o trecho novo
+        # (folga para acentos decompostos e espaços extras dentro de uma palavra-chave)
+        self.sobreposicao = 4 * max(map(len, self._categorias), default=0)
+
+    def classificar(self, texto: str) -> Classificacao:
+        if self._regex is None:
+            return Classificacao(False, False)
+
+        normalizado = normalizar(texto)
+        crise = sensivel = False
+        match = self._regex.search(normalizado)
+        while match:
+            categorias = self._categorias[_ESPACOS.sub(b" ", match.group())]
+            crise = crise or categorias.crise
+            sensivel = sensivel or categorias.sensivel
+            if crise and sensivel:
+                break
+            # Recomeça na posição seguinte (e não no fim do match) para achar sobreposições
+            match = self._regex.search(normalizado, match.start() + 1)
+        return Classificacao(crise, sensivel)
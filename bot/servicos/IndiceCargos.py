@@ -0,0 +1,79 @@
+import logging
+from collections import Counter
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class IndiceCargos:
+    """Índice cargo -> quantidade de membros, mantido pelos eventos do gateway.
+
+    O índice de um servidor é montado uma única vez (na primeira consulta,
+    com a lista de membros já completa) e depois só recebe deltas de
+    entrada, saída e alteração de membros, então contar os membros de um
+    cargo custa O(1) em vez de varrer o servidor inteiro. Quando a sessão do
+    gateway é refeita (novo READY, servidor disponível de novo) os eventos
+    do intervalo se perdem: o bot descarta o índice e ele é remontado.
+    """
+
+    def __init__(self):
+        self._contagens: dict[int, Counter] = {}
+
+    def _construir(self, guild: discord.Guild) -> Counter | None:
+        contagem = self._contagens.get(guild.id)
+        if contagem is not None:
+            return contagem
+        # Sem a lista completa de membros o índice nasceria errado
+        if not guild.chunked:
+            return None
+        contagem = Counter()
+        for member in guild.members:
+            contagem.update(role.id for role in member.roles)
+        self._contagens[guild.id] = contagem
+        logger.info(f"Índice de cargos montado para {guild.name}: {len(contagem)} cargos")
+        return contagem
+
+    def contar(self, guild: discord.Guild, role: discord.Role) -> int:
+        """Quantidade de membros com o cargo"""
+        contagem = self._construir(guild)
+        if contagem is None:
+            return len(role.members)
+        return contagem.get(role.id, 0)
+
+    def membro_entrou(self, member: discord.Member):
+        contagem = self._contagens.get(member.guild.id)
+        if contagem is not None:
+            contagem.update(role.id for role in member.roles)
+
+    def membro_saiu(self, member: discord.Member):
+        contagem = self._contagens.get(member.guild.id)
+        if contagem is not None:
+            contagem.subtract(role.id for role in member.roles)
+
+    def membro_atualizado(self, antes: discord.Member, depois: discord.Member):
+        contagem = self._contagens.get(depois.guild.id)
+        if contagem is None:
+            return
+        cargos_antes = {role.id for role in antes.roles}
+        cargos_depois = {role.id for role in depois.roles}
+        if cargos_antes == cargos_depois:
+            return
+        contagem.subtract(cargos_antes - cargos_depois)
+        contagem.update(cargos_depois - cargos_antes)
+
+    def cargo_removido(self, role: discord.Role):
+        contagem = self._contagens.get(role.guild.id)
+        if contagem is not None:
+            contagem.pop(role.id, None)
+
+    def descartar(self, guild_id: int | None = None):
+        """Esquece o índice de um servidor (ex.: o bot saiu dele), ou todos sem argumento"""
+        if guild_id is None:
+            self._contagens.clear()
+            return
+        self._contagens.pop(guild_id, None)
+
+
+# Instância compartilhada por todo o bot
+indice_cargos = IndiceCargos()
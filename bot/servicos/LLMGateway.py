@@ -0,0 +1,250 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+
+import aiohttp
+
+from bot.servicos.Metricas import metricas
+from bot.servicos.Rastreamento import rastreador
+
+logger = logging.getLogger(__name__)
+
+DEEPSEEK_CHAT_URL = "https://api.deepseek.com/v1/chat/completions"
+
+# Completions costumam levar segundos; buckets até o timeout padrão
+BUCKETS_LLM = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+metricas.descrever("llm_request_seconds", "Duração das completions (sem a espera na fila)")
+metricas.descrever("llm_queue_wait_seconds", "Espera por uma vaga na fila justa do LLM")
+metricas.descrever("llm_first_token_seconds", "Tempo até o primeiro trecho nas completions em streaming")
+metricas.descrever("llm_tokens_total", "Tokens consumidos, conforme o campo usage da API")
+
+
+def _registrar_uso(modelo: str, uso: dict | None):
+    for campo, tipo in (("prompt_tokens", "prompt"), ("completion_tokens", "completion")):
+        if uso and isinstance(uso.get(campo), int):
+            metricas.incrementar("llm_tokens_total", uso[campo], modelo=modelo, tipo=tipo)
+
+
+class FilaJusta:
+    """Semáforo global que distribui as vagas em round-robin entre usuários.
+
+    Cada usuário tem sua própria fila FIFO e no máximo `per_user_limit`
+    chamadas em andamento; quando uma vaga abre, ela vai para o próximo
+    usuário da rodada, então quem dispara várias ações seguidas no RPG não
+    passa na frente de quem mandou uma única mensagem.
+    """
+
+    def __init__(self, max_concurrency: int, per_user_limit: int = 1):
+        self.max_concurrency = max_concurrency
+        self.per_user_limit = per_user_limit
+        self._active = 0
+        self._active_by_user: dict = {}
+        self._waiting: OrderedDict = OrderedDict()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(fila) for fila in self._waiting.values())
+
+    async def acquire(self, user_key):
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(user_key, deque()).append(fut)
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # A vaga foi concedida, mas a tarefa foi cancelada antes de usá-la
+                self.release(user_key)
+            else:
+                self._discard(user_key, fut)
+            raise
+
+    def release(self, user_key):
+        self._active -= 1
+        restantes = self._active_by_user.get(user_key, 1) - 1
+        if restantes > 0:
+            self._active_by_user[user_key] = restantes
+        else:
+            self._active_by_user.pop(user_key, None)
+        self._dispatch()
+
+    def _discard(self, user_key, fut):
+        fila = self._waiting.get(user_key)
+        if fila is None:
+            return
+        try:
+            fila.remove(fut)
+        except ValueError:
+            pass
+        if not fila:
+            del self._waiting[user_key]
+
+    def _dispatch(self):
+        while self._active < self.max_concurrency:
+            proximo = next(
+                (key for key in self._waiting if self._active_by_user.get(key, 0) < self.per_user_limit),
+                None,
+            )
+            if proximo is None:
+                return
+
+            # Remove e reinsere no fim: o usuário volta para o final da rodada
+            fila = self._waiting.pop(proximo)
+            fut = fila.popleft()
+            if fila:
+                self._waiting[proximo] = fila
+            if fut.done():
+                continue
+
+            self._active += 1
+            self._active_by_user[proximo] = self._active_by_user.get(proximo, 0) + 1
+            fut.set_result(None)
+
+
+class LLMGateway:
+    """Gateway compartilhado para a API de chat do Deepseek.
+
+    Mantém uma única `aiohttp.ClientSession` (pool de conexões keep-alive)
+    para o bot inteiro, usada tanto pelo chat quanto pelo RPG, e passa cada
+    completion por uma `FilaJusta`: limite global de concorrência e ordem
+    justa entre usuários, de forma que uma resposta lenta nunca bloqueie o
+    event loop nem monopolize a API.
+    """
+
+    def __init__(self, api_key: str, max_concurrency: int = 4, timeout: float = 60.0,
+                 pool_size: int = 20, per_user_limit: int = 1):
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=10)
+        self.pool_size = pool_size
+        self.fila = FilaJusta(max_concurrency, per_user_limit=per_user_limit)
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Cria a sessão sob demanda (precisa de um loop em execução)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+            )
+        return self._session
+
+    async def chat(self, messages: list, model: str = "deepseek-chat", user_id: int | None = None,
+                   timeout: float | None = None, **params) -> str:
+        """Envia uma completion e retorna o conteúdo da primeira escolha.
+
+        `user_id` identifica o usuário na fila justa; chamadas sem usuário
+        recebem uma chave própria e só respeitam o limite global.
+
+        Levanta `aiohttp.ClientError`/`asyncio.TimeoutError` em falhas de rede
+        e `ValueError` se a API responder num formato inesperado.
+        """
+        payload = {"model": model, "messages": messages, **params}
+        request_kwargs = {"json": payload}
+        if timeout is not None:
+            request_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        user_key = user_id if user_id is not None else object()
+        espera = time.perf_counter()
+        await self.fila.acquire(user_key)
+        inicio = time.perf_counter()
+        metricas.observar("llm_queue_wait_seconds", inicio - espera, modelo=model)
+        status = "erro"
+        try:
+            session = self._get_session()
+            async with session.post(DEEPSEEK_CHAT_URL, **request_kwargs) as resp:
+                resp.raise_for_status()
+                resultado = await resp.json()
+            status = "ok"
+        finally:
+            self.fila.release(user_key)
+            duracao = time.perf_counter() - inicio
+            rastreador.registrar_span("llm", duracao)
+            metricas.observar("llm_request_seconds", duracao, buckets=BUCKETS_LLM,
+                              modelo=model, modo="chat", status=status)
+
+        if isinstance(resultado, dict):
+            _registrar_uso(model, resultado.get("usage"))
+        try:
+            return resultado["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"Resposta inesperada da API: {resultado}")
+
+    async def stream_chat(self, messages: list, model: str = "deepseek-chat", user_id: int | None = None,
+                          timeout: float | None = None, **params):
+        """Versão em streaming (SSE) de `chat`: gera os trechos de texto conforme chegam.
+
+        A vaga na fila justa fica ocupada até o stream terminar ou o gerador
+        ser fechado, então consuma com `contextlib.aclosing` ao interromper.
+        """
+        payload = {"model": model, "messages": messages, "stream": True,
+                   "stream_options": {"include_usage": True}, **params}
+        request_kwargs = {"json": payload}
+        if timeout is not None:
+            request_kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        user_key = user_id if user_id is not None else object()
+        espera = time.perf_counter()
+        await self.fila.acquire(user_key)
+        inicio = time.perf_counter()
+        metricas.observar("llm_queue_wait_seconds", inicio - espera, modelo=model)
+        primeiro_trecho = True
+        status = "erro"
+        try:
+            session = self._get_session()
+            async with session.post(DEEPSEEK_CHAT_URL, **request_kwargs) as resp:
+                resp.raise_for_status()
+                async for linha in resp.content:
+                    linha = linha.strip()
+                    if not linha.startswith(b"data:"):
+                        continue
+                    dados = linha[5:].strip()
+                    if dados == b"[DONE]":
+                        break
+                    try:
+                        evento = json.loads(dados)
+                    except ValueError:
+                        logger.warning(f"Evento SSE inválido ignorado: {dados[:100]!r}")
+                        continue
+                    # Com include_usage, o último evento traz o uso e nenhuma escolha
+                    _registrar_uso(model, evento.get("usage"))
+                    for escolha in evento.get("choices") or []:
+                        trecho = (escolha.get("delta") or {}).get("content")
+                        if trecho:
+                            if primeiro_trecho:
+                                primeiro_trecho = False
+                                metricas.observar("llm_first_token_seconds", time.perf_counter() - inicio,
+                                                  buckets=BUCKETS_LLM, modelo=model)
+                            yield trecho
+            status = "ok"
+        except GeneratorExit:
+            # Consumidor fechou o gerador antes do fim (ex.: mensagem apagada)
+            status = "interrompido"
+            raise
+        finally:
+            self.fila.release(user_key)
+            duracao = time.perf_counter() - inicio
+            rastreador.registrar_span("llm", duracao)
+            metricas.observar("llm_request_seconds", duracao, buckets=BUCKETS_LLM,
+                              modelo=model, modo="stream", status=status)
+
+    async def close(self):
+        """Fecha o pool de conexões"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,66 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+class MensagemProgressiva:
+    """Mostra um texto gerado em streaming editando mensagens do Discord.
+
+    A primeira mensagem sai assim que há `primeiro_bloco` caracteres; depois
+    as edições são agrupadas em no máximo uma a cada `intervalo` segundos,
+    bem abaixo do limite de edições por canal. Textos maiores que o limite
+    do Discord continuam em novas mensagens.
+
+    `send` é qualquer corrotina no formato de `Messageable.send`
+    (`channel.send`, `ctx.send`, ...) que retorne a mensagem enviada.
+    """
+
+    def __init__(self, send, prefix: str = "", intervalo: float = 1.5,
+                 primeiro_bloco: int = 24, limite: int = DISCORD_MESSAGE_LIMIT):
+        self.send = send
+        self.prefix = prefix
+        self.intervalo = intervalo
+        self.primeiro_bloco = primeiro_bloco
+        self.limite = limite
+        self.mensagens = []
+        self._conteudos = []
+        self._ultima_edicao = 0.0
+
+    async def update(self, texto: str):
+        """Atualiza com o texto acumulado até agora (edição agrupada)"""
+        if not self.mensagens and len(texto) < self.primeiro_bloco:
+            return
+        if self.mensagens and time.monotonic() - self._ultima_edicao < self.intervalo:
+            return
+        await self._render(texto)
+
+    async def finish(self, texto: str):
+        """Mostra o texto final, ignorando o intervalo entre edições"""
+        await self._render(texto)
+
+    async def _render(self, texto: str):
+        completo = f"{self.prefix}{texto}"
+        blocos = [completo[i:i + self.limite] for i in range(0, len(completo), self.limite)] or [completo]
+
+        for indice, bloco in enumerate(blocos):
+            if indice < len(self.mensagens):
+                if self._conteudos[indice] != bloco:
+                    await self.mensagens[indice].edit(content=bloco)
+                    self._conteudos[indice] = bloco
+            else:
+                self.mensagens.append(await self.send(bloco))
+                self._conteudos.append(bloco)
+
+        # Se o texto encolheu (ex.: substituído pelo safeguard), limpa as sobras
+        while len(self.mensagens) > len(blocos):
+            mensagem = self.mensagens.pop()
+            self._conteudos.pop()
+            try:
+                await mensagem.delete()
+            except Exception as e:
+                logger.warning(f"Não foi possível apagar mensagem excedente: {e}")
+
+        self._ultima_edicao = time.monotonic()
@@ -0,0 +1,211 @@
+import bisect
+import math
+import threading
+import time
+
+# Limites (em segundos) dos buckets padrão de latência
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histograma:
+    """Histograma cumulativo de buckets fixos (mesmo modelo do Prometheus).
+
+    `observar` é O(log buckets) e thread-safe, porque o pool síncrono do
+    SQLAlchemy pode registrar de outras threads.
+    """
+
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = tuple(sorted(buckets))
+        self._contagens = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self.total = 0
+        self.soma = 0.0
+        self.maximo = 0.0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float):
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            self._contagens[indice] += 1
+            self.total += 1
+            self.soma += valor
+            if valor > self.maximo:
+                self.maximo = valor
+
+    def cumulativo(self) -> list[tuple[float, int]]:
+        """Pares (limite, observações <= limite), terminando em +Inf"""
+        acumulado = 0
+        pares = []
+        for limite, contagem in zip(self.buckets + (float("inf"),), self._contagens):
+            acumulado += contagem
+            pares.append((limite, acumulado))
+        return pares
+
+    def quantil(self, q: float) -> float:
+        """Estimativa do quantil `q` (limite superior do bucket, ou o máximo)"""
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        for limite, acumulado in self.cumulativo():
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def resumo(self) -> dict:
+        return {
+            "count": self.total,
+            "sum": round(self.soma, 6),
+            "avg": round(self.soma / self.total, 6) if self.total else 0.0,
+            "p50": self.quantil(0.5),
+            "p95": self.quantil(0.95),
+            "p99": self.quantil(0.99),
+            "max": round(self.maximo, 6),
+        }
+
+
+def _chave(nome: str, labels: dict) -> tuple:
+    return (nome, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+def _valor_prometheus(valor) -> str:
+    if isinstance(valor, bool):
+        return str(int(valor))
+    if isinstance(valor, int):
+        return str(valor)
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    if math.isnan(valor):
+        return "NaN"
+    return repr(float(valor))
+
+
+def _labels_prometheus(labels) -> str:
+    if not labels:
+        return ""
+    pares = []
+    for nome, valor in labels:
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pares.append(f'{nome}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+
+class RegistroMetricas:
+    """Registro em memória de contadores, histogramas e gauges do processo.
+
+    Gauges são funções avaliadas na hora da leitura (ex.: uso do pool), então
+    não há nada para manter atualizado.
+    """
+
+    def __init__(self):
+        self._contadores: dict[tuple, float] = {}
+        self._histogramas: dict[tuple, Histograma] = {}
+        self._gauges: dict[str, callable] = {}
+        self._descricoes: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.iniciado_em = time.time()
+
+    def descrever(self, nome: str, descricao: str):
+        self._descricoes[nome] = descricao
+
+    def incrementar(self, nome: str, valor: float = 1, **labels):
+        chave = _chave(nome, labels)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def histograma(self, nome: str, buckets=BUCKETS_LATENCIA, **labels) -> Histograma:
+        chave = _chave(nome, labels)
+        histograma = self._histogramas.get(chave)
+        if histograma is None:
+            with self._lock:
+                histograma = self._histogramas.setdefault(chave, Histograma(buckets))
+        return histograma
+
+    def observar(self, nome: str, valor: float, buckets=BUCKETS_LATENCIA, **labels):
+        self.histograma(nome, buckets, **labels).observar(valor)
+
+    def gauge(self, nome: str, funcao, descricao: str = ""):
+        """Registra uma função que retorna {labels(tuple): valor} ou um número"""
+        self._gauges[nome] = funcao
+        if descricao:
+            self.descrever(nome, descricao)
+
+    def contadores(self) -> dict[tuple, float]:
+        with self._lock:
+            return dict(self._contadores)
+
+    def histogramas(self) -> dict[tuple, Histograma]:
+        with self._lock:
+            return dict(self._histogramas)
+
+    def gauges(self) -> dict[str, dict]:
+        valores = {}
+        for nome, funcao in list(self._gauges.items()):
+            try:
+                valor = funcao()
+            except Exception:
+                continue
+            valores[nome] = valor if isinstance(valor, dict) else {(): valor}
+        return valores
+
+    def snapshot(self) -> dict:
+        """Visão em JSON de todas as métricas"""
+        def rotulo(nome, labels):
+            if not labels:
+                return nome
+            return nome + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+        return {
+            "uptime_seconds": round(time.time() - self.iniciado_em, 1),
+            "counters": {rotulo(n, l): v for (n, l), v in self.contadores().items()},
+            "histograms": {rotulo(n, l): h.resumo() for (n, l), h in self.histogramas().items()},
+            "gauges": {
+                rotulo(nome, labels): valor
+                for nome, serie in self.gauges().items()
+                for labels, valor in serie.items()
+            },
+        }
+
+    def exportar_prometheus(self) -> str:
+        """Todas as métricas no formato texto do Prometheus (versão 0.0.4)"""
+        linhas = []
+
+        def cabecalho(nome, tipo):
+            if nome in self._descricoes:
+                descricao = self._descricoes[nome].replace("\\", "\\\\").replace("\n", "\\n")
+                linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+
+        def agrupar(itens):
+            grupos = {}
+            for (nome, labels), valor in sorted(itens, key=lambda item: item[0]):
+                grupos.setdefault(nome, []).append((labels, valor))
+            return grupos
+
+        for nome, series in agrupar(self.contadores().items()).items():
+            cabecalho(nome, "counter")
+            for labels, valor in series:
+                linhas.append(f"{nome}{_labels_prometheus(labels)} {_valor_prometheus(valor)}")
+
+        for nome, series in agrupar(self.histogramas().items()).items():
+            cabecalho(nome, "histogram")
+            for labels, histograma in series:
+                with histograma._lock:
+                    cumulativo = histograma.cumulativo()
+                    soma, total = histograma.soma, histograma.total
+                for limite, acumulado in cumulativo:
+                    rotulos = _labels_prometheus(labels + (("le", _valor_prometheus(limite)),))
+                    linhas.append(f"{nome}_bucket{rotulos} {acumulado}")
+                linhas.append(f"{nome}_sum{_labels_prometheus(labels)} {_valor_prometheus(soma)}")
+                linhas.append(f"{nome}_count{_labels_prometheus(labels)} {total}")
+
+        for nome, serie in sorted(self.gauges().items()):
+            cabecalho(nome, "gauge")
+            for labels, valor in sorted(serie.items()):
+                if valor is None:
+                    continue
+                linhas.append(f"{nome}{_labels_prometheus(labels)} {_valor_prometheus(valor)}")
+
+        return "\n".join(linhas) + "\n"
+
+
+# Instância compartilhada por todo o processo (bot + web)
+metricas = RegistroMetricas()
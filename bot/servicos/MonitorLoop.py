@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from bot.config import Config as app_config
+from bot.servicos.Metricas import metricas
+
+logger = logging.getLogger(__name__)
+
+# Buckets do atraso do loop: de 1 ms (normal) até vários segundos (gateway travado)
+BUCKETS_ATRASO = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+metricas.descrever("event_loop_lag_seconds", "Atraso do event loop em relação ao sleep agendado")
+metricas.descrever("event_loop_blocks_total", "Amostras em que o event loop ficou bloqueado acima do limite")
+
+
+class MonitorLoop:
+    """Mede o atraso (lag) do event loop dormindo em intervalos fixos.
+
+    Cada amostra é quanto o `asyncio.sleep(intervalo)` acordou depois do
+    previsto: se algum callback segurou o loop, o atraso aparece aqui.
+    Atrasos acima de `limite_bloqueio` contam como bloqueio.
+
+    Com `capturar_pilhas` (modo debug), uma thread vigia as batidas do loop
+    e, quando ele para por mais que o limite, tira a pilha da thread do
+    loop naquele instante — ou seja, do código síncrono que está segurando
+    o loop (ex.: `requests.post`, sessão síncrona do banco).
+    """
+
+    def __init__(self, intervalo: float = 0.5, limite_bloqueio: float = 0.25,
+                 capturar_pilhas: bool = False, intervalo_avisos: float = 60, historico: int = 20):
+        self.intervalo = intervalo
+        self.limite_bloqueio = limite_bloqueio
+        self.capturar_pilhas = capturar_pilhas
+        self.intervalo_avisos = intervalo_avisos
+        self.ultimo_atraso = 0.0
+        self.maior_atraso = 0.0
+        self.bloqueios: deque[dict] = deque(maxlen=historico)
+        self.notificar = None  # async (relatorio) -> None, ex.: enviar ao canal de logs
+        self._ultimo_aviso = 0.0
+        self._task: asyncio.Task | None = None
+        self._vigia: threading.Thread | None = None
+        self._parar_vigia = threading.Event()
+        self._thread_loop: int | None = None
+        self._batida = time.perf_counter()
+        self._capturado = None
+        self._pilha = None
+        metricas.gauge("event_loop_lag_last_seconds", lambda: self.ultimo_atraso,
+                       "Atraso da última amostra do event loop")
+
+    def registrar(self, atraso: float, pilha: str | None = None):
+        atraso = max(0.0, atraso)
+        self.ultimo_atraso = atraso
+        self.maior_atraso = max(self.maior_atraso, atraso)
+        metricas.observar("event_loop_lag_seconds", atraso, buckets=BUCKETS_ATRASO)
+        if atraso >= self.limite_bloqueio:
+            self._registrar_bloqueio(atraso, pilha)
+
+    def _registrar_bloqueio(self, atraso: float, pilha: str | None):
+        metricas.incrementar("event_loop_blocks_total")
+        relatorio = {"duracao_s": round(atraso, 3), "quando": time.time(), "pilha": pilha}
+        self.bloqueios.append(relatorio)
+        logger.warning(f"Event loop bloqueado por {atraso * 1000:.0f} ms" + (f"\n{pilha}" if pilha else ""))
+
+        agora = time.monotonic()
+        if self.notificar and agora - self._ultimo_aviso >= self.intervalo_avisos:
+            self._ultimo_aviso = agora
+            asyncio.create_task(self._avisar(relatorio))
+
+    async def _avisar(self, relatorio: dict):
+        try:
+            await self.notificar(relatorio)
+        except Exception as e:
+            logger.error(f"Erro ao avisar bloqueio do event loop: {e}")
+
+    async def _amostrar(self):
+        while True:
+            self._batida = batida = time.perf_counter()
+            await asyncio.sleep(self.intervalo)
+            # Lê a marca antes da pilha: a thread vigia escreve na ordem inversa
+            pilha = self._pilha if self._capturado == batida else None
+            self.registrar(time.perf_counter() - batida - self.intervalo, pilha)
+
+    def _vigiar(self):
+        """Thread vigia: captura a pilha do loop quando ele passa do limite sem bater"""
+        verificacao = max(self.limite_bloqueio / 2, 0.01)
+        while not self._parar_vigia.wait(verificacao):
+            batida = self._batida
+            parado = time.perf_counter() - batida - self.intervalo
+            if parado < self.limite_bloqueio or self._capturado == batida:
+                continue
+            frame = sys._current_frames().get(self._thread_loop)
+            if frame is None:
+                continue
+            self._pilha = "".join(traceback.format_stack(frame)[-15:])
+            self._capturado = batida
+            del frame
+
+    def iniciar(self):
+        if self._task is None or self._task.done():
+            self._thread_loop = threading.get_ident()
+            self._batida = time.perf_counter()
+            self._task = asyncio.create_task(self._amostrar())
+        if self.capturar_pilhas and (self._vigia is None or not self._vigia.is_alive()):
+            self._parar_vigia.clear()
+            self._vigia = threading.Thread(target=self._vigiar, name="monitor-loop", daemon=True)
+            self._vigia.start()
+
+    async def parar(self):
+        self._parar_vigia.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def resumo(self) -> dict:
+        """Estado atual para o /metrics em JSON"""
+        return {
+            "ultimo_atraso_s": round(self.ultimo_atraso, 4),
+            "maior_atraso_s": round(self.maior_atraso, 4),
+            "limite_bloqueio_s": self.limite_bloqueio,
+            "capturar_pilhas": self.capturar_pilhas,
+            "bloqueios_recentes": list(self.bloqueios),
+        }
+
+
+# Instância compartilhada por todo o processo (bot + web)
+monitor_loop = MonitorLoop(
+    intervalo=app_config.LOOP_LAG_INTERVAL,
+    limite_bloqueio=app_config.LOOP_BLOCK_THRESHOLD_MS / 1000,
+    capturar_pilhas=app_config.LOOP_BLOCK_DEBUG,
+)
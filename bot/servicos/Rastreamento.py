@@ -0,0 +1,186 @@
+import contextlib
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+
+import aiohttp
+
+from bot.config import Config as app_config
+from bot.servicos.Metricas import metricas
+
+metricas.descrever("discord_commands_total", "Comandos executados por cog, comando, tipo e resultado")
+metricas.descrever("discord_command_seconds", "Duração dos comandos, do início do callback até o fim")
+metricas.descrever("discord_api_seconds", "Duração das chamadas HTTP à API do Discord")
+
+_rastro_atual: contextvars.ContextVar["Rastro | None"] = contextvars.ContextVar("rastro_atual", default=None)
+
+
+class Rastro:
+    """Execução de um comando: duração total e tempo gasto em cada tipo de sub-chamada.
+
+    Os spans (db, discord, llm) podem se sobrepor — ex.: editar a mensagem
+    enquanto o streaming do LLM ainda está aberto — então não somam o total.
+    """
+    __slots__ = ("comando", "cog", "tipo", "inicio", "spans", "finalizado")
+
+    def __init__(self, comando: str, cog: str | None, tipo: str):
+        self.comando = comando
+        self.cog = cog or "-"
+        self.tipo = tipo
+        self.inicio = time.perf_counter()
+        self.spans: dict[str, list] = {}
+        self.finalizado = False
+
+    def adicionar(self, tipo: str, duracao: float):
+        span = self.spans.setdefault(tipo, [0.0, 0])
+        span[0] += duracao
+        span[1] += 1
+
+
+def _percentil(ordenados: list[float], q: float) -> float:
+    # nearest-rank: sempre um valor realmente observado
+    return ordenados[max(0, min(len(ordenados) - 1, math.ceil(q * len(ordenados)) - 1))]
+
+
+class JanelaLatencias:
+    """Últimas execuções de cada comando dentro de uma janela deslizante de tempo"""
+
+    def __init__(self, janela: float = 3600, max_amostras: int = 1000):
+        self.janela = janela
+        self.max_amostras = max_amostras
+        self._amostras: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, comando: str, duracao: float, spans: dict, status: str):
+        with self._lock:
+            fila = self._amostras.setdefault(comando, deque(maxlen=self.max_amostras))
+            fila.append((time.monotonic(), duracao, spans, status))
+
+    def estatisticas(self, janela: float | None = None) -> list[dict]:
+        """p50/p95/p99 e tempo médio por span de cada comando, do mais lento (p95) ao mais rápido"""
+        limite = time.monotonic() - (janela or self.janela)
+        resultado = []
+        with self._lock:
+            filas = {comando: list(fila) for comando, fila in self._amostras.items()}
+
+        for comando, amostras in filas.items():
+            amostras = [a for a in amostras if a[0] >= limite]
+            if not amostras:
+                continue
+            duracoes = sorted(a[1] for a in amostras)
+            spans = {}
+            for _, _, spans_amostra, _ in amostras:
+                for tipo, (total, _) in spans_amostra.items():
+                    spans[tipo] = spans.get(tipo, 0.0) + total
+            resultado.append({
+                "comando": comando,
+                "count": len(duracoes),
+                "erros": sum(1 for a in amostras if a[3] != "ok"),
+                "p50": _percentil(duracoes, 0.50),
+                "p95": _percentil(duracoes, 0.95),
+                "p99": _percentil(duracoes, 0.99),
+                "spans_medios": {tipo: total / len(duracoes) for tipo, total in spans.items()},
+            })
+        return sorted(resultado, key=lambda item: item["p95"], reverse=True)
+
+
+class Rastreador:
+    """Rastreia comandos e as sub-chamadas feitas durante eles.
+
+    O rastro do comando fica numa ContextVar, então qualquer código chamado
+    a partir do callback (mesmo em outras funções ou no greenlet do
+    SQLAlchemy) registra seus spans sem receber o rastro como parâmetro.
+    Fora de um comando, `span`/`registrar_span` não fazem nada.
+    """
+
+    def __init__(self, janela: float = 3600):
+        self.janela = JanelaLatencias(janela)
+
+    def atual(self) -> Rastro | None:
+        return _rastro_atual.get()
+
+    def iniciar(self, comando: str, cog: str | None, tipo: str) -> Rastro:
+        rastro = Rastro(comando, cog, tipo)
+        _rastro_atual.set(rastro)
+        return rastro
+
+    def finalizar(self, rastro: Rastro | None, status: str):
+        """Registra o comando (só na primeira chamada para cada rastro)"""
+        if rastro is None or rastro.finalizado:
+            return
+        rastro.finalizado = True
+        duracao = time.perf_counter() - rastro.inicio
+        metricas.incrementar("discord_commands_total", comando=rastro.comando, cog=rastro.cog,
+                             tipo=rastro.tipo, status=status)
+        metricas.observar("discord_command_seconds", duracao, comando=rastro.comando, cog=rastro.cog,
+                          tipo=rastro.tipo)
+        self.janela.registrar(rastro.comando, duracao, rastro.spans, status)
+
+    @contextlib.asynccontextmanager
+    async def rastrear(self, comando: str, cog: str | None = None, tipo: str = "componente"):
+        """Rastreia um trecho que não passa pelos hooks de comando (botões, modais, listeners)"""
+        rastro = Rastro(comando, cog, tipo)
+        token = _rastro_atual.set(rastro)
+        status = "erro"
+        try:
+            yield rastro
+            status = "ok"
+        finally:
+            _rastro_atual.reset(token)
+            self.finalizar(rastro, status)
+
+    def contar_falha(self, comando: str, cog: str | None, tipo: str):
+        """Comando que falhou antes de começar (ex.: checagem), sem duração"""
+        metricas.incrementar("discord_commands_total", comando=comando, cog=cog or "-", tipo=tipo, status="erro")
+
+    def registrar_span(self, tipo: str, duracao: float):
+        rastro = _rastro_atual.get()
+        if rastro is not None and not rastro.finalizado:
+            rastro.adicionar(tipo, duracao)
+
+    @contextlib.contextmanager
+    def span(self, tipo: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_span(tipo, time.perf_counter() - inicio)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """TraceConfig para o `http_trace` do discord.py: mede toda chamada à API do Discord.
+
+        Cobre também as respostas de interação e followups, que usam a mesma
+        sessão HTTP do cliente.
+        """
+        trace = aiohttp.TraceConfig()
+
+        async def inicio(session, contexto, params):
+            contexto.inicio = time.perf_counter()
+
+        async def fim(session, contexto, params):
+            duracao = time.perf_counter() - contexto.inicio
+            metricas.observar("discord_api_seconds", duracao, metodo=params.method,
+                              status=f"{params.response.status // 100}xx")
+            self.registrar_span("discord", duracao)
+
+        async def falha(session, contexto, params):
+            duracao = time.perf_counter() - contexto.inicio
+            metricas.observar("discord_api_seconds", duracao, metodo=params.method, status="erro")
+            self.registrar_span("discord", duracao)
+
+        trace.on_request_start.append(inicio)
+        trace.on_request_end.append(fim)
+        trace.on_request_exception.append(falha)
+        return trace
+
+
+def cog_do_comando(command) -> str | None:
+    """Nome do cog de um comando de prefixo, híbrido ou slash"""
+    binding = getattr(command, "binding", None) or getattr(command, "cog", None)
+    return getattr(binding, "qualified_name", None)
+
+
+# Instância compartilhada por todo o bot
+rastreador = Rastreador(janela=app_config.PERF_WINDOW_SECONDS)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedorMembros:
+    """Resolve membros de um servidor sem baixar a lista inteira (`guild.chunk`).
+
+    Ordem de busca:
+      1. cache do gateway (`guild.get_member`)
+      2. uma única chamada REST (`guild.fetch_member`)
+      3. cache negativo curto para quem não está no servidor, evitando
+         repetir a chamada REST a cada doação do mesmo usuário
+    """
+
+    def __init__(self, ttl_negativo: float = 300.0, max_negativos: int = 1000):
+        self.ttl_negativo = ttl_negativo
+        self.max_negativos = max_negativos
+        self._ausentes: dict[tuple[int, int], float] = {}
+
+    async def resolver(self, guild: discord.Guild, user_id: int) -> discord.Member | None:
+        """Retorna o membro ou None se ele não estiver no servidor.
+
+        Erros HTTP diferentes de 404 são propagados para quem chamou.
+        """
+        user_id = int(user_id)
+        member = guild.get_member(user_id)
+        if member:
+            return member
+
+        chave = (guild.id, user_id)
+        expira = self._ausentes.get(chave)
+        if expira is not None:
+            if expira > time.monotonic():
+                return None
+            del self._ausentes[chave]
+
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            self._marcar_ausente(chave)
+            return None
+
+    def invalidar(self, guild_id: int, user_id: int):
+        """Esquece um resultado negativo (ex.: o usuário acabou de entrar)"""
+        self._ausentes.pop((int(guild_id), int(user_id)), None)
+
+    def _marcar_ausente(self, chave: tuple[int, int]):
+        agora = time.monotonic()
+        if len(self._ausentes) >= self.max_negativos:
+            self._ausentes = {k: v for k, v in self._ausentes.items() if v > agora}
+            if len(self._ausentes) >= self.max_negativos:
+                self._ausentes.pop(next(iter(self._ausentes)))
+        self._ausentes[chave] = agora + self.ttl_negativo
+
+
+class ResolvedorCanais:
+    """Resolve canais por ID (ex.: canais de log) sem uma chamada REST por uso.
+
+    Ordem de busca:
+      1. cache do gateway (`bot.get_channel`)
+      2. canal já buscado por REST antes (fica guardado até ser apagado)
+      3. uma única chamada REST (`bot.fetch_channel`); chamadas simultâneas
+         para o mesmo canal esperam a mesma busca
+    Canais inexistentes ou sem acesso ficam num cache negativo curto.
+    O bot chama `invalidar` quando um canal é apagado.
+    """
+
+    def __init__(self, ttl_negativo: float = 300.0):
+        self.ttl_negativo = ttl_negativo
+        self._canais: dict[int, discord.abc.Messageable] = {}
+        self._ausentes: dict[int, float] = {}
+        self._buscas: dict[int, asyncio.Future] = {}
+
+    async def resolver(self, bot, channel_id):
+        """Retorna o canal ou None se ele não existe (ou o bot não tem acesso).
+
+        Aceita o ID como int ou str (como vem do ambiente); ID vazio retorna None.
+        Erros HTTP diferentes de 403/404 são propagados para quem chamou.
+        """
+        if not channel_id:
+            return None
+        channel_id = int(channel_id)
+
+        channel = bot.get_channel(channel_id) or self._canais.get(channel_id)
+        if channel is not None:
+            return channel
+
+        expira = self._ausentes.get(channel_id)
+        if expira is not None:
+            if expira > time.monotonic():
+                return None
+            del self._ausentes[channel_id]
+
+        busca = self._buscas.get(channel_id)
+        if busca is None:
+            busca = asyncio.ensure_future(self._buscar(bot, channel_id))
+            self._buscas[channel_id] = busca
+            busca.add_done_callback(lambda _: self._buscas.pop(channel_id, None))
+        return await asyncio.shield(busca)
+
+    async def _buscar(self, bot, channel_id: int):
+        try:
+            channel = await bot.fetch_channel(channel_id)
+        except (discord.NotFound, discord.Forbidden) as e:
+            logger.warning(f"Canal {channel_id} indisponível: {e}")
+            self._ausentes[channel_id] = time.monotonic() + self.ttl_negativo
+            return None
+        self._canais[channel_id] = channel
+        return channel
+
+    def invalidar(self, channel_id=None):
+        """Esquece um canal (ex.: foi apagado), ou todos sem argumento"""
+        if channel_id is None:
+            self._canais.clear()
+            self._ausentes.clear()
+            return
+        channel_id = int(channel_id)
+        self._canais.pop(channel_id, None)
+        self._ausentes.pop(channel_id, None)
+
+
+# Instâncias compartilhadas por todo o bot
+resolvedor_membros = ResolvedorMembros()
+resolvedor_canais = ResolvedorCanais()
@@ -1,9 +1,13 @@
+import asyncio
 import discord
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from bot.database import AsyncSessionLocal
+from bot.database.funcoes import dias_entre
 from bot.database.models import Apoiador, GuildConfig
-from sqlalchemy import select, func
+from bot.servicos.IndiceCargos import indice_cargos
+from bot.servicos.CacheGuildConfig import cache_guild_config, converter_para_dias, faixas_tempo
+from sqlalchemy import case, select, func
 from typing import Dict, List
 
 logger = logging.getLogger(__name__)
@@ -15,12 +19,8 @@ class SupporterRoleManager:
         self.bot = bot
 
     async def get_guild_config(self, guild_id: str) -> GuildConfig | None:
-        """Obtém configuração do servidor"""
-        async with AsyncSessionLocal() as session:
-            result = await session.execute(
-                select(GuildConfig).where(GuildConfig.guild_id == guild_id)
-            )
-            return result.scalars().first()
+        """Obtém configuração do servidor (via cache compartilhado)"""
+        return await cache_guild_config.obter(guild_id, AsyncSessionLocal)
 
     async def assign_default_supporter_role(self, member: discord.Member) -> bool:
         """Atribui cargo padrão de apoiador"""
@@ -44,45 +44,46 @@ class SupporterRoleManager:
             logger.error(f"Erro ao atribuir cargo padrão: {e}")
             return False
 
+    @staticmethod
+    def _support_days_sum():
+        """Soma dos dias de cada período de apoio (períodos incompletos ou negativos contam 0)"""
+        days = dias_entre(Apoiador.data_inicio, Apoiador.data_expiracao)
+        return func.coalesce(func.sum(case((days > 0, days), else_=0)), 0)
+
     async def calculate_total_support_time(self, discord_id: str, guild_id: str) -> int:
-        """Calcula tempo total de apoio em dias, considerando retroativo e antecipado"""
+        """Calcula tempo total de apoio em dias, considerando retroativo e antecipado.
+
+        O tempo de cada período é o TOTAL entre data_inicio e data_expiracao
+        (cobre apoio retroativo e antecipado) e a soma é feita pelo banco.
+        """
         try:
             async with AsyncSessionLocal() as session:
                 result = await session.execute(
-                    select(Apoiador).where(
+                    select(self._support_days_sum()).where(
                         Apoiador.discord_id == discord_id,
                         Apoiador.guild_id == guild_id,
                         Apoiador.ativo == True
                     )
                 )
-                apoiadores = result.scalars().all()
-
-                if not apoiadores:
-                    return 0
-
-                total_days = 0
-
-                for apo in apoiadores:
-                    if apo.data_inicio and apo.data_expiracao:
-                        # Converte datetimes sem timezone para UTC antes de subtrair
-                        data_inicio = apo.data_inicio
-                        data_expiracao = apo.data_expiracao
-                        
-                        if data_inicio.tzinfo is None:
-                            data_inicio = data_inicio.replace(tzinfo=timezone.utc)
-                        if data_expiracao.tzinfo is None:
-                            data_expiracao = data_expiracao.replace(tzinfo=timezone.utc)
-
-                        # Calcula o tempo TOTAL entre data_inicio e data_expiracao
-                        # Isso considera tanto apoio retroativo quanto antecipado
-                        days_supported = (data_expiracao - data_inicio).days
-                        total_days += max(0, days_supported)
-
-                return total_days
+                return int(result.scalar() or 0)
         except Exception as e:
             logger.error(f"Erro ao calcular tempo de apoio: {e}")
             return 0
 
+    async def calculate_all_support_times(self, guild_id: str) -> Dict[str, int]:
+        """Tempo total de apoio (em dias) de todos os apoiadores ativos do servidor.
+
+        Uma única consulta agregada por discord_id, no lugar de uma por membro.
+        """
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Apoiador.discord_id, self._support_days_sum()).where(
+                    Apoiador.guild_id == guild_id,
+                    Apoiador.ativo == True
+                ).group_by(Apoiador.discord_id)
+            )
+            return {discord_id: int(days or 0) for discord_id, days in result.all()}
+
     async def get_appropriate_time_role(self, guild: discord.Guild, total_days: int) -> discord.Role | None:
         """Retorna o cargo apropriado baseado no tempo total de apoio"""
         try:
@@ -90,43 +91,22 @@ class SupporterRoleManager:
             if not config or not config.cargos_tempo:
                 return None
 
-            # Converte total_days para diferentes unidades e encontra o melhor match
-            best_role = None
-            best_threshold_days = -1
-
-            for time_config in config.cargos_tempo:
-                threshold = time_config.get('threshold', 0)
-                unit = time_config.get('unit', 'days')
-                role_id = time_config.get('role_id')
-
-                # Converte threshold para dias
-                threshold_days = self._convert_to_days(threshold, unit)
-
-                # Se o membro qualifica para este threshold E é melhor que o anterior
-                if total_days >= threshold_days and threshold_days > best_threshold_days:
-                    role = guild.get_role(int(role_id))
+            # Faixas já convertidas para dias, da maior para a menor:
+            # a primeira que o membro alcança (e cujo cargo existe) é a melhor
+            for faixa in faixas_tempo(config):
+                if total_days >= faixa.dias:
+                    role = guild.get_role(faixa.role_id)
                     if role:
-                        best_role = role
-                        best_threshold_days = threshold_days
+                        return role
 
-            return best_role
+            return None
         except Exception as e:
             logger.error(f"Erro ao obter cargo de tempo: {e}")
             return None
 
     def _convert_to_days(self, threshold: int, unit: str) -> int:
         """Converte um threshold para dias baseado na unidade"""
-        if unit == 'days' or unit == 'd':
-            return threshold
-        elif unit == 'weeks' or unit == 'w':
-            return threshold * 7
-        elif unit == 'months' or unit == 'm':
-            return threshold * 30  # Aproximação
-        elif unit == 'years' or unit == 'y':
-            return threshold * 365  # Aproximação
-        else:
-            logger.warning(f"Unidade de tempo desconhecida: {unit}, assumindo dias")
-            return threshold
+        return converter_para_dias(threshold, unit)
 
     def _format_time_threshold(self, threshold: int, unit: str) -> str:
         """Formata um threshold de tempo para exibição"""
@@ -157,9 +137,8 @@ class SupporterRoleManager:
             config = await self.get_guild_config(str(member.guild.id))
             if config and config.cargos_tempo:
                 old_roles = []
-                for time_config in config.cargos_tempo:
-                    role_id = time_config.get('role_id')
-                    role = member.guild.get_role(int(role_id))
+                for faixa in faixas_tempo(config):
+                    role = member.guild.get_role(faixa.role_id)
                     if role and role in member.roles and role != time_role:
                         old_roles.append(role)
 
@@ -178,41 +157,98 @@ class SupporterRoleManager:
             logger.error(f"Erro ao atualizar cargos de tempo: {e}")
             return False
 
-    async def update_all_supporters_roles(self, guild: discord.Guild) -> Dict[str, int]:
-        """Atualiza cargos de todos os apoiadores ativos do servidor (execução semanal)"""
+    def _diff_supporter_roles(self, member: discord.Member, total_days: int, default_role: discord.Role | None,
+                              time_roles: List[tuple]) -> tuple[List[discord.Role], List[discord.Role]]:
+        """Compara os cargos desejados com os atuais do membro.
+
+        `time_roles` são pares (dias, cargo) da maior para a menor faixa.
+        Retorna (cargos a adicionar, cargos a remover); segue as mesmas regras de
+        `assign_default_supporter_role` + `update_member_time_based_roles`.
+        """
+        current = {role.id for role in member.roles}
+        to_add, to_remove = [], []
+
+        if default_role and default_role.id not in current:
+            to_add.append(default_role)
+
+        if total_days > 0:
+            time_role = next((role for days, role in time_roles if total_days >= days), None)
+            if time_role:
+                if time_role.id not in current:
+                    to_add.append(time_role)
+                stale = {role.id: role for _, role in time_roles if role.id in current and role.id != time_role.id}
+                to_remove = list(stale.values())
+
+        return to_add, to_remove
+
+    async def update_all_supporters_roles(self, guild: discord.Guild, limiter=None,
+                                          concurrency: int = 4) -> Dict[str, int]:
+        """Atualiza cargos de todos os apoiadores ativos do servidor (execução semanal).
+
+        Sincroniza em lote: a configuração vem do cache, o tempo de apoio de todos
+        os membros sai de uma única consulta, a diferença entre cargos desejados e
+        atuais é calculada em memória e só quem precisa mudar gera chamadas à API.
+
+        `limiter` (um `BaldeTokens`) limita as edições de cargo do servidor; até
+        `concurrency` membros são atualizados ao mesmo tempo.
+        """
         try:
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(
-                    select(Apoiador).where(
-                        Apoiador.guild_id == str(guild.id),
-                        Apoiador.ativo == True
-                    )
-                )
-                apoiadores = result.scalars().all()
+            guild_id = str(guild.id)
+            config = await self.get_guild_config(guild_id)
+            support_days = await self.calculate_all_support_times(guild_id)
+
+            default_role = None
+            if config and config.cargo_apoiador_default:
+                default_role = guild.get_role(int(config.cargo_apoiador_default))
+                if not default_role:
+                    logger.error(f"Cargo padrão {config.cargo_apoiador_default} não encontrado")
+
+            time_roles = []
+            for faixa in faixas_tempo(config):
+                role = guild.get_role(faixa.role_id)
+                if role:
+                    time_roles.append((faixa.dias, role))
 
-            updated_count = 0
             total_processed = 0
+            changes = []
 
-            for apo in apoiadores:
+            for discord_id, total_days in support_days.items():
                 try:
-                    member = guild.get_member(int(apo.discord_id))
+                    member = guild.get_member(int(discord_id))
                     if not member:
                         continue
 
                     total_processed += 1
 
-                    # Atribui cargo padrão se necessário
-                    default_assigned = await self.assign_default_supporter_role(member)
-
-                    # Atualiza cargo baseado no tempo
-                    time_updated = await self.update_member_time_based_roles(member)
-
-                    if default_assigned or time_updated:
-                        updated_count += 1
-
+                    to_add, to_remove = self._diff_supporter_roles(member, total_days, default_role, time_roles)
+                    if to_add or to_remove:
+                        changes.append((member, total_days, to_add, to_remove))
                 except Exception as e:
-                    logger.error(f"Erro ao processar apoiador {apo.discord_id}: {e}")
-                    continue
+                    logger.error(f"Erro ao processar apoiador {discord_id}: {e}")
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def apply(member, total_days, to_add, to_remove) -> bool:
+                async with semaphore:
+                    try:
+                        # Cada cargo vira uma chamada à API (add_roles/remove_roles atômicos)
+                        if to_remove:
+                            if limiter:
+                                await limiter.consumir(len(to_remove))
+                            await member.remove_roles(*to_remove)
+                            logger.info(f"Removidos cargos antigos de {member.display_name}: {[r.name for r in to_remove]}")
+                        if to_add:
+                            if limiter:
+                                await limiter.consumir(len(to_add))
+                            await member.add_roles(*to_add)
+                            logger.info(f"Cargos {[r.name for r in to_add]} atribuídos a {member.display_name} ({total_days} dias)")
+                        return True
+                    except Exception as e:
+                        logger.error(f"Erro ao atualizar cargos de {member.id}: {e}")
+                        return False
+
+            applied = await asyncio.gather(*(apply(*change) for change in changes))
+            updated_count = sum(applied)
 
             logger.info(f"Atualização semanal concluída: {updated_count}/{total_processed} membros atualizados em {guild.name}")
             return {
@@ -242,18 +278,14 @@ class SupporterRoleManager:
                 time_stats = {}
                 config = await self.get_guild_config(str(guild.id))
 
-                if config and config.cargos_tempo:
-                    for time_config in config.cargos_tempo:
-                        role_id = time_config.get('role_id')
-                        if role_id:
-                            days = time_config.get('threshold', 0)
-                            role = guild.get_role(int(role_id))
-                            if role:
-                                member_count = len([m for m in guild.members if role in m.roles])
-                                time_stats[days] = {
-                                    "role_name": role.name,
-                                    "member_count": member_count
-                                }
+                # Contagens vêm do índice mantido por eventos: O(cargos configurados)
+                for faixa in faixas_tempo(config):
+                    role = guild.get_role(faixa.role_id)
+                    if role:
+                        time_stats[faixa.threshold] = {
+                            "role_name": role.name,
+                            "member_count": indice_cargos.contar(guild, role)
+                        }
 
                 return {
                     "total_supporters": total_supporters,
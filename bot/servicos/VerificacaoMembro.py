@@ -1,8 +1,10 @@
 import discord, logging
 from datetime import datetime, timezone
-from bot.database import engine, AsyncSessionLocal
+from bot.database import AsyncSessionLocal
 from bot.database.models import Apoiador, GuildConfig
-from sqlalchemy import select, update
+from sqlalchemy import update
+from bot.servicos.ResolvedorDiscord import resolvedor_membros
+from bot.servicos.CacheGuildConfig import cache_guild_config
 
 logging.basicConfig(
     level=logging.INFO,
@@ -92,19 +94,17 @@ class VerificacaoMembro:
     async def obter_role_por_nivel(self, guild_id: str, nivel: int) -> int | None:
         """Retorna o role_id configurado para um determinado nível no GuildConfig."""
         try:
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(select(GuildConfig).filter_by(guild_id=str(guild_id)))
-                cfg = result.scalars().first()
-                if not cfg or not cfg.supporter_roles:
-                    return None
-                key = str(nivel)
-                role_id = cfg.supporter_roles.get(key)
-                if role_id:
-                    try:
-                        return int(role_id)
-                    except Exception:
-                        return None
+            cfg = await cache_guild_config.obter(guild_id)
+            if not cfg or not cfg.supporter_roles:
                 return None
+            key = str(nivel)
+            role_id = cfg.supporter_roles.get(key)
+            if role_id:
+                try:
+                    return int(role_id)
+                except Exception:
+                    return None
+            return None
         except Exception as e:
             logger.error(f"Erro ao obter role por nível: {e}")
             return None
@@ -142,22 +142,16 @@ class VerificacaoMembro:
                 logger.error(f"Servidor {guild_id} não encontrado")
                 return False
         
-        # Recarregar o servidor para garantir que temos os dados mais recentes
-            await guild.chunk()
-        
-            member = guild.get_member(int(discord_id))
+        # Busca pontual do membro (cache do gateway -> fetch_member), sem baixar o servidor inteiro
+            try:
+                member = await resolvedor_membros.resolver(guild, int(discord_id))
+            except discord.HTTPException as e:
+                logger.error(f"Erro ao buscar membro: {e}")
+                return False
             if not member:
                 logger.error(f"Membro {discord_id} não encontrado no servidor {guild_id}")
-            # Tentar buscar o membro via API
-                try:
-                    member = await guild.fetch_member(int(discord_id))
-                except discord.NotFound:
-                    logger.error(f"Membro {discord_id} realmente não existe no servidor")
-                    return False
-                except discord.HTTPException as e:
-                    logger.error(f"Erro ao buscar membro: {e}")
-                    return False  
-        # Determinar o cargo a aplicar: prioridade -> nivel (se fornecido) -> cargo_id -> GuildConfig.cargo_apoiador_id
+                return False
+        # Determinar o cargo a aplicar: prioridade -> nivel (se fornecido) -> cargo_id -> GuildConfig.cargo_apoiador_default
             cargo = None
             chosen_role_id = None
 
@@ -170,14 +164,12 @@ class VerificacaoMembro:
             if chosen_role_id is None:
                 # tentar obter o cargo padrão em GuildConfig
                 try:
-                    async with AsyncSessionLocal() as session:
-                        result = await session.execute(select(GuildConfig).filter_by(guild_id=str(guild_id)))
-                        cfg = result.scalars().first()
-                        if cfg and cfg.cargo_apoiador_id:
-                            try:
-                                chosen_role_id = int(cfg.cargo_apoiador_id)
-                            except Exception:
-                                chosen_role_id = None
+                    cfg = await cache_guild_config.obter(guild_id)
+                    if cfg and cfg.cargo_apoiador_default:
+                        try:
+                            chosen_role_id = int(cfg.cargo_apoiador_default)
+                        except Exception:
+                            chosen_role_id = None
                 except Exception as e:
                     logger.error(f"Erro ao carregar GuildConfig: {e}")
 
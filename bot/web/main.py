@@ -1,12 +1,17 @@
-import asyncio, hashlib, hmac, json, logging, os, re
+import asyncio, hashlib, hmac, json, logging, os, re, time
 from datetime import datetime, timedelta, timezone
 
 import httpx
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 from bot.config import config as app_config
-from bot.database import SessionLocal
+from bot.database import AsyncSessionLocal, consultas, registro
 from bot.database.models import Apoiador
+from bot.servicos.Metricas import metricas
+from bot.servicos.MonitorLoop import monitor_loop
 from bot.servicos.VerificacaoMembro import VerificacaoMembro
 from bot.shared import get_bot_instance
 
@@ -15,10 +20,54 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="HugMe Webhooks", description="Serviço de webhooks para doações")
 
+metricas.descrever("http_request_seconds", "Duração das requisições HTTP (webhooks e painel) por rota")
+
+@app.middleware("http")
+async def medir_requisicoes(request: Request, call_next):
+    """Registra a duração de cada requisição, rotulada pelo template da rota"""
+    inicio = time.perf_counter()
+    status = 500
+    try:
+        resposta = await call_next(request)
+        status = resposta.status_code
+        return resposta
+    finally:
+        # Template ("/kofi-webhook"), nunca o caminho cru: evita rótulos sem limite
+        rota = request.scope.get("route")
+        metricas.observar(
+            "http_request_seconds", time.perf_counter() - inicio,
+            metodo=request.method, rota=getattr(rota, "path", "desconhecida"), status=status,
+        )
+
 @app.get("/status")
 async def status():
     """Endpoint de status para verificar se o serviço está ativo"""
-    return {"message": "Serviço de webhooks ativo!", "timestamp": datetime.now(timezone.utc).isoformat()}
+    return {
+        "message": "Serviço de webhooks ativo!",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "db_pool": registro.status(),
+    }
+
+def _verificar_token_admin(request: Request):
+    """Exige `Authorization: Bearer <ADMIN_TOKEN>` quando o token está configurado"""
+    if not app_config.ADMIN_TOKEN:
+        return
+    recebido = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(recebido, app_config.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+@app.get("/metrics")
+async def metrics(request: Request, format: str = "prometheus"):
+    """Métricas do processo no formato do Prometheus (`?format=json` para o resumo em JSON)"""
+    _verificar_token_admin(request)
+    if format != "json":
+        return PlainTextResponse(metricas.exportar_prometheus(), media_type="text/plain; version=0.0.4")
+    return {
+        **metricas.snapshot(),
+        "db_pool": registro.status(),
+        "db_slow_statements": consultas.mais_lentas(10),
+        "event_loop": monitor_loop.resumo(),
+    }
 
 @app.post("/webhook")
 async def legacy_webhook(request: Request):
@@ -57,10 +106,12 @@ async def kofi_webhook(request: Request):
             discord_id = f"kofi_anon_{int(datetime.now(timezone.utc).timestamp())}"
 
         # Processar doação no banco de dados
-        with SessionLocal() as session:
+        async with AsyncSessionLocal() as session:
             # Verificar duplicatas
-            exists_dupped = session.query(Apoiador).filter_by(id_pagamento=transaction_id).first()
-            if exists_dupped:
+            result = await session.execute(
+                select(Apoiador.id).where(Apoiador.id_pagamento == transaction_id)
+            )
+            if result.first():
                 logger.warning(f"Transação Ko-fi duplicada detectada: {transaction_id}")
                 return {"status": "duplicado"}
 
@@ -78,7 +129,18 @@ async def kofi_webhook(request: Request):
                 ja_pago=True,
             )
             session.add(apoiador)
-            session.commit()
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Entregas simultâneas da mesma transação: a outra já inseriu
+                await session.rollback()
+                result = await session.execute(
+                    select(Apoiador.id).where(Apoiador.id_pagamento == transaction_id)
+                )
+                if result.first():
+                    logger.warning(f"Transação Ko-fi duplicada detectada: {transaction_id}")
+                    return {"status": "duplicado"}
+                raise
             logger.info(f"Apoiador registrado via Ko-fi: {discord_id}, tipo={data['type']}, valor={data['amount']}")
 
         # Atribuir cargo automaticamente se possível
@@ -0,0 +1,37 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.servicos.CacheGuildConfig import cache_guild_config
+from bot.servicos.CachePixConfig import cache_pix_config
+from bot.servicos.ResolvedorDiscord import resolvedor_canais
+
+
+@pytest.fixture(autouse=True)
+def limpar_caches():
+    """Evita que o cache de configurações vaze entre testes"""
+    cache_guild_config.invalidar()
+    cache_pix_config.invalidar()
+    resolvedor_canais.invalidar()
+    yield
+    cache_guild_config.invalidar()
+    cache_pix_config.invalidar()
+    resolvedor_canais.invalidar()
+
+
+@pytest.fixture
+def session_factory():
+    """Cria factories no formato de AsyncSessionLocal que contam as consultas.
+
+    `session_factory(objeto)` devolve (factory, session); toda consulta da
+    sessão retorna `objeto` em `result.scalars().first()`.
+    """
+    def criar(objeto):
+        session = AsyncMock()
+        result = MagicMock()
+        result.scalars.return_value.first.return_value = objeto
+        session.execute.return_value = result
+
+        factory = MagicMock()
+        factory.return_value.__aenter__.return_value = session
+        return factory, session
+    return criar
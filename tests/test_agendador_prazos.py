@@ -0,0 +1,116 @@
+"""
+Testes do agendador central de prazos - HugMe Bot
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from bot.servicos.AgendadorPrazos import AgendadorPrazos
+
+
+class TestAgendadorPrazos:
+    """Testes para o AgendadorPrazos"""
+
+    @pytest.mark.asyncio
+    async def test_dispara_em_ordem_de_vencimento(self):
+        """Prazos agendados fora de ordem disparam pela ordem do horário"""
+        agendador = AgendadorPrazos()
+        disparos = []
+
+        def registrar(nome):
+            async def callback():
+                disparos.append(nome)
+            return callback
+
+        agora = time.time()
+        agendador.agendar("c", agora + 0.06, registrar("c"))
+        agendador.agendar("a", agora + 0.02, registrar("a"))
+        agendador.agendar("b", agora + 0.04, registrar("b"))
+        await asyncio.sleep(0.1)
+        await agendador.parar()
+
+        assert disparos == ["a", "b", "c"]
+        assert len(agendador) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelar_e_reagendar(self):
+        """Cancelados não disparam; reagendar a mesma chave substitui o prazo"""
+        agendador = AgendadorPrazos()
+        disparos = []
+
+        async def callback():
+            disparos.append(time.time())
+
+        agora = time.time()
+        agendador.agendar("cancelado", agora + 0.02, callback)
+        agendador.agendar("reagendado", agora + 0.02, callback)
+        agendador.agendar("reagendado", agora + 0.06, callback)
+
+        assert agendador.cancelar("cancelado") is True
+        assert agendador.cancelar("inexistente") is False
+        await asyncio.sleep(0.04)
+        assert disparos == []
+        await asyncio.sleep(0.05)
+        await agendador.parar()
+
+        assert len(disparos) == 1 and disparos[0] >= agora + 0.06
+
+    @pytest.mark.asyncio
+    async def test_antecipar(self):
+        """Antecipar roda o callback na hora e ele não dispara de novo no vencimento"""
+        agendador = AgendadorPrazos()
+        disparos = []
+
+        async def callback():
+            disparos.append("a")
+
+        agendador.agendar("a", time.time() + 0.02, callback)
+        assert await agendador.antecipar("a") is True
+        assert disparos == ["a"] and not agendador.pendente("a")
+        assert await agendador.antecipar("a") is False
+
+        await asyncio.sleep(0.04)
+        await agendador.parar()
+        assert disparos == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_prazo_mais_cedo_acorda_a_task(self):
+        """Um prazo novo antes do atual não espera o anterior vencer"""
+        agendador = AgendadorPrazos()
+        disparado = asyncio.Event()
+
+        async def nada():
+            pass
+
+        async def callback():
+            disparado.set()
+
+        agendador.agendar("longe", time.time() + 60, nada)
+        await asyncio.sleep(0)
+        agendador.agendar("perto", time.time() + 0.01, callback)
+        await asyncio.wait_for(disparado.wait(), timeout=1)
+        await agendador.parar()
+
+        assert agendador.pendente("longe") and not agendador.pendente("perto")
+
+    @pytest.mark.asyncio
+    async def test_erro_no_callback_nao_para_o_agendador(self):
+        """Exceções de um callback são logadas e os próximos prazos seguem"""
+        agendador = AgendadorPrazos()
+        disparos = []
+
+        async def falha():
+            raise RuntimeError("boom")
+
+        async def ok():
+            disparos.append("ok")
+
+        agora = time.time()
+        agendador.agendar("falha", agora, falha)
+        agendador.agendar("ok", agora + 0.01, ok)
+        await asyncio.sleep(0.05)
+        await agendador.parar()
+
+        assert disparos == ["ok"]
@@ -0,0 +1,86 @@
+"""
+Testes do agendador da checagem semanal - HugMe Bot
+
+Cobre o token bucket por servidor e o pool de workers que processa
+vários servidores ao mesmo tempo.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from bot.servicos.AgendadorServidores import AgendadorServidores, BaldeTokens
+
+
+def _guild(guild_id):
+    guild = MagicMock()
+    guild.id = guild_id
+    guild.name = f"guild-{guild_id}"
+    return guild
+
+
+class TestBaldeTokens:
+    """Testes para o BaldeTokens"""
+
+    @pytest.mark.asyncio
+    async def test_rajada_e_reabastecimento(self):
+        """Libera a rajada na hora e depois espera pelos novos tokens"""
+        balde = BaldeTokens(taxa=100, capacidade=3)
+        loop = asyncio.get_running_loop()
+
+        inicio = loop.time()
+        for _ in range(3):
+            await balde.consumir()
+        assert loop.time() - inicio < 0.01
+
+        await balde.consumir(2)
+        assert loop.time() - inicio >= 0.015
+
+
+class TestAgendadorServidores:
+    """Testes para o AgendadorServidores"""
+
+    @pytest.mark.asyncio
+    async def test_processa_em_paralelo_com_limite(self):
+        """Nunca passa de max_workers servidores ao mesmo tempo"""
+        agendador = AgendadorServidores(max_workers=2)
+        ativos = pico = 0
+
+        async def tarefa(guild, balde):
+            nonlocal ativos, pico
+            ativos += 1
+            pico = max(pico, ativos)
+            await asyncio.sleep(0.01)
+            ativos -= 1
+            return {"total_processed": 1, "updated": 1}
+
+        resultados = await agendador.executar([_guild(i) for i in range(5)], tarefa)
+
+        assert pico == 2
+        assert len(resultados) == 5
+
+    @pytest.mark.asyncio
+    async def test_progresso_e_erros(self):
+        """Erros de um servidor não param os outros e o progresso é incremental"""
+        agendador = AgendadorServidores(max_workers=3)
+        progresso = []
+
+        async def tarefa(guild, balde):
+            if guild.id == 1:
+                raise RuntimeError("boom")
+            return {"updated": 0}
+
+        async def reportar(guild, resultado, concluidos, total):
+            progresso.append((concluidos, total, "error" in resultado))
+
+        resultados = await agendador.executar([_guild(i) for i in range(3)], tarefa, progresso=reportar)
+
+        assert [p[:2] for p in progresso] == [(1, 3), (2, 3), (3, 3)]
+        assert sum(p[2] for p in progresso) == 1
+        assert dict((g.id, r) for g, r in resultados)[1] == {"error": "boom"}
+
+    def test_um_balde_por_servidor(self):
+        """Cada servidor tem seu balde, reaproveitado entre execuções"""
+        agendador = AgendadorServidores()
+        assert agendador.balde(1) is agendador.balde(1)
+        assert agendador.balde(1) is not agendador.balde(2)
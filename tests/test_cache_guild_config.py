@@ -0,0 +1,82 @@
+"""
+Testes do cache de configurações de servidor - HugMe Bot
+
+Cobre o TTL, a invalidação explícita feita pelos painéis de admin e as
+faixas de cargos por tempo pré-calculadas.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from bot.servicos.CacheGuildConfig import CacheGuildConfig, analisar_cargos_tempo, faixas_tempo
+
+
+def _config():
+    config = MagicMock()
+    config.cargos_tempo = [
+        {"threshold": 1, "unit": "months", "role_id": "111"},
+        {"threshold": 1, "unit": "years", "role_id": "333"},
+        {"threshold": 90, "unit": "days", "role_id": "222"},
+    ]
+    return config
+
+
+class TestCacheGuildConfig:
+    """Testes para o CacheGuildConfig"""
+
+    @pytest.mark.asyncio
+    async def test_consulta_uma_vez_dentro_do_ttl(self, session_factory):
+        """Leituras repetidas não voltam ao banco"""
+        cache = CacheGuildConfig(ttl=60)
+        config = _config()
+        factory, session = session_factory(config)
+
+        assert await cache.obter("1", factory) is config
+        assert await cache.obter(1, factory) is config
+        assert session.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_servidor_sem_configuracao_tambem_fica_em_cache(self, session_factory):
+        """Um servidor sem GuildConfig não gera uma consulta por membro"""
+        cache = CacheGuildConfig(ttl=60)
+        factory, session = session_factory(None)
+
+        assert await cache.obter("1", factory) is None
+        assert await cache.obter("1", factory) is None
+        assert session.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidacao_e_ttl(self, session_factory):
+        """Gravações dos painéis e o TTL forçam uma nova consulta"""
+        cache = CacheGuildConfig(ttl=60)
+        factory, session = session_factory(_config())
+
+        await cache.obter("1", factory)
+        cache.invalidar("1")
+        await cache.obter("1", factory)
+        assert session.execute.await_count == 2
+
+        cache.ttl = 0
+        cache.invalidar()
+        await cache.obter("1", factory)
+        await cache.obter("1", factory)
+        assert session.execute.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_faixas_pre_calculadas(self, session_factory):
+        """As faixas ficam ordenadas da maior para a menor, já em dias"""
+        cache = CacheGuildConfig(ttl=60)
+        factory, _ = session_factory(_config())
+
+        config = await cache.obter("1", factory)
+
+        assert [(f.dias, f.role_id) for f in faixas_tempo(config)] == [(365, 333), (90, 222), (30, 111)]
+
+    def test_analisar_ignora_entradas_invalidas(self):
+        """role_id inválido não derruba a atualização de cargos"""
+        faixas = analisar_cargos_tempo([
+            {"threshold": 30, "unit": "days", "role_id": None},
+            {"threshold": 7, "unit": "weeks", "role_id": "10"},
+        ])
+        assert [(f.dias, f.role_id) for f in faixas] == [(7 * 7, 10)]
+        assert analisar_cargos_tempo({}) == ()
@@ -0,0 +1,92 @@
+"""
+Testes do cache da configuração PIX - HugMe Bot
+
+Cobre a carga única, o cache da ausência de configuração e a atualização
+feita pelos painéis de admin depois de gravar.
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from bot.database.models import PixConfig
+from bot.servicos.CachePixConfig import CachePixConfig
+
+
+def _config(chave="chave@pix.com"):
+    return PixConfig(
+        chave=chave,
+        static_qr_url="http://qr.url",
+        nome_titular="Titular",
+        cidade="Cidade",
+        atualizado_em=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        atualizado_por="123",
+    )
+
+
+class TestCachePixConfig:
+    """Testes para o CachePixConfig"""
+
+    @pytest.mark.asyncio
+    async def test_consulta_o_banco_uma_vez(self, session_factory):
+        cache = CachePixConfig()
+        factory, session = session_factory(_config())
+
+        primeira = await cache.obter(factory)
+        segunda = await cache.obter(factory)
+
+        assert session.execute.await_count == 1
+        assert primeira is segunda
+        assert primeira.chave == "chave@pix.com"
+        assert primeira.static_qr_url == "http://qr.url"
+
+    @pytest.mark.asyncio
+    async def test_ausencia_de_configuracao_fica_em_cache(self, session_factory):
+        cache = CachePixConfig()
+        factory, session = session_factory(None)
+
+        assert await cache.obter(factory) is None
+        assert await cache.obter(factory) is None
+        assert session.execute.await_count == 1
+        assert cache.carregado
+
+    @pytest.mark.asyncio
+    async def test_definir_atualiza_sem_consultar(self, session_factory):
+        cache = CachePixConfig()
+        factory, session = session_factory(_config())
+        await cache.obter(factory)
+
+        cache.definir(_config("nova@pix.com"))
+        assert (await cache.obter(factory)).chave == "nova@pix.com"
+
+        cache.definir(None)
+        assert await cache.obter(factory) is None
+        assert session.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_carga_concorrente_nao_sobrescreve_gravacao(self, session_factory):
+        """Uma gravação feita durante a consulta vence o resultado (velho) do banco"""
+        cache = CachePixConfig()
+        factory, session = session_factory(_config("velha@pix.com"))
+
+        async def executar(*args, **kwargs):
+            cache.definir(_config("nova@pix.com"))
+            result = MagicMock()
+            result.scalars.return_value.first.return_value = _config("velha@pix.com")
+            return result
+
+        session.execute.side_effect = executar
+
+        assert (await cache.carregar(factory)).chave == "nova@pix.com"
+        assert (await cache.obter(factory)).chave == "nova@pix.com"
+
+    @pytest.mark.asyncio
+    async def test_invalidar_volta_ao_banco(self, session_factory):
+        cache = CachePixConfig()
+        factory, session = session_factory(_config())
+        await cache.obter(factory)
+
+        cache.invalidar()
+        await cache.obter(factory)
+
+        assert session.execute.await_count == 2
@@ -0,0 +1,134 @@
+"""
+Testes do envio em lote aos canais de log - HugMe Bot
+
+Cobre o agrupamento em mensagens de até 10 embeds, o limite de caracteres,
+o envio por tempo e o descarte quando a fila está cheia.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from bot.servicos.CanalLogs import CanalLogs
+
+
+def _bot(canal):
+    bot = MagicMock()
+    bot.get_channel = MagicMock(return_value=canal)
+    return bot
+
+
+def _embed(texto="log"):
+    return discord.Embed(title="Log", description=texto)
+
+
+class TestCanalLogs:
+    """Testes para o CanalLogs"""
+
+    @pytest.mark.asyncio
+    async def test_agrupa_ate_dez_embeds_por_mensagem(self):
+        canal = AsyncMock()
+        sink = CanalLogs(intervalo=60)
+        for _ in range(25):
+            assert sink.enfileirar(_bot(canal), 1, _embed())
+
+        await sink.esvaziar()
+
+        tamanhos = [len(chamada.kwargs["embeds"]) for chamada in canal.send.await_args_list]
+        assert tamanhos == [10, 10, 5]
+        assert len(sink) == 0
+        await sink.parar()
+
+    @pytest.mark.asyncio
+    async def test_respeita_limite_de_caracteres(self):
+        canal = AsyncMock()
+        sink = CanalLogs(intervalo=60)
+        for _ in range(3):
+            sink.enfileirar(_bot(canal), 1, _embed("x" * 2500))
+
+        await sink.esvaziar()
+
+        tamanhos = [len(chamada.kwargs["embeds"]) for chamada in canal.send.await_args_list]
+        assert tamanhos == [2, 1]
+        await sink.parar()
+
+    @pytest.mark.asyncio
+    async def test_envia_depois_do_intervalo(self):
+        canal = AsyncMock()
+        sink = CanalLogs(intervalo=0.01)
+        sink.enfileirar(_bot(canal), 1, _embed())
+        sink.enfileirar(_bot(canal), 1, _embed())
+        assert not canal.send.called
+
+        await asyncio.sleep(0.05)
+
+        canal.send.assert_awaited_once()
+        assert len(canal.send.await_args.kwargs["embeds"]) == 2
+        await sink.parar()
+
+    @pytest.mark.asyncio
+    async def test_mensagem_cheia_nao_espera_o_intervalo(self):
+        canal = AsyncMock()
+        sink = CanalLogs(intervalo=60)
+        for _ in range(10):
+            sink.enfileirar(_bot(canal), 1, _embed())
+
+        await asyncio.sleep(0.01)
+
+        canal.send.assert_awaited_once()
+        await sink.parar()
+
+    @pytest.mark.asyncio
+    async def test_descarta_com_fila_cheia(self):
+        canal = AsyncMock()
+        sink = CanalLogs(intervalo=60, max_fila=2)
+
+        assert sink.enfileirar(_bot(canal), 1, _embed())
+        assert sink.enfileirar(_bot(canal), 1, _embed())
+        assert not sink.enfileirar(_bot(canal), 1, _embed())
+        assert sink.descartados == {"fila_cheia": 1}
+
+        # parar envia o que ficou na fila
+        await sink.parar()
+        canal.send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_erro_de_envio_descarta_o_lote(self):
+        canal = AsyncMock()
+        canal.send.side_effect = discord.HTTPException(MagicMock(status=500, reason="erro"), "erro")
+        sink = CanalLogs(intervalo=60)
+        sink.enfileirar(_bot(canal), 1, _embed())
+        sink.enfileirar(_bot(canal), 2, _embed())
+
+        await sink.esvaziar()
+
+        assert sink.descartados == {"erro_envio": 2}
+        assert len(sink) == 0
+        await sink.parar()
+
+    @pytest.mark.asyncio
+    async def test_parar_espera_o_envio_em_andamento(self):
+        """Um lote já tirado da fila não se perde se o bot desligar durante o envio"""
+        liberar = asyncio.Event()
+        canal = AsyncMock()
+
+        async def enviar(**kwargs):
+            await liberar.wait()
+
+        canal.send.side_effect = enviar
+        sink = CanalLogs(intervalo=60)
+        for _ in range(10):
+            sink.enfileirar(_bot(canal), 1, _embed())
+        await asyncio.sleep(0)  # a task tira o lote da fila e começa a enviar
+        assert len(sink) == 0
+
+        parada = asyncio.create_task(sink.parar())
+        await asyncio.sleep(0)
+        assert not parada.done()
+        liberar.set()
+        await parada
+
+        canal.send.assert_awaited_once()
+        assert sink.descartados == {}
@@ -0,0 +1,60 @@
+"""
+Testes do registro de engines - HugMe Bot
+
+Um único pool assíncrono configurável e um engine síncrono criado só
+quando usado, ambos a partir da mesma DATABASE_URL.
+"""
+
+from bot.database import RegistroEngines
+
+
+class TestRegistroEngines:
+    """Testes para o RegistroEngines"""
+
+    def test_drivers_a_partir_da_mesma_url(self):
+        """A URL assíncrona e a síncrona usam os drivers certos para cada engine"""
+        reg = RegistroEngines("mysql+pymysql://u:p@localhost/db")
+        assert reg.async_engine.url.drivername == "mysql+aiomysql"
+        assert reg.sync_engine.url.drivername == "mysql+pymysql"
+
+        reg = RegistroEngines("mysql://u:p@localhost/db")
+        assert reg.async_engine.url.drivername == "mysql+aiomysql"
+
+    def test_pool_configuravel_e_sync_preguicoso(self):
+        """O pool segue a configuração e o engine síncrono só nasce quando pedido"""
+        reg = RegistroEngines("mysql+aiomysql://u:p@localhost/db", pool_size=3, max_overflow=1,
+                              pool_recycle=600, sync_pool_size=1)
+        assert reg.async_engine.pool.size() == 3
+        assert reg.async_engine.pool._max_overflow == 1
+        assert reg.async_engine.pool._recycle == 600
+        assert set(reg.status()) == {"async"}
+
+        assert reg.sync_engine.pool.size() == 1
+        status = reg.status()
+        assert set(status) == {"async", "sync"}
+        assert status["async"]["checkedout"] == 0
+
+
+class TestInstrumentacao:
+    """Testes da instrumentação de consultas e do pool"""
+
+    def test_latencia_e_espera_do_pool(self, tmp_path):
+        """Cada instrução vira uma observação e cada checkout mede a espera"""
+        from sqlalchemy import create_engine, text
+
+        from bot.database import PoolSincronoMedido, consultas, instrumentar_engine
+        from bot.servicos.Metricas import metricas
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'm.db'}", poolclass=PoolSincronoMedido)
+        instrumentar_engine(engine, "sync")
+        espera = metricas.histograma("db_pool_checkout_wait_seconds", engine="sync")
+        latencia = metricas.histograma("db_query_seconds", engine="sync", operacao="SELECT")
+        antes_espera, antes_latencia = espera.total, latencia.total
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT   1  /* teste_instrumentacao */"))
+        engine.dispose()
+
+        assert espera.total == antes_espera + 1
+        assert latencia.total == antes_latencia + 1
+        assert any("teste_instrumentacao" in item["statement"] for item in consultas.mais_lentas(500))
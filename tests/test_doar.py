@@ -7,6 +7,7 @@ simulando interações completas do usuário ao admin.
 
 import pytest
 import asyncio
+import discord
 from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime, timedelta, timezone
 
@@ -15,6 +16,37 @@ from bot.commands.doar import (
     DoarCommands, DonationModal, DoarView, DMConfirmationView,
     get_brasilia_time, disable_admin_buttons
 )
+from bot.database.models import PixConfig
+from bot.servicos.CachePixConfig import cache_pix_config
+
+
+def _sessao_assincrona(mock_session_cls):
+    """Configura o AsyncSessionLocal falso: `async with` da sessão e de session.begin()"""
+    session = MagicMock()
+    session.execute = AsyncMock()
+    mock_session_cls.return_value.__aenter__ = AsyncMock(return_value=session)
+    mock_session_cls.return_value.__aexit__ = AsyncMock(return_value=None)
+    session.begin.return_value.__aenter__ = AsyncMock(return_value=None)
+    session.begin.return_value.__aexit__ = AsyncMock(return_value=None)
+    return session
+
+
+def _resultado(objeto):
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = objeto
+    return result
+
+
+@pytest.fixture(autouse=True)
+def doacoes_pendentes_falsas():
+    """Persistência das doações pendentes em memória, sem banco"""
+    with patch('bot.commands.doar.doacoes_pendentes') as falsas:
+        falsas.salvar = AsyncMock()
+        falsas.obter = AsyncMock(return_value=None)
+        falsas.listar = AsyncMock(return_value=[])
+        falsas.marcar_resolvida = AsyncMock()
+        falsas.remover = AsyncMock()
+        yield falsas
 
 
 class TestDoarCommands:
@@ -100,8 +132,10 @@ class TestDonationModal:
     def mock_bot(self):
         """Fixture para mock do bot"""
         bot = AsyncMock()
-        cog = AsyncMock()
-        bot.get_cog.return_value = cog
+        cog = MagicMock()  # agendar_* são síncronos
+        cog.persistir_pendente = AsyncMock()
+        cog.encerrar_anterior = AsyncMock()
+        bot.get_cog = MagicMock(return_value=cog)  # get_cog é síncrono
         return bot
 
     @pytest.fixture
@@ -135,49 +169,68 @@ class TestDonationModal:
         modal.amount = MagicMock()
         modal.amount.value = "10.00"
 
-        # Mock do banco
-        with patch('bot.commands.doar.SessionLocal') as mock_session_cls:
-            mock_session = MagicMock()
-            mock_session_cls.return_value.__enter__ = MagicMock(return_value=mock_session)
-            mock_session_cls.return_value.__exit__ = MagicMock(return_value=None)
-
-            # Mock query para Apoiador
-            mock_apoiador = None
-            # Mock query para PixConfig
-            mock_config = MagicMock()
-            mock_config.chave = "pix_key_123"
-            mock_config.static_qr_url = "http://qr.url"
-
-            # Configurar query para retornar objetos diferentes
-            def mock_query(model):
-                if model.__name__ == 'Apoiador':
-                    mock_q = MagicMock()
-                    mock_q.filter_by.return_value.first.return_value = mock_apoiador
-                    return mock_q
-                elif model.__name__ == 'PixConfig':
-                    mock_q = MagicMock()
-                    mock_q.first.return_value = mock_config
-                    return mock_q
-                return MagicMock()
-
-            mock_session.query = mock_query
-
-            # Mock fetch_channel
+        # Configuração PIX já carregada no cache
+        cache_pix_config.definir(PixConfig(
+            chave="pix_key_123", static_qr_url="http://qr.url",
+            nome_titular="Titular", cidade="Cidade",
+        ))
+
+        # Mock do banco (sessão assíncrona, uma transação)
+        with patch('bot.commands.doar.AsyncSessionLocal') as mock_session_cls:
+            mock_session = _sessao_assincrona(mock_session_cls)
+
+            # Só o Apoiador é consultado (inexistente)
+            mock_session.execute = AsyncMock(return_value=_resultado(None))
+
+            # Canal de log fora do cache do gateway: uma busca REST
             mock_channel = AsyncMock()
             mock_admin_msg = AsyncMock()
             mock_channel.send = AsyncMock(return_value=mock_admin_msg)
+            mock_bot.get_channel = MagicMock(return_value=None)
             mock_bot.fetch_channel = AsyncMock(return_value=mock_channel)
 
             # Executa on_submit
-            await modal.on_submit(interaction)
+            with patch('bot.commands.doar.app_config.DONO_LOG_CHANNEL', "999"):
+                await modal.on_submit(interaction)
+            mock_bot.fetch_channel.assert_awaited_once_with(999)
 
-            # Verifica se response.send_message foi chamado
-            assert interaction.response.send_message.called
+            # ACK imediato e respostas via followup
+            interaction.response.defer.assert_awaited_once()
+            assert interaction.followup.send.called
 
             # Verifica se DM foi criada e send chamado
             assert interaction.user.create_dm.called
             assert mock_dm_channel.send.called
 
+            # Apoiador novo gravado na mesma sessão
+            assert mock_session.add.call_args[0][0].id_pagamento == "doacao_discord_user_12345"
+
+            # Doação anterior do mesmo usuário encerrada antes de reagendar os prazos
+            cog = mock_bot.get_cog.return_value
+            cog.encerrar_anterior.assert_awaited_once_with("doacao_discord_user_12345")
+
+            # Prazos agendados e doação pendente persistida com a mensagem dos admins
+            assert cog.agendar_expiracao.called and cog.agendar_autodelete.called
+            pendente = cog.persistir_pendente.call_args[0][0]
+            assert pendente.mensagem_admin_id == str(mock_admin_msg.id)
+
+    @pytest.mark.asyncio
+    async def test_modal_submit_sem_config_pix(self, modal):
+        """Sem configuração PIX a resposta sai do cache, sem tocar no banco"""
+        interaction = AsyncMock()
+        interaction.user.id = 12345
+        interaction.guild.id = 67890
+        modal.amount = MagicMock()
+        modal.amount.value = "10.00"
+        cache_pix_config.definir(None)
+
+        with patch('bot.commands.doar.AsyncSessionLocal') as mock_session_cls:
+            await modal.on_submit(interaction)
+
+            assert not mock_session_cls.called
+            assert not interaction.response.defer.called
+            assert "Configuração PIX não encontrada" in interaction.response.send_message.call_args[0][0]
+
     @pytest.mark.asyncio
     async def test_modal_submit_invalid_amount(self, modal):
         """Testa submissão com valor inválido"""
@@ -316,7 +369,7 @@ class TestInteractionListener:
         assert "Obrigado pelo pagamento" in call_args[0][0]
 
     @pytest.mark.asyncio
-    async def test_confirm_payment_button(self, cog, mock_bot):
+    async def test_confirm_payment_button(self, cog, mock_bot, doacoes_pendentes_falsas):
         """Testa botão de confirmação de pagamento pelo admin"""
         interaction = AsyncMock()
         interaction.data = {"custom_id": "confirm_payment_ref123"}
@@ -325,24 +378,14 @@ class TestInteractionListener:
         interaction.response = AsyncMock()
         interaction.response.send_message = AsyncMock()
 
-        # Mock do banco
-        with patch('bot.commands.doar.SessionLocal') as mock_session_cls:
-            mock_session = MagicMock()
-            mock_session_cls.return_value.__enter__ = MagicMock(return_value=mock_session)
-            mock_session_cls.return_value.__exit__ = MagicMock(return_value=None)
+        # Mock do banco (sessão assíncrona, uma transação)
+        with patch('bot.commands.doar.AsyncSessionLocal') as mock_session_cls:
+            mock_session = _sessao_assincrona(mock_session_cls)
 
             mock_apoiador = MagicMock()
             mock_apoiador.discord_id = "12345"
             mock_apoiador.guild_id = "67890"
-
-            def mock_query(model):
-                if model.__name__ == 'Apoiador':
-                    mock_q = MagicMock()
-                    mock_q.filter_by.return_value.first.return_value = mock_apoiador
-                    return mock_q
-                return MagicMock()
-
-            mock_session.query = mock_query
+            mock_session.execute = AsyncMock(return_value=_resultado(mock_apoiador))
 
             # Mock guild e member
             mock_guild = AsyncMock()
@@ -359,8 +402,117 @@ class TestInteractionListener:
 
             # Verifica se apoiador.ja_pago foi setado
             assert mock_apoiador.ja_pago == True
-            # Verifica resposta
-            assert interaction.response.send_message.called
+            # A edição da mensagem é o ACK; a confirmação vai por followup
+            interaction.response.edit_message.assert_awaited_once()
+            assert interaction.followup.send.called
+            # Doação pendente resolvida na mesma transação
+            doacoes_pendentes_falsas.marcar_resolvida.assert_awaited_once_with("ref123", session=mock_session)
+            cog.role_manager.assign_default_supporter_role.assert_awaited_once_with(mock_member)
+
+    @pytest.mark.asyncio
+    async def test_confirm_payment_erro_ao_buscar_membro(self, cog, mock_bot, doacoes_pendentes_falsas):
+        """Erro HTTP ao buscar o membro: pagamento fica gravado e o admin é avisado"""
+        interaction = AsyncMock()
+        interaction.data = {"custom_id": "confirm_payment_ref123"}
+        interaction.message = AsyncMock()
+        interaction.message.embeds = [MagicMock()]
+
+        admin_msg = AsyncMock()
+        cog.admin_messages["ref123"] = admin_msg
+
+        with patch('bot.commands.doar.AsyncSessionLocal') as mock_session_cls, \
+                patch('bot.commands.doar.disable_admin_buttons', new=AsyncMock()) as desabilitar, \
+                patch('bot.commands.doar.resolvedor_membros') as resolvedor:
+            mock_session = _sessao_assincrona(mock_session_cls)
+            mock_apoiador = MagicMock()
+            mock_apoiador.discord_id = "12345"
+            mock_apoiador.guild_id = "67890"
+            mock_session.execute = AsyncMock(return_value=_resultado(mock_apoiador))
+
+            mock_bot.get_guild = MagicMock(return_value=MagicMock())
+            resolvedor.resolver = AsyncMock(side_effect=discord.HTTPException(MagicMock(status=500, reason="erro"), "erro"))
+            cog.role_manager = AsyncMock()
+
+            await cog.on_interaction(interaction)
+
+            assert mock_apoiador.ja_pago == True
+            cog.role_manager.assign_default_supporter_role.assert_not_called()
+            desabilitar.assert_awaited_once_with(admin_msg)
+            assert "cargos não foram aplicados" in interaction.followup.send.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_nova_doacao_encerra_a_anterior(self, cog, doacoes_pendentes_falsas):
+        """Mesmo reference_id: a doação anterior é apagada em vez de ficar pendente para sempre"""
+        from bot.commands.doar import chave_autodelete, chave_expiracao
+        from bot.servicos.AgendadorPrazos import agendador_prazos
+
+        mensagem_anterior = AsyncMock()
+        admin_anterior = AsyncMock()
+        cog.admin_messages["ref_repetida"] = admin_anterior
+        daqui_a_pouco = datetime.now(timezone.utc) + timedelta(minutes=5)
+        cog.agendar_expiracao("ref_repetida", daqui_a_pouco, message=mensagem_anterior)
+        cog.agendar_autodelete("ref_repetida", daqui_a_pouco, mensagens=[mensagem_anterior, None])
+
+        with patch('bot.commands.doar.disable_admin_buttons', new=AsyncMock()) as desabilitar:
+            await cog.encerrar_anterior("ref_repetida")
+
+        desabilitar.assert_awaited_once_with(admin_anterior)
+        mensagem_anterior.delete.assert_awaited_once()
+        assert not agendador_prazos.pendente(chave_expiracao("ref_repetida"))
+        assert not agendador_prazos.pendente(chave_autodelete("ref_repetida"))
+        assert "ref_repetida" not in cog.admin_messages
+        doacoes_pendentes_falsas.remover.assert_awaited_once_with("ref_repetida")
+
+        # Sem doação anterior, nada acontece
+        await cog.encerrar_anterior("ref_nova")
+        doacoes_pendentes_falsas.obter.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_expiracao_agendada(self, cog, doacoes_pendentes_falsas):
+        """A doação expira no prazo com uma única edição, e confirmar cancela o prazo"""
+        from bot.commands.doar import chave_expiracao
+        from bot.servicos.AgendadorPrazos import agendador_prazos
+
+        message = AsyncMock()
+        message.embeds = [MagicMock()]
+        cog.agendar_expiracao("ref_expira", datetime.now(timezone.utc) + timedelta(seconds=0.02), message=message)
+        cog.agendar_expiracao("ref_cancelada", datetime.now(timezone.utc) + timedelta(seconds=0.02), message=message)
+        agendador_prazos.cancelar(chave_expiracao("ref_cancelada"))
+        await asyncio.sleep(0.06)
+
+        message.edit.assert_awaited_once_with(embeds=[message.embeds[0]], view=None)
+        assert not agendador_prazos.pendente(chave_expiracao("ref_expira"))
+        doacoes_pendentes_falsas.marcar_resolvida.assert_awaited_once_with("ref_expira")
+
+    @pytest.mark.asyncio
+    async def test_reidrata_pendentes_e_busca_mensagem_no_vencimento(self, cog, mock_bot, doacoes_pendentes_falsas):
+        """Após um reinício, os prazos voltam ao agendador e a mensagem só é buscada quando vence"""
+        from bot.database.models import DoacaoPendente
+        from bot.servicos.AgendadorPrazos import agendador_prazos
+
+        vencida = datetime.now(timezone.utc) - timedelta(seconds=1)
+        pendente = DoacaoPendente(
+            reference_id="ref_reinicio", discord_id="1", guild_id="2",
+            canal_usuario_id="10", mensagem_usuario_id="11",
+            expira_em=vencida.replace(tzinfo=None),  # MySQL devolve sem fuso
+            apagar_em=datetime.now(timezone.utc) + timedelta(minutes=5),
+            resolvida=False,
+        )
+        doacoes_pendentes_falsas.listar.return_value = [pendente]
+        doacoes_pendentes_falsas.obter.return_value = pendente
+        mensagem = AsyncMock()
+        mensagem.embeds = [MagicMock()]
+        mock_bot.get_partial_messageable = MagicMock()
+        mock_bot.get_partial_messageable.return_value.fetch_message = AsyncMock(return_value=mensagem)
+
+        assert await cog.reidratar_pendentes() == 1
+        assert agendador_prazos.pendente("apagar_pix_ref_reinicio")
+        await asyncio.sleep(0.02)
+        agendador_prazos.cancelar("apagar_pix_ref_reinicio")
+
+        mock_bot.get_partial_messageable.assert_called_once_with(10)
+        mensagem.edit.assert_awaited_once_with(embeds=[mensagem.embeds[0]], view=None)
+        doacoes_pendentes_falsas.marcar_resolvida.assert_awaited_once_with("ref_reinicio")
 
     @pytest.mark.asyncio
     async def test_reject_payment_button(self, cog):
@@ -370,14 +522,28 @@ class TestInteractionListener:
         interaction.message = AsyncMock()
         interaction.message.embeds = [MagicMock()]
         interaction.response = AsyncMock()
-        interaction.response.send_message = AsyncMock()
 
         await cog.on_interaction(interaction)
 
-        # Verifica se embed foi editado com rejeição
-        assert interaction.message.edit.called
-        # Verifica resposta
-        assert interaction.response.send_message.called
+        # A edição da mensagem é o ACK; a rejeição vai por followup
+        interaction.response.edit_message.assert_awaited_once()
+        interaction.message.edit.assert_not_called()
+        assert "Pagamento rejeitado" in interaction.followup.send.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_reject_payment_nao_reedita_a_propria_mensagem(self, cog):
+        """A mensagem recuperada do admin é a mesma que já foi editada no ACK"""
+        interaction = AsyncMock()
+        interaction.data = {"custom_id": "reject_payment_ref123"}
+        interaction.message = AsyncMock()
+        interaction.message.id = 42
+        interaction.message.embeds = [MagicMock()]
+        cog.admin_messages["ref123"] = interaction.message
+
+        with patch('bot.commands.doar.disable_admin_buttons', new=AsyncMock()) as desabilitar:
+            await cog.on_interaction(interaction)
+
+        desabilitar.assert_not_called()
 
 
 class TestUtilityFunctions:
@@ -0,0 +1,65 @@
+"""
+Testes do filtro de safeguard do chat - HugMe Bot
+
+Garante que a regex compilada classifica crise e tópico sensível numa
+única varredura, ignora acentos e caixa, e nunca deixa passar algo que
+a checagem antiga (`keyword in text.lower()`) pegaria.
+"""
+
+import pytest
+
+from bot.commands.deepseekchat import CRISIS_KEYWORDS, SENSITIVE_KEYWORDS
+from bot.servicos.FiltroSafeguard import Classificacao, FiltroSafeguard, normalizar
+
+
+@pytest.fixture(scope="module")
+def filtro():
+    return FiltroSafeguard(SENSITIVE_KEYWORDS, CRISIS_KEYWORDS)
+
+
+def test_normalizar():
+    assert normalizar("NÃO Quero Ação 💙") == b"nao quero acao "
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("oi, tudo bem? bora jogar?", Classificacao(crise=False, sensivel=False)),
+    ("às vezes eu QUERO MORRER", Classificacao(crise=True, sensivel=True)),
+    ("ele vai me torturar", Classificacao(crise=True, sensivel=False)),
+    ("tive uma crise de pânico", Classificacao(crise=False, sensivel=True)),
+    # Sem acento na mensagem, com acento na lista (e vice-versa)
+    ("pensei em automutilacao", Classificacao(crise=True, sensivel=True)),
+    ("depressao profunda", Classificacao(crise=False, sensivel=True)),
+    ("ME   matar", Classificacao(crise=True, sensivel=True)),
+    ("nao quero\nmais viver", Classificacao(crise=True, sensivel=True)),
+])
+def test_classificacao(filtro, texto, esperado):
+    assert filtro.classificar(texto) == esperado
+
+
+def test_palavras_sobrepostas():
+    """Uma palavra que contém outra também herda a categoria dela"""
+    filtro = FiltroSafeguard(sensiveis=["dor"], crise=["dormir mal"])
+    assert filtro.classificar("vou dormir mal") == Classificacao(crise=True, sensivel=True)
+
+    filtro = FiltroSafeguard(sensiveis=["abcd"], crise=["bc"])
+    assert filtro.classificar("xabcdx") == Classificacao(crise=True, sensivel=True)
+
+
+@pytest.mark.parametrize("palavra", sorted(set(SENSITIVE_KEYWORDS) | set(CRISIS_KEYWORDS)))
+def test_nunca_menos_que_a_checagem_antiga(filtro, palavra):
+    texto = f"Olha... {palavra.upper()} sabe?"
+    classificacao = filtro.classificar(texto)
+    assert classificacao.sensivel >= any(k in texto.lower() for k in SENSITIVE_KEYWORDS)
+    assert classificacao.crise >= any(k in texto.lower() for k in CRISIS_KEYWORDS)
+
+
+def test_sobreposicao_pega_palavra_dividida_entre_trechos(filtro):
+    """No streaming só o trecho novo é relido; a sobreposição cobre palavras divididas"""
+    texto = "x" * 300 + " eu quero mo"
+    verificado = len(texto)
+    assert not filtro.classificar(texto).sensivel
+
+    texto += "rrer"
+    inicio = max(0, verificado - filtro.sobreposicao)
+    assert inicio > 0
+    assert filtro.classificar(texto[inicio:]).crise
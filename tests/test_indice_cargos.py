@@ -0,0 +1,85 @@
+"""
+Testes do índice de cargos - HugMe Bot
+
+O índice é montado uma vez e depois só recebe os deltas dos eventos de
+membros, sem varrer o servidor a cada /supporter_stats.
+"""
+
+from unittest.mock import MagicMock, PropertyMock
+
+from bot.servicos.IndiceCargos import IndiceCargos
+
+
+def _role(role_id):
+    role = MagicMock()
+    role.id = role_id
+    return role
+
+
+def _member(guild, *roles):
+    member = MagicMock()
+    member.guild = guild
+    member.roles = list(roles)
+    return member
+
+
+def _guild(chunked=True):
+    guild = MagicMock()
+    guild.id = 1
+    guild.chunked = chunked
+    return guild
+
+
+class TestIndiceCargos:
+    """Testes para o IndiceCargos"""
+
+    def test_monta_uma_vez_e_aplica_eventos(self):
+        """Após montado, entradas/saídas/alterações mantêm a contagem sem nova varredura"""
+        guild = _guild()
+        vip, ouro = _role(10), _role(20)
+        a, b = _member(guild, vip), _member(guild, vip, ouro)
+        membros = PropertyMock(return_value=[a, b])
+        type(guild).members = membros
+        indice = IndiceCargos()
+
+        assert indice.contar(guild, vip) == 2
+        assert indice.contar(guild, ouro) == 1
+
+        c = _member(guild, ouro)
+        indice.membro_entrou(c)
+        indice.membro_saiu(a)
+        indice.membro_atualizado(b, _member(guild, ouro))
+
+        assert indice.contar(guild, vip) == 0
+        assert indice.contar(guild, ouro) == 2
+        assert membros.call_count == 1
+
+        indice.cargo_removido(MagicMock(id=20, guild=guild))
+        assert indice.contar(guild, ouro) == 0
+
+    def test_servidor_incompleto_nao_e_indexado(self):
+        """Sem a lista completa de membros, conta pelo próprio cargo e não guarda índice"""
+        guild = _guild(chunked=False)
+        role = _role(10)
+        role.members = [MagicMock(), MagicMock()]
+        indice = IndiceCargos()
+
+        assert indice.contar(guild, role) == 2
+        indice.membro_entrou(_member(guild, role))
+        assert indice.contar(guild, role) == 2
+
+    def test_descartar_remonta_do_cache_novo(self):
+        """Depois de um novo READY o índice é remontado a partir dos membros atuais"""
+        guild = _guild()
+        vip = _role(10)
+        membros = PropertyMock(return_value=[_member(guild, vip)])
+        type(guild).members = membros
+        indice = IndiceCargos()
+        assert indice.contar(guild, vip) == 1
+
+        # Eventos perdidos durante a reconexão: o cache novo tem dois membros
+        membros.return_value = [_member(guild, vip), _member(guild, vip)]
+        indice.descartar()
+
+        assert indice.contar(guild, vip) == 2
+        assert membros.call_count == 2
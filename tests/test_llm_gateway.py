@@ -0,0 +1,226 @@
+"""
+Testes do gateway de LLM - HugMe Bot
+
+Cobre a fila justa (limite global + round-robin por usuário) e o
+formato das chamadas feitas pelo LLMGateway.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from bot.servicos.LLMGateway import FilaJusta, LLMGateway, DEEPSEEK_CHAT_URL
+from bot.servicos.MensagemProgressiva import MensagemProgressiva
+from bot.servicos.Metricas import metricas
+
+
+class TestFilaJusta:
+    """Testes para a FilaJusta"""
+
+    @pytest.mark.asyncio
+    async def test_respeita_limite_global(self):
+        """Nunca concede mais vagas do que max_concurrency"""
+        fila = FilaJusta(max_concurrency=2, per_user_limit=5)
+        pico = 0
+
+        async def tarefa(user):
+            nonlocal pico
+            await fila.acquire(user)
+            pico = max(pico, fila.active)
+            await asyncio.sleep(0.01)
+            fila.release(user)
+
+        await asyncio.gather(*(tarefa(i % 3) for i in range(9)))
+
+        assert pico == 2
+        assert fila.active == 0
+        assert fila.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_round_robin_entre_usuarios(self):
+        """Um usuário com várias chamadas não passa na frente dos outros"""
+        fila = FilaJusta(max_concurrency=1)
+        ordem = []
+
+        async def tarefa(user, tag):
+            await fila.acquire(user)
+            ordem.append(tag)
+            await asyncio.sleep(0)
+            fila.release(user)
+
+        # Segura a única vaga até todo mundo entrar na fila
+        await fila.acquire("admin")
+        tarefas = [asyncio.create_task(tarefa("a", f"a{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        tarefas.append(asyncio.create_task(tarefa("b", "b0")))
+        await asyncio.sleep(0)
+        fila.release("admin")
+        await asyncio.gather(*tarefas)
+
+        assert ordem == ["a0", "b0", "a1", "a2"]
+
+    @pytest.mark.asyncio
+    async def test_cancelamento_libera_fila(self):
+        """Uma espera cancelada sai da fila sem consumir vaga"""
+        fila = FilaJusta(max_concurrency=1)
+        await fila.acquire("a")
+
+        espera = asyncio.create_task(fila.acquire("b"))
+        await asyncio.sleep(0)
+        assert fila.waiting == 1
+
+        espera.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await espera
+        assert fila.waiting == 0
+
+        fila.release("a")
+        assert fila.active == 0
+
+
+class TestLLMGateway:
+    """Testes para o LLMGateway"""
+
+    @pytest.fixture
+    def gateway(self):
+        return LLMGateway("chave", max_concurrency=2)
+
+    def _mock_session(self, payload=None, linhas=None):
+        resp = MagicMock()
+        resp.raise_for_status = MagicMock()
+        resp.json = AsyncMock(return_value=payload)
+
+        async def conteudo():
+            for linha in linhas or []:
+                yield linha
+        resp.content = conteudo()
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=resp)
+        ctx.__aexit__ = AsyncMock(return_value=None)
+        session = MagicMock()
+        session.post = MagicMock(return_value=ctx)
+        return session
+
+    @pytest.mark.asyncio
+    async def test_chat_retorna_conteudo(self, gateway):
+        """Monta o payload e devolve o conteúdo da primeira escolha"""
+        session = self._mock_session({"choices": [{"message": {"content": "oi!"}}]})
+        gateway._get_session = MagicMock(return_value=session)
+
+        resposta = await gateway.chat(
+            [{"role": "user", "content": "oi"}], user_id=1, max_tokens=50
+        )
+
+        assert resposta == "oi!"
+        args, kwargs = session.post.call_args
+        assert args[0] == DEEPSEEK_CHAT_URL
+        assert kwargs["json"]["max_tokens"] == 50
+        assert kwargs["json"]["model"] == "deepseek-chat"
+        assert gateway.fila.active == 0
+
+    @pytest.mark.asyncio
+    async def test_chat_resposta_inesperada(self, gateway):
+        """Respostas sem 'choices' viram ValueError e liberam a vaga"""
+        session = self._mock_session({"error": "boom"})
+        gateway._get_session = MagicMock(return_value=session)
+
+        with pytest.raises(ValueError):
+            await gateway.chat([{"role": "user", "content": "oi"}], user_id=1)
+        assert gateway.fila.active == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_chat_le_eventos_sse(self, gateway):
+        """Gera os deltas dos eventos SSE e para no [DONE]"""
+        linhas = [
+            b": keep-alive\n",
+            b'data: {"choices": [{"delta": {"role": "assistant"}}]}\n',
+            b'data: {"choices": [{"delta": {"content": "Ol"}}]}\n',
+            b"\n",
+            b'data: {"choices": [{"delta": {"content": "\xc3\xa1!"}}]}\n',
+            b"data: [DONE]\n",
+            b'data: {"choices": [{"delta": {"content": "ignorado"}}]}\n',
+        ]
+        session = self._mock_session(linhas=linhas)
+        gateway._get_session = MagicMock(return_value=session)
+
+        trechos = [t async for t in gateway.stream_chat([{"role": "user", "content": "oi"}], user_id=1)]
+
+        assert trechos == ["Ol", "á!"]
+        assert session.post.call_args[1]["json"]["stream"] is True
+        assert gateway.fila.active == 0
+
+    @pytest.mark.asyncio
+    async def test_registra_latencia_e_tokens(self, gateway):
+        """Cada completion vira uma observação de latência e soma os tokens do campo usage"""
+        session = self._mock_session({
+            "choices": [{"message": {"content": "oi!"}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+        })
+        gateway._get_session = MagicMock(return_value=session)
+        latencia = metricas.histograma("llm_request_seconds", modelo="modelo-teste", modo="chat", status="ok")
+        antes = latencia.total
+
+        await gateway.chat([{"role": "user", "content": "oi"}], model="modelo-teste", user_id=1)
+
+        contadores = metricas.contadores()
+        assert latencia.total == antes + 1
+        assert contadores[("llm_tokens_total", (("modelo", "modelo-teste"), ("tipo", "prompt")))] >= 12
+        assert contadores[("llm_tokens_total", (("modelo", "modelo-teste"), ("tipo", "completion")))] >= 3
+
+
+class TestMensagemProgressiva:
+    """Testes para a MensagemProgressiva"""
+
+    def _send(self):
+        enviadas = []
+
+        async def send(conteudo):
+            mensagem = MagicMock()
+            mensagem.content = conteudo
+            mensagem.edit = AsyncMock()
+            mensagem.delete = AsyncMock()
+            enviadas.append(mensagem)
+            return mensagem
+        return send, enviadas
+
+    @pytest.mark.asyncio
+    async def test_agrupa_edicoes(self):
+        """Espera o primeiro bloco e respeita o intervalo entre edições"""
+        send, enviadas = self._send()
+        resposta = MensagemProgressiva(send, prefix="@user ", intervalo=60, primeiro_bloco=5)
+
+        await resposta.update("Oi")
+        assert enviadas == []
+
+        await resposta.update("Oi, tudo")
+        await resposta.update("Oi, tudo bem")
+        await resposta.update("Oi, tudo bem?")
+        assert len(enviadas) == 1
+        assert enviadas[0].content == "@user Oi, tudo"
+        enviadas[0].edit.assert_not_called()
+
+        await resposta.finish("Oi, tudo bem?")
+        enviadas[0].edit.assert_called_once_with(content="@user Oi, tudo bem?")
+
+    @pytest.mark.asyncio
+    async def test_divide_textos_longos(self):
+        """Textos acima do limite continuam em novas mensagens"""
+        send, enviadas = self._send()
+        resposta = MensagemProgressiva(send, intervalo=0, primeiro_bloco=1, limite=10)
+
+        await resposta.finish("a" * 25)
+
+        assert [m.content for m in enviadas] == ["a" * 10, "a" * 10, "a" * 5]
+
+    @pytest.mark.asyncio
+    async def test_texto_substituido_apaga_sobras(self):
+        """Ao encolher o texto (safeguard), mensagens excedentes são apagadas"""
+        send, enviadas = self._send()
+        resposta = MensagemProgressiva(send, intervalo=0, primeiro_bloco=1, limite=10)
+
+        await resposta.update("b" * 15)
+        await resposta.finish("curto")
+
+        enviadas[0].edit.assert_called_once_with(content="curto")
+        enviadas[1].delete.assert_called_once()
+        assert len(resposta.mensagens) == 1
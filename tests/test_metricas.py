@@ -0,0 +1,129 @@
+"""
+Testes do registro de métricas - HugMe Bot
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import patch
+
+from bot.servicos.Metricas import Histograma, RegistroMetricas
+from bot.servicos.MonitorLoop import MonitorLoop
+
+
+class TestHistograma:
+    """Testes para o Histograma"""
+
+    def test_buckets_e_quantis(self):
+        """Contagem cumulativa por bucket e quantis estimados pelo limite do bucket"""
+        histograma = Histograma(buckets=(0.01, 0.1, 1))
+        for valor in (0.005, 0.005, 0.05, 0.5):
+            histograma.observar(valor)
+
+        assert histograma.cumulativo() == [(0.01, 2), (0.1, 3), (1, 4), (float("inf"), 4)]
+        assert histograma.quantil(0.5) == 0.01
+        assert histograma.quantil(0.99) == 0.5  # limitado ao máximo observado
+        assert histograma.resumo()["count"] == 4
+
+
+class TestRegistroMetricas:
+    """Testes para o RegistroMetricas"""
+
+    def test_snapshot(self):
+        """Contadores, histogramas e gauges aparecem com seus rótulos"""
+        registro = RegistroMetricas()
+        registro.incrementar("erros_total", engine="async")
+        registro.incrementar("erros_total", engine="async")
+        registro.observar("latencia_seconds", 0.2, operacao="SELECT")
+        registro.gauge("pool", lambda: {(("engine", "async"),): 3})
+        registro.gauge("falha", lambda: 1 / 0)
+
+        snapshot = registro.snapshot()
+
+        assert snapshot["counters"] == {"erros_total{engine=async}": 2}
+        assert snapshot["histograms"]["latencia_seconds{operacao=SELECT}"]["count"] == 1
+        assert snapshot["gauges"] == {"pool{engine=async}": 3}
+
+
+class TestExportacaoPrometheus:
+    """Testes do formato texto do Prometheus"""
+
+    def test_formato(self):
+        """HELP/TYPE por métrica, buckets cumulativos com +Inf, _sum e _count"""
+        registro = RegistroMetricas()
+        registro.descrever("requisicoes_total", "Requisições recebidas")
+        registro.incrementar("requisicoes_total", rota='/a"b')
+        registro.observar("latencia_seconds", 0.05, buckets=(0.1, 1), rota="/x")
+        registro.gauge("conexoes", lambda: 2)
+        registro.gauge("latencia_gateway", lambda: None)
+
+        texto = registro.exportar_prometheus()
+
+        assert "# HELP requisicoes_total Requisições recebidas\n# TYPE requisicoes_total counter" in texto
+        assert 'requisicoes_total{rota="/a\\"b"} 1' in texto
+        assert 'latencia_seconds_bucket{rota="/x",le="0.1"} 1' in texto
+        assert 'latencia_seconds_bucket{rota="/x",le="+Inf"} 1' in texto
+        assert 'latencia_seconds_sum{rota="/x"} 0.05' in texto
+        assert 'latencia_seconds_count{rota="/x"} 1' in texto
+        assert "conexoes 2" in texto
+        assert "\nlatencia_gateway " not in texto  # gauge sem valor não gera amostra
+        assert texto.endswith("\n")
+
+
+class TestMonitorLoop:
+    """Testes do monitor de atraso do event loop"""
+
+    @pytest.mark.asyncio
+    async def test_detecta_loop_bloqueado(self):
+        """Um callback síncrono que segura o loop aparece como atraso e bloqueio"""
+        monitor = MonitorLoop(intervalo=0.01, limite_bloqueio=0.05)
+        monitor.iniciar()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # bloqueia o loop de propósito
+        await asyncio.sleep(0.02)
+        await monitor.parar()
+
+        assert monitor.maior_atraso >= 0.05
+        assert monitor.bloqueios and monitor.bloqueios[-1]["pilha"] is None
+
+    @pytest.mark.asyncio
+    async def test_modo_debug_captura_pilha_e_avisa(self):
+        """A thread vigia registra a pilha do código que bloqueou e o aviso é enviado"""
+        avisos = []
+
+        async def notificar(relatorio):
+            avisos.append(relatorio)
+
+        def chamada_bloqueante():
+            time.sleep(0.3)
+
+        monitor = MonitorLoop(intervalo=0.01, limite_bloqueio=0.05, capturar_pilhas=True)
+        monitor.notificar = notificar
+        monitor.iniciar()
+        await asyncio.sleep(0.02)
+        chamada_bloqueante()
+        await asyncio.sleep(0.05)
+        await monitor.parar()
+
+        assert any("chamada_bloqueante" in (b["pilha"] or "") for b in monitor.bloqueios)
+        assert len(avisos) == 1  # avisos seguintes respeitam o intervalo_avisos
+
+
+class TestEndpointMetrics:
+    """Testes do endpoint /metrics do servidor web"""
+
+    def test_exporta_duracao_por_rota(self):
+        """Requisições anteriores aparecem rotuladas pelo template da rota"""
+        from fastapi.testclient import TestClient
+
+        from bot.web.main import app
+
+        with patch("bot.web.main.app_config.ADMIN_TOKEN", ""):
+            client = TestClient(app)
+            client.get("/status")
+            resposta = client.get("/metrics")
+
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("text/plain")
+        assert 'http_request_seconds_count{metodo="GET",rota="/status",status="200"}' in resposta.text
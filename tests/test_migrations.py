@@ -0,0 +1,109 @@
+"""
+Testes das migrações versionadas - HugMe Bot
+
+Usa um SQLite em memória com o schema antigo (sem os índices compostos) e
+mocks do engine assíncrono para o fluxo de inicialização.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import ProgrammingError
+
+from bot.database import migrations
+from bot.database.migrations import VERSAO_ATUAL, _aplicar, versoes_aplicadas
+from bot.database.models import Apoiador
+
+
+@pytest.fixture
+def engine_antigo():
+    """Banco com a tabela de apoiadores como era antes da migração 1"""
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        Apoiador.__table__.create(conn)
+        conn.execute(text("DROP INDEX ix_apoiadores_guild_ativo"))
+        conn.execute(text("DROP INDEX ix_apoiadores_ativo_ultimo_pagamento"))
+    yield engine
+    engine.dispose()
+
+
+class TestMigracoes:
+    """Testes para bot.database.migrations"""
+
+    def test_aplica_pendentes_e_registra_versao(self, engine_antigo):
+        """Cria os índices que faltam e registra a versão em schema_version"""
+        with engine_antigo.begin() as conn:
+            assert _aplicar(conn) == [1, 2]
+
+        with engine_antigo.connect() as conn:
+            indices = {ix["name"] for ix in inspect(conn).get_indexes("apoiadores")}
+            assert {"ix_apoiadores_guild_ativo", "ix_apoiadores_ativo_ultimo_pagamento"} <= indices
+            assert max(versoes_aplicadas(conn)) == VERSAO_ATUAL
+
+    def test_idempotente(self, engine_antigo):
+        """Rodar de novo não reaplica nada"""
+        with engine_antigo.begin() as conn:
+            _aplicar(conn)
+        with engine_antigo.begin() as conn:
+            assert _aplicar(conn) == []
+
+    def test_banco_novo_ja_com_indices(self):
+        """Num banco criado pelo create_all a migração só registra a versão"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            Apoiador.__table__.create(conn)
+            assert _aplicar(conn) == [1, 2]
+        engine.dispose()
+
+    def test_cria_tabela_de_doacoes_pendentes(self, engine_antigo):
+        """A migração 2 cria a tabela nova em bancos que já existiam"""
+        with engine_antigo.begin() as conn:
+            _aplicar(conn)
+
+        with engine_antigo.connect() as conn:
+            assert inspect(conn).has_table("doacoes_pendentes")
+
+
+def _engine_async(versao=None, erro=None):
+    """Engine assíncrono falso: connect() responde a consulta de versão, begin() registra run_sync"""
+    conn = AsyncMock()
+    if erro:
+        conn.execute.side_effect = erro
+    else:
+        conn.execute.return_value = MagicMock(scalar=MagicMock(return_value=versao))
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__.return_value = conn
+    engine.begin.return_value.__aenter__.return_value = conn
+    return engine, conn
+
+
+class TestInicializarSchema:
+    """Testes para inicializar_schema"""
+
+    @pytest.mark.asyncio
+    async def test_banco_atual_nao_faz_introspeccao(self):
+        """Na versão atual: uma consulta e nenhum create_all/migração"""
+        engine, conn = _engine_async(versao=VERSAO_ATUAL)
+        with patch.object(migrations, "aplicar_migracoes", AsyncMock()) as aplicar:
+            assert await migrations.inicializar_schema(engine) == []
+        conn.run_sync.assert_not_called()
+        aplicar.assert_not_called()
+        engine.begin.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_banco_sem_versao_cria_tabelas(self):
+        """Sem schema_version: create_all seguido das migrações"""
+        engine, conn = _engine_async(erro=ProgrammingError("SELECT", {}, Exception("no such table")))
+        with patch.object(migrations, "aplicar_migracoes", AsyncMock(return_value=[1])) as aplicar:
+            assert await migrations.inicializar_schema(engine) == [1]
+        conn.run_sync.assert_awaited_once_with(migrations.Base.metadata.create_all)
+        aplicar.assert_awaited_once_with(engine)
+
+    @pytest.mark.asyncio
+    async def test_banco_atrasado_so_aplica_pendentes(self):
+        """Versionado mas atrasado: só as migrações, sem create_all"""
+        engine, conn = _engine_async(versao=0)
+        with patch.object(migrations, "aplicar_migracoes", AsyncMock(return_value=[1])) as aplicar:
+            await migrations.inicializar_schema(engine)
+        conn.run_sync.assert_not_called()
+        aplicar.assert_awaited_once_with(engine)
@@ -0,0 +1,79 @@
+"""
+Testes do rastreamento de comandos - HugMe Bot
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from bot.database import instrumentar_engine
+from bot.servicos.Rastreamento import JanelaLatencias, Rastreador, rastreador
+
+
+class TestJanelaLatencias:
+    """Testes para a JanelaLatencias"""
+
+    def test_percentis_por_comando(self):
+        """Percentis nearest-rank e média dos spans por execução"""
+        janela = JanelaLatencias(janela=60)
+        for ms in range(1, 101):
+            janela.registrar("rank", ms / 1000, {"db": [0.002, 1]}, "ok" if ms != 100 else "erro")
+        janela.registrar("hug", 0.5, {}, "ok")
+
+        rank, hug = sorted(janela.estatisticas(), key=lambda item: item["comando"], reverse=True)
+
+        assert rank["count"] == 100 and rank["erros"] == 1
+        assert (rank["p50"], rank["p95"], rank["p99"]) == (0.05, 0.095, 0.099)
+        assert rank["spans_medios"]["db"] == pytest.approx(0.002)
+        assert hug["p99"] == 0.5
+
+    def test_descarta_fora_da_janela(self):
+        """Amostras mais velhas que a janela não entram nas estatísticas"""
+        janela = JanelaLatencias(janela=60)
+        janela.registrar("rank", 0.1, {}, "ok")
+        comando, fila = next(iter(janela._amostras.items()))
+        fila[0] = (fila[0][0] - 120,) + fila[0][1:]
+
+        assert janela.estatisticas() == []
+
+
+class TestRastreador:
+    """Testes para o Rastreador"""
+
+    @pytest.mark.asyncio
+    async def test_spans_entram_no_rastro_da_task(self):
+        """Spans registrados dentro do comando vão para o rastro dele, e só para ele"""
+        local = Rastreador()
+
+        async def comando(nome, espera):
+            rastro = local.iniciar(nome, "Cog", "slash")
+            with local.span("llm"):
+                await asyncio.sleep(espera)
+            local.registrar_span("db", 0.01)
+            local.finalizar(rastro, "ok")
+            local.finalizar(rastro, "erro")  # idempotente
+            return rastro
+
+        a, b = await asyncio.gather(comando("a", 0.02), comando("b", 0.0))
+
+        assert a.spans["llm"][0] >= 0.02 and b.spans["llm"][0] < 0.02
+        assert a.spans["db"] == [0.01, 1]
+        assert [item["comando"] for item in local.janela.estatisticas()] == ["a", "b"]
+        assert all(item["erros"] == 0 for item in local.janela.estatisticas())
+
+    @pytest.mark.asyncio
+    async def test_rastrear_componente_e_consultas(self, tmp_path):
+        """rastrear() cobre botões/modais, e as consultas SQL viram spans de db"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}")
+        instrumentar_engine(engine, "sync")
+
+        async with rastreador.rastrear("confirm_payment", "DoarCommands") as rastro:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        engine.dispose()
+
+        assert rastro.finalizado
+        assert rastro.spans["db"][1] == 2
+        assert rastreador.atual() is None
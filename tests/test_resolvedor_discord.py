@@ -0,0 +1,132 @@
+"""
+Testes dos resolvedores de membros e canais - HugMe Bot
+
+Garante que a busca de membros e canais usa o cache do gateway, faz no
+máximo uma chamada REST e lembra por pouco tempo do que não existe.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from bot.servicos.ResolvedorDiscord import ResolvedorCanais, ResolvedorMembros
+
+
+def _guild(member=None, fetch=None):
+    guild = MagicMock()
+    guild.id = 10
+    guild.get_member = MagicMock(return_value=member)
+    guild.fetch_member = fetch or AsyncMock()
+    guild.chunk = AsyncMock()
+    return guild
+
+
+def _not_found():
+    resp = MagicMock(status=404, reason="Not Found")
+    return discord.NotFound(resp, "Unknown Member")
+
+
+class TestResolvedorMembros:
+    """Testes para o ResolvedorMembros"""
+
+    @pytest.mark.asyncio
+    async def test_usa_cache_do_gateway(self):
+        """Membro em cache não gera chamada REST nem chunk"""
+        membro = MagicMock()
+        guild = _guild(member=membro)
+
+        assert await ResolvedorMembros().resolver(guild, 1) is membro
+        guild.fetch_member.assert_not_called()
+        guild.chunk.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_busca_pontual_fora_do_cache(self):
+        """Fora do cache, faz um único fetch_member"""
+        membro = MagicMock()
+        guild = _guild(fetch=AsyncMock(return_value=membro))
+
+        assert await ResolvedorMembros().resolver(guild, "1") is membro
+        guild.fetch_member.assert_awaited_once_with(1)
+        guild.chunk.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cache_negativo(self):
+        """Quem não está no servidor não é buscado de novo até o TTL expirar"""
+        guild = _guild(fetch=AsyncMock(side_effect=_not_found()))
+        resolvedor = ResolvedorMembros(ttl_negativo=60)
+
+        assert await resolvedor.resolver(guild, 1) is None
+        assert await resolvedor.resolver(guild, 1) is None
+        assert guild.fetch_member.await_count == 1
+
+        resolvedor.invalidar(guild.id, 1)
+        assert await resolvedor.resolver(guild, 1) is None
+        assert guild.fetch_member.await_count == 2
+
+
+def _bot(channel=None, fetch=None):
+    bot = MagicMock()
+    bot.get_channel = MagicMock(return_value=channel)
+    bot.fetch_channel = fetch or AsyncMock()
+    return bot
+
+
+class TestResolvedorCanais:
+    """Testes para o ResolvedorCanais"""
+
+    @pytest.mark.asyncio
+    async def test_usa_cache_do_gateway(self):
+        canal = MagicMock()
+        bot = _bot(channel=canal)
+
+        assert await ResolvedorCanais().resolver(bot, "5") is canal
+        bot.get_channel.assert_called_once_with(5)
+        bot.fetch_channel.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_busca_rest_uma_vez(self):
+        """Fora do gateway, o canal é buscado uma vez e reaproveitado"""
+        canal = MagicMock()
+        bot = _bot(fetch=AsyncMock(return_value=canal))
+        resolvedor = ResolvedorCanais()
+
+        assert await resolvedor.resolver(bot, 5) is canal
+        assert await resolvedor.resolver(bot, 5) is canal
+        bot.fetch_channel.assert_awaited_once_with(5)
+
+    @pytest.mark.asyncio
+    async def test_buscas_simultaneas_compartilham_a_chamada(self):
+        canal = MagicMock()
+
+        async def buscar(channel_id):
+            await asyncio.sleep(0)
+            return canal
+
+        bot = _bot(fetch=AsyncMock(side_effect=buscar))
+        resolvedor = ResolvedorCanais()
+
+        resultados = await asyncio.gather(*(resolvedor.resolver(bot, 5) for _ in range(3)))
+        assert resultados == [canal, canal, canal]
+        assert bot.fetch_channel.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_canal_apagado_e_cache_negativo(self):
+        canal = MagicMock()
+        bot = _bot(fetch=AsyncMock(return_value=canal))
+        resolvedor = ResolvedorCanais(ttl_negativo=60)
+        await resolvedor.resolver(bot, 5)
+
+        # Canal apagado: a próxima resolução volta à API, que responde 404
+        resolvedor.invalidar(5)
+        bot.fetch_channel.side_effect = _not_found()
+        assert await resolvedor.resolver(bot, 5) is None
+        assert await resolvedor.resolver(bot, 5) is None
+        assert bot.fetch_channel.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_id_vazio(self):
+        bot = _bot()
+        assert await ResolvedorCanais().resolver(bot, None) is None
+        bot.get_channel.assert_not_called()
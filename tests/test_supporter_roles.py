@@ -27,6 +27,29 @@ def mock_session():
     return session
 
 
+class _AsyncSessionAdapter:
+    """Expõe uma Session síncrona (SQLite em memória) com a interface usada de AsyncSession"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+
+@pytest.fixture
+def sqlite_session():
+    """Banco SQLite em memória com a tabela de apoiadores"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine("sqlite://")
+    Apoiador.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
 @pytest.fixture
 def mock_member():
     """Mock Discord member"""
@@ -121,49 +144,65 @@ class TestSupporterRoleManager:
 
     @pytest.mark.asyncio
     async def test_bulk_update_all_supporters(self, role_manager, mock_session):
-        """Test bulk updating all supporters"""
+        """Test bulk updating all supporters: only members whose roles change hit the API"""
+        roles = {}
+        for role_id in (555, 111, 333):
+            role = MagicMock()
+            role.id = role_id
+            role.name = f"role-{role_id}"
+            roles[role_id] = role
+
         mock_guild = MagicMock()
         mock_guild.id = 987654321
         mock_guild.name = "Test Guild"
+        mock_guild.get_role.side_effect = lambda role_id: roles.get(role_id)
+
+        config = GuildConfig(guild_id="987654321", cargo_apoiador_default="555", cargos_tempo=[
+            {"threshold": 30, "unit": "days", "role_id": "111"},
+            {"threshold": 1, "unit": "years", "role_id": "333"},
+        ])
 
-        # Mock apoiadores
-        mock_apoiadores = []
-        for i in range(3):
-            apo = MagicMock()
-            apo.discord_id = str(123456789 + i)
-            apo.ativo = True
-            mock_apoiadores.append(apo)
+        rows = [
+            ("1", 60),   # sem cargos -> padrão + 30 dias
+            ("2", 60),   # já está correto -> nenhuma chamada
+            ("3", 400),  # sobe de faixa -> troca 111 por 333
+        ]
+        current_roles = {"1": [], "2": [roles[555], roles[111]], "3": [roles[555], roles[111]]}
+        members = {}
+        for discord_id, member_roles in current_roles.items():
+            member = MagicMock()
+            member.roles = member_roles
+            member.add_roles = AsyncMock()
+            member.remove_roles = AsyncMock()
+            members[int(discord_id)] = member
+        mock_guild.get_member.side_effect = members.get
 
         with patch('bot.servicos.SupporterRoleManager.AsyncSessionLocal') as mock_session_local, \
-             patch.object(role_manager, 'assign_default_supporter_role', return_value=True) as mock_assign, \
-             patch.object(role_manager, 'update_member_time_based_roles', return_value=True) as mock_update:
+             patch.object(role_manager, 'get_guild_config', return_value=config), \
+             patch.object(role_manager, 'assign_default_supporter_role') as mock_assign, \
+             patch.object(role_manager, 'update_member_time_based_roles') as mock_update:
 
             mock_session_instance = AsyncMock()
             mock_session_local.return_value.__aenter__.return_value = mock_session_instance
-
-            # Mock session execute
             mock_result = MagicMock()
-            mock_scalars = MagicMock()
-            mock_scalars.all.return_value = mock_apoiadores
-            mock_result.scalars.return_value = mock_scalars
+            mock_result.all.return_value = rows
             mock_session_instance.execute.return_value = mock_result
 
-            # Mock guild.get_member
-            def get_member_side_effect(discord_id):
-                for apo in mock_apoiadores:
-                    if str(discord_id) == apo.discord_id:
-                        member = MagicMock()
-                        member.id = discord_id
-                        return member
-                return None
-
-            mock_guild.get_member.side_effect = get_member_side_effect
-
             result = await role_manager.update_all_supporters_roles(mock_guild)
 
-            assert "total_processed" in result
             assert result["total_processed"] == 3
-            assert result["updated"] == 3
+            assert result["updated"] == 2
+            # Uma consulta para todo o servidor, sem o caminho por membro
+            assert mock_session_instance.execute.await_count == 1
+            mock_assign.assert_not_called()
+            mock_update.assert_not_called()
+
+        members[1].add_roles.assert_awaited_once_with(roles[555], roles[111])
+        members[1].remove_roles.assert_not_called()
+        members[2].add_roles.assert_not_called()
+        members[2].remove_roles.assert_not_called()
+        members[3].remove_roles.assert_awaited_once_with(roles[111])
+        members[3].add_roles.assert_awaited_once_with(roles[333])
 
     @pytest.mark.asyncio
     async def test_get_guild_config(self, role_manager, mock_session):
@@ -221,9 +260,8 @@ class TestSupporterRoleManager:
 
             # Mock empty result
             mock_result = MagicMock()
-            mock_scalars = MagicMock()
-            mock_scalars.all.return_value = []
-            mock_result.scalars.return_value = mock_scalars
+            mock_result.scalars.return_value.first.return_value = None
+            mock_result.all.return_value = []
             mock_session_instance.execute.return_value = mock_result
 
             result = await role_manager.update_all_supporters_roles(mock_guild)
@@ -238,27 +276,39 @@ class TestSupporterRoleManager:
             assert days == 0
 
     @pytest.mark.asyncio
-    async def test_calculate_supporter_days_with_naive_datetime(self, role_manager):
-        """Test calculating days when data_inicio is naive datetime"""
-        naive_date = datetime.now() - timedelta(days=5)
-        mock_apo = MagicMock()
-        mock_apo.discord_id = "123"
-        mock_apo.guild_id = "456"
-        mock_apo.data_inicio = naive_date
-        mock_apo.ativo = True
+    async def test_calculate_supporter_days_with_naive_datetime(self, role_manager, sqlite_session):
+        """Test calculating days in SQL when dates are naive datetimes"""
+        naive_now = datetime.now().replace(microsecond=0)
+        sqlite_session.add_all([
+            Apoiador(discord_id="123", guild_id="456", tipo_apoio="pix", ativo=True,
+                     data_inicio=naive_now - timedelta(days=5), data_expiracao=naive_now),
+            Apoiador(discord_id="124", guild_id="456", tipo_apoio="pix", ativo=True,
+                     data_inicio=naive_now, data_expiracao=naive_now - timedelta(days=3)),
+            Apoiador(discord_id="125", guild_id="456", tipo_apoio="pix", ativo=False,
+                     data_inicio=naive_now - timedelta(days=90), data_expiracao=naive_now),
+            Apoiador(discord_id="126", guild_id="456", tipo_apoio="pix", ativo=True,
+                     data_inicio=naive_now, data_expiracao=None),
+        ])
+        sqlite_session.commit()
 
         with patch('bot.servicos.SupporterRoleManager.AsyncSessionLocal') as mock_session_local:
-            mock_session_instance = AsyncMock()
-            mock_session_local.return_value.__aenter__.return_value = mock_session_instance
-
-            mock_result = MagicMock()
-            mock_scalars = MagicMock()
-            mock_scalars.all.return_value = [mock_apo]
-            mock_result.scalars.return_value = mock_scalars
-            mock_session_instance.execute.return_value = mock_result
+            mock_session_local.return_value.__aenter__.return_value = _AsyncSessionAdapter(sqlite_session)
 
             days = await role_manager.calculate_total_support_time("123", "456")
-            assert days >= 5
+            assert days == 5
+
+            # Variante em lote: inativos ficam de fora, períodos negativos/incompletos contam 0
+            totals = await role_manager.calculate_all_support_times("456")
+            assert totals == {"123": 5, "124": 0, "126": 0}
+
+    def test_support_days_sql_per_dialect(self, role_manager):
+        """The day difference is computed by the database on every supported backend"""
+        from sqlalchemy import select
+        from sqlalchemy.dialects import mysql, postgresql
+
+        stmt = select(role_manager._support_days_sum())
+        assert "TIMESTAMPDIFF(DAY, apoiadores.data_inicio, apoiadores.data_expiracao)" in str(stmt.compile(dialect=mysql.dialect()))
+        assert "EXTRACT(EPOCH FROM (apoiadores.data_expiracao - apoiadores.data_inicio))" in str(stmt.compile(dialect=postgresql.dialect()))
 
     @pytest.mark.asyncio
     async def test_get_time_based_role_empty_config(self, role_manager, mock_member):